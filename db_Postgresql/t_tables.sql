@@ -1,3 +1,8 @@
+/* Base schema: types, tables, indexes and v_incident.
+   tg_backend/migrations are the source of truth for everything else, e.g. t_incident_dashboard,
+   the event and notification triggers and t_notification_outbox. The backend applies them at
+   startup (BACKEND_MIGRATE=1), they run on top of this file as well as on an empty database. */
+
 /* === Define Types === */
 
 /* Uregency Type */
@@ -47,7 +52,7 @@ CREATE TABLE
     IF NOT EXISTS public.t_incident (
         id UUID DEFAULT uuid_generate_v4 () PRIMARY KEY NOT NULL,
         reported_by UUID DEFAULT uuid_generate_v4 (),
-        reported_at DEFAULT NOW() TIMESTAMPTZ NOT NULL,
+        reported_at TIMESTAMPTZ DEFAULT NOW() NOT NULL,
         description TEXT,
         urgency urgency NOT NULL,
         impact impact NOT NULL,
@@ -60,6 +65,7 @@ CREATE TABLE
 /* Comments Table */
 CREATE TABLE
     IF NOT EXISTS public.t_comment (
+        id BIGSERIAL PRIMARY KEY NOT NULL,
         created_by UUID DEFAULT uuid_generate_v4 () NOT NULL,
         incident_id UUID DEFAULT uuid_generate_v4 () NOT NULL,
         created_at TIMESTAMPTZ DEFAULT now() NOT NULL,
@@ -98,31 +104,72 @@ CREATE TABLE
     );
 
 
+/* === Define Indexes === */
+/* Same definitions as the latest tg_backend/migrations creating them */
+
+/* One user per Telegram id, conflict target of the POST /users upsert */
+CREATE UNIQUE INDEX IF NOT EXISTS uq_t_user_telegram_user_id
+    ON public.t_user (telegram_user_id);
+
+/* Latest comment of an incident is the first entry of this index, ties of created_at are broken by id */
+CREATE INDEX IF NOT EXISTS idx_t_comment_incident_latest
+    ON public.t_comment (incident_id, created_at DESC, id DESC)
+    INCLUDE (incident_status, created_by);
+
+/* Previous comment of an incident */
+CREATE INDEX IF NOT EXISTS idx_t_comment_incident_id
+    ON public.t_comment (incident_id, id);
+
+/* Comments by author */
+CREATE INDEX IF NOT EXISTS idx_t_comment_created_by
+    ON public.t_comment (created_by);
+
+/* Incidents by reporter */
+CREATE INDEX IF NOT EXISTS idx_t_incident_reported_by
+    ON public.t_incident (reported_by, reported_at, id);
+
+/* Keyset pagination of users and comments */
+CREATE INDEX IF NOT EXISTS idx_t_user_created_at
+    ON public.t_user (created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_t_comment_created_at_id
+    ON public.t_comment (created_at, id);
+
+/* Tags of an incident */
+CREATE INDEX IF NOT EXISTS idx_t_incident_tag_incident_id
+    ON public.t_incident_tag (incident_id, tag_id);
+
+/* Keyset pagination of incidents and views */
+CREATE INDEX IF NOT EXISTS idx_t_incident_reported_at
+    ON public.t_incident (reported_at, id);
+
+
 /* === Define View === */
 CREATE OR REPLACE VIEW public.v_incident AS
     SELECT
     t_incident.id AS incident_id,
-    t_reporter.username AS reported_by_username, 
+    t_reporter.username AS reported_by_username,
     t_processor.username AS processed_by_username,
     t_incident.reported_at AS reported_at,
-    t_comment.created_at AS updated_at,
-    t_comment.incident_status AS incident_status,
+    t_last_comment.created_at AS updated_at,
+    t_last_comment.incident_status AS incident_status,
     t_incident.description AS description,
     t_incident.urgency AS urgency,
     t_incident.impact AS impact,
     t_tags.tags AS tags
     FROM public.t_incident
     LEFT JOIN public.t_user AS t_reporter ON t_incident.reported_by = t_reporter.id
-    LEFT JOIN (
-        SELECT created_at, created_by, incident_status, incident_id
+    LEFT JOIN LATERAL (
+        SELECT created_at, created_by, incident_status
         FROM public.t_comment
-        ORDER BY created_at DESC
+        WHERE t_comment.incident_id = t_incident.id
+        ORDER BY created_at DESC, id DESC
         LIMIT 1
-    ) AS t_comment ON t_comment.incident_id = t_incident.id
-    LEFT JOIN public.t_user AS t_processor ON t_comment.created_by = t_processor.id
-    LEFT JOIN (
-        SELECT incident_id, string_agg(t_tag.name, ', ') as tags
+    ) AS t_last_comment ON true
+    LEFT JOIN public.t_user AS t_processor ON t_last_comment.created_by = t_processor.id
+    LEFT JOIN LATERAL (
+        SELECT string_agg(t_tag.name, ', ') AS tags
         FROM public.t_incident_tag
-        LEFT JOIN public.t_tag ON t_incident_tag.tag_id = t_tag.id
-        GROUP BY incident_id
-    ) AS t_tags ON t_tags.incident_id = t_incident.id;
+        JOIN public.t_tag ON t_incident_tag.tag_id = t_tag.id
+        WHERE t_incident_tag.incident_id = t_incident.id
+    ) AS t_tags ON true;
\ No newline at end of file
@@ -0,0 +1,144 @@
+import asyncio
+import asyncpg
+import sql_connector
+from events import (
+    EventLog,
+    EVENTS_CHANNEL,
+    EVENTS_ENABLED,
+    EVENTS_HEARTBEAT,
+    EVENTS_MAX_SUBSCRIBERS,
+    EVENTS_RECONNECT_DELAY,
+    HEARTBEAT_FRAME,
+    RETRY_FRAME
+)
+
+# Frames buffered per subscriber before it is considered too slow and disconnected.
+SUBSCRIBER_QUEUE_SIZE = 64
+
+
+class AsyncEventHub:
+    """
+    Asyncio counterpart of events.EventHub: one asyncpg LISTEN connection feeding a bounded
+    queue per subscriber, idle subscribers cost a suspended coroutine.
+    """
+
+    def __init__(self, dsn, heartbeat=EVENTS_HEARTBEAT, max_subscribers=EVENTS_MAX_SUBSCRIBERS):
+        self.dsn = dsn
+        self.heartbeat = heartbeat
+        self.max_subscribers = max_subscribers
+        self.log = EventLog()
+        self._queues = set()
+        self._stopping = asyncio.Event()
+        self._task = None
+        self._counters = {"events": 0, "subscribed": 0, "dropped": 0}
+
+    def accepting(self):
+        """
+        Returns:
+        bool: True if another subscriber can be added.
+        """
+        return not self._stopping.is_set() and len(self._queues) < self.max_subscribers
+
+    async def subscribe(self, last_event_id=None):
+        """
+        Streams the missed events, then every new one and a heartbeat when there is none.
+
+        Args:
+        last_event_id (str, optional): The Last-Event-ID header of the request.
+
+        Returns:
+        async iterator: Event frames, ending when the hub closes or the subscriber falls behind.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+        queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self._queues.add(queue)
+        self._counters["subscribed"] += 1
+        try:
+            yield RETRY_FRAME + b"".join(self.log.replay(last_event_id))
+            while True:
+                try:
+                    frame = await asyncio.wait_for(queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    frame = HEARTBEAT_FRAME
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            self._queues.discard(queue)
+
+    def publish(self, payload):
+        """
+        Queues a notification for every subscriber.
+
+        Args:
+        payload (str): The JSON notification payload.
+        """
+        self._counters["events"] += 1
+        frame = self.log.append(payload)
+        for queue in list(self._queues):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                self._drop(queue)
+
+    def _drop(self, queue):
+        # The subscriber reconnects with Last-Event-ID and replays what it missed.
+        self._queues.discard(queue)
+        self._counters["dropped"] += 1
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    async def _listen(self):
+        while not self._stopping.is_set():
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(
+                    EVENTS_CHANNEL, lambda _connection, _pid, _channel, payload: self.publish(payload))
+                stopping = asyncio.create_task(self._stopping.wait())
+                terminated = asyncio.create_task(closed.wait())
+                await asyncio.wait([stopping, terminated], return_when=asyncio.FIRST_COMPLETED)
+                stopping.cancel()
+                terminated.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print('Error', e)
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), EVENTS_RECONNECT_DELAY)
+                except asyncio.TimeoutError:
+                    pass
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+
+    async def close(self):
+        """
+        Ends every subscription and stops listening.
+        """
+        self._stopping.set()
+        for queue in list(self._queues):
+            self._queues.discard(queue)
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    def stats(self):
+        """
+        Returns:
+        dict: Current subscribers and totals of events, subscriptions and dropped subscribers.
+        """
+        result = dict(self._counters)
+        result["subscribers"] = len(self._queues)
+        return result
+
+
+hub = AsyncEventHub(sql_connector.DATABASE_URI) \
+    if EVENTS_ENABLED and sql_connector.DATABASE_URI is not None else None
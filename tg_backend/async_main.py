@@ -0,0 +1,672 @@
+import io
+import os
+import json
+import signal
+import asyncio
+import http.client
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import ratelimit
+import async_events
+import async_sql_connector
+from router import BadParameter
+from serializer import dumps
+from compression import COMPRESSORS, negotiate
+from main import Server, HandlerMixin, BodyTooLarge, MalformedBody, MAX_BODY_SIZE, page_arguments, batch_status, STREAM_CHUNK_SIZE, KEEPALIVE_TIMEOUT
+
+
+class AsyncServer(HandlerMixin):
+    """
+    Asyncio counterpart of Server that serves the same routes with the same handler semantics
+    on top of the asyncpg based async_sql_connector.
+    """
+    routes = Server.routes
+    router = Server.router
+
+    def __init__(self, reader, writer, server, command, path, request_version, headers):
+        self.reader = reader
+        self.writer = writer
+        self.client_address = writer.get_extra_info("peername")
+        self.server = server
+        self.command = command
+        self.path = path
+        self.request_version = request_version
+        self.headers = headers
+        self.response = None
+        self.body_read = False
+        self.close_connection = False
+
+    async def find_route(self, verb):
+        """
+        Finds the appropriate route handler based on the HTTP method and URL path.
+
+        Args:
+        verb (str): The HTTP method (GET, POST, PUT, DELETE).
+
+        Returns:
+        None
+        """
+        parsed_url = urlsplit(self.path)
+        try:
+            method_name, groups = self.router.resolve(verb, parsed_url.path)
+        except BadParameter:
+            self.handle_error(400)
+            return
+        if method_name is None or not hasattr(self, method_name):
+            self.handle_error(501)
+            return
+        delay = self.throttle(verb, method_name)
+        if delay:
+            self.handle_error(429, {"Retry-After": ratelimit.retry_after(delay)})
+            return
+        query = parse_qs(parsed_url.query) if parsed_url.query else {}
+        method = getattr(self, method_name)
+        try:
+            await method(self, *groups, **query)
+        except BodyTooLarge:
+            self.close_connection = True
+            self.handle_error(413)
+        except MalformedBody:
+            self.close_connection = True
+            self.handle_error(400)
+        except Exception as e:
+            print(e)
+            self.handle_error(500)
+
+    def handle_error(self, code, headers=None):
+        """
+        Handles HTTP error responses.
+
+        Args:
+        code (int): The HTTP status code.
+        headers (dict, optional): Additional response headers.
+
+        Returns:
+        None
+        """
+        self.response = (code, None, headers)
+
+    def handle_success(self, code, *arg, headers=None):
+        """
+        Handles successful HTTP responses.
+
+        Args:
+        code (int): The HTTP status code.
+        *arg: Additional response data.
+        headers (dict, optional): Additional response headers.
+
+        Returns:
+        None
+        """
+        self.response = self.build_response(code, dumps(arg[0]) if len(arg) == 1 else None, headers)
+
+    async def handle_list(self, relation, kwargs):
+        """
+        Responds with one page of a relation, the next page cursor goes into X-Next-Cursor.
+        Streams the rows instead if the client asked for it.
+        """
+        stream_format = self.stream_format(kwargs)
+        try:
+            page = page_arguments(kwargs, relation)
+            if stream_format is not None:
+                rows = async_sql_connector.stream_page(relation, **page)
+            else:
+                rows, next_cursor = await async_sql_connector.list_page(relation, **page)
+        except ValueError:
+            self.handle_error(400)
+            return
+        if stream_format is not None:
+            await self.handle_stream(200, rows, stream_format)
+            return
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        self.handle_success(200, rows, headers=headers)
+
+    async def handle_batch(self, batch, data):
+        """
+        Runs a batch operation and responds with its per-item results:
+        201 if every item succeeded, else 207.
+
+        Args:
+        batch (callable): The sql_connector batch function.
+        data: The decoded request body.
+
+        Returns:
+        None
+        """
+        try:
+            results = await batch(data)
+        except ValueError:
+            self.handle_error(400)
+            return
+        if results is None:
+            self.handle_error(400)
+            return
+        self.handle_success(batch_status(results), results)
+
+    async def handle_stream(self, code, rows, stream_format="json"):
+        """
+        Streams rows as a JSON array or as newline delimited JSON while they are read.
+
+        Args:
+        code (int): The HTTP status code.
+        rows (async iterator): Rows to encode.
+        stream_format (str): "json" or "ndjson".
+
+        Returns:
+        None
+        """
+        first = await anext(rows, None)
+        if stream_format == "ndjson":
+            content_type = "application/x-ndjson"
+            prefix, separator, suffix = b"", b"\n", b"\n"
+        else:
+            content_type = "Application/JSON"
+            prefix, separator, suffix = b"[", b",", b"]"
+
+        coding = negotiate(self.headers.get("Accept-Encoding"))
+        compressor = COMPRESSORS[coding]() if coding is not None else None
+        headers = {"Content-Type": content_type, "Vary": "Accept-Encoding"}
+        if coding is not None:
+            headers["Content-Encoding"] = coding
+
+        async def body():
+            chunks = encode()
+            try:
+                async for data in chunks:
+                    if compressor is not None:
+                        data = compressor.compress(data)
+                    if data:
+                        yield data
+                if compressor is not None:
+                    yield compressor.finish()
+            finally:
+                await chunks.aclose()
+
+        async def encode():
+            buffer = [prefix]
+            size = 0
+            try:
+                if first is not None:
+                    buffer.append(dumps(first))
+                async for row in rows:
+                    data = dumps(row)
+                    buffer.append(separator)
+                    buffer.append(data)
+                    size += len(data)
+                    if size >= STREAM_CHUNK_SIZE:
+                        yield b"".join(buffer)
+                        buffer, size = [], 0
+                if stream_format == "json" or first is not None:
+                    buffer.append(suffix)
+                data = b"".join(buffer)
+                if data:
+                    yield data
+            finally:
+                await rows.aclose()
+
+        self.response = (code, body(), headers)
+
+    async def get_body(self):
+        """
+        Retrieves the request body.
+
+        Returns:
+        bytes: The request body.
+
+        Raises:
+        BodyTooLarge: If the body exceeds MAX_BODY_SIZE.
+        MalformedBody: If the Content-Length or the chunked encoding is malformed.
+        """
+        self.body_read = True
+        if self.headers.get("Transfer-Encoding", "").lower() != "chunked":
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                raise MalformedBody()
+            if length < 0:
+                raise MalformedBody()
+            if length > MAX_BODY_SIZE:
+                raise BodyTooLarge()
+            return await self.reader.readexactly(length)
+        try:
+            return await self.read_chunked_body()
+        except (ValueError, asyncio.LimitOverrunError):
+            raise MalformedBody()
+
+    async def read_chunked_body(self):
+        body = []
+        total = 0
+        while True:
+            size = int((await self.reader.readline()).split(b";")[0].strip(), 16)
+            if size == 0:
+                while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                break
+            total += size
+            if total > MAX_BODY_SIZE:
+                raise BodyTooLarge()
+            body.append(await self.reader.readexactly(size))
+            await self.reader.readline()
+        return b"".join(body)
+
+    async def handle(self):
+        """
+        Dispatches the request and writes the response.
+
+        Returns:
+        bool: True if the connection may be kept open for another request.
+        """
+        await self.find_route(self.command)
+        if not self.body_read and not self.close_connection:
+            try:
+                await self.get_body()
+            except (BodyTooLarge, MalformedBody):
+                self.close_connection = True
+        code, body, headers = self.response
+        connection = self.headers.get("Connection", "").lower()
+        if self.request_version == "HTTP/1.1":
+            keep_alive = connection != "close"
+        else:
+            keep_alive = connection == "keep-alive"
+        keep_alive = keep_alive and not self.server.closing and not self.close_connection
+        streamed = body is not None and not isinstance(body, bytes)
+        chunked = streamed and self.request_version == "HTTP/1.1"
+        if streamed and not chunked:
+            keep_alive = False
+        lines = [f"HTTP/1.1 {code} {HTTPStatus(code).phrase}"]
+        if body is not None and "Content-Type" not in (headers or {}):
+            lines.append("Content-Type: Application/JSON")
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        if chunked:
+            lines.append("Transfer-Encoding: chunked")
+        elif not streamed and code != 304:
+            lines.append(f"Content-Length: {len(body) if body is not None else 0}")
+        lines.append("Connection: " + ("keep-alive" if keep_alive else "close"))
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if streamed:
+            try:
+                async for data in body:
+                    self.writer.write(b"%x\r\n%s\r\n" % (len(data), data) if chunked else data)
+                    await self.writer.drain()
+            except Exception as e:
+                print(e)
+                return False
+            finally:
+                await body.aclose()
+            if chunked:
+                self.writer.write(b"0\r\n\r\n")
+        elif body is not None:
+            self.writer.write(body)
+        await self.writer.drain()
+        return keep_alive
+
+
+# METHOD GET | Returns: None
+
+    async def list_users(self, *args, **kwargs):
+        """
+        Retrieves a list of users.
+        """
+        await self.handle_list("t_user", kwargs)
+
+    async def get_user(self, *args, **kwargs):
+        """
+        Retrieves information about a specific user.
+        """
+        user = await async_sql_connector.get_single_user(args[1])
+        self.handle_success(200, user)
+
+    async def list_incidents(self, *args, **kwargs):
+        """
+        Retrieves a list of incidents.
+        """
+        await self.handle_list("t_incident", kwargs)
+
+    async def get_incident(self, *args, **kwargs):
+        """
+        Retrieves information about a specific incident.
+        """
+        incident = await async_sql_connector.get_single_incident(args[1])
+        self.handle_success(200, incident)
+
+    async def list_comments(self, *args, **kwargs):
+        """
+        Retrieves a list of comments.
+        """
+        await self.handle_list("t_comment", kwargs)
+
+    async def get_comment(self, *args, **kwargs):
+        """
+        Retrieves information about a specific comment.
+        """
+        comment = await async_sql_connector.get_single_comment(args[1])
+        self.handle_success(200, comment)
+
+    async def list_views(self, *args, **kwargs):
+        """
+        Retrieves a list of incident views.
+        """
+        await self.handle_list("t_incident_dashboard", kwargs)
+
+    async def get_view(self, *args, **kwargs):
+        """
+        Retrieves information about a specific incident view.
+        """
+        incident = (await async_sql_connector.get_single_view(args[1]))[0]
+        self.handle_success(200, incident)
+
+    async def get_view_detail(self, *args, **kwargs):
+        """
+        Retrieves an incident view together with its comments.
+        """
+        detail = await async_sql_connector.get_view_detail(args[1])
+        if detail is None:
+            self.handle_error(404)
+            return
+        self.handle_success(200, detail)
+
+    async def get_views_watermark(self, *args, **kwargs):
+        """
+        Retrieves the time of the latest incident view refresh.
+        """
+        watermark = (await async_sql_connector.get_views_watermark())[0]
+        self.handle_success(200, watermark)
+
+    async def get_stats(self, *args, **kwargs):
+        """
+        Retrieves runtime statistics of the backend.
+        """
+        stats = {
+            "pool": async_sql_connector.pool_stats(),
+            "cache": async_sql_connector.sql_connector.cache_stats(),
+            "server": self.server.stats()
+        }
+        if async_events.hub is not None:
+            stats["events"] = async_events.hub.stats()
+        if ratelimit.limiter is not None:
+            stats["rate_limit"] = ratelimit.limiter.stats()
+        if ratelimit.internal_limiter is not None:
+            stats["rate_limit_internal"] = ratelimit.internal_limiter.stats()
+        self.handle_success(200, stats)
+
+    async def get_events(self, *args, **kwargs):
+        """
+        Subscribes to the change feed of incidents and comments as server-sent events.
+        """
+        if async_events.hub is None or not async_events.hub.accepting():
+            self.handle_error(503)
+            return
+        headers = {"Content-Type": "text/event-stream", "Cache-Control": "no-cache"}
+        self.response = (200, async_events.hub.subscribe(self.headers.get("Last-Event-ID")), headers)
+
+
+# METHOD POST | Returns: None
+
+    async def create_user(self, *args):
+        """
+        Creates a new user.
+        """
+        body = await self.get_body()
+        user = json.loads(body)
+
+        if "telegram_user_id" not in user:
+            self.handle_error(400)
+            return
+
+        result = await async_sql_connector.upsert_user(user)
+
+        if result is not None:
+            rows, created = result
+            self.handle_success(201 if created else 200, rows)
+        else:
+            self.handle_error(400)
+
+    async def create_incident(self, *args):
+        """
+        Creates a new incident.
+        """
+        body = await self.get_body()
+        incident = json.loads(body)
+        result = await async_sql_connector.create_incident(incident)
+
+        if result is not None:
+            self.handle_success(201, result)
+        else:
+            self.handle_error(400)
+
+    async def create_comment(self, *args):
+        """
+        Creates a new comment.
+        """
+        body = await self.get_body()
+        comment = json.loads(body)
+        result = await async_sql_connector.create_comment(comment)
+
+        if result is not None:
+            self.handle_success(201, result)
+        else:
+            self.handle_error(400)
+
+    async def create_incidents(self, *args):
+        """
+        Creates many incidents in one transaction and reports the result of every item.
+        """
+        body = await self.get_body()
+        await self.handle_batch(async_sql_connector.create_incidents, json.loads(body))
+
+    async def create_comments(self, *args):
+        """
+        Creates many comments in one transaction and reports the result of every item.
+        """
+        body = await self.get_body()
+        await self.handle_batch(async_sql_connector.create_comments, json.loads(body))
+
+    async def change_statuses(self, *args):
+        """
+        Changes the status of many incidents and reports the result of every incident.
+        """
+        body = await self.get_body()
+        await self.handle_batch(async_sql_connector.change_statuses, json.loads(body))
+
+    async def claim_notifications(self, *args):
+        """
+        Leases due Telegram notifications to a notification worker.
+        """
+        body = await self.get_body()
+        try:
+            notifications = await async_sql_connector.claim_notifications(json.loads(body) if body else {})
+        except ValueError:
+            self.handle_error(400)
+            return
+        self.handle_success(200, notifications)
+
+    async def ack_notifications(self, *args):
+        """
+        Records the delivery outcome of claimed notifications.
+        """
+        body = await self.get_body()
+        try:
+            counts = await async_sql_connector.ack_notifications(json.loads(body))
+        except (ValueError, KeyError, TypeError):
+            self.handle_error(400)
+            return
+        self.handle_success(200, counts)
+
+
+# METHOD PUT | Returns: None
+
+    async def user_update(self, *args):
+        """
+        Updates information about a user.
+        """
+        body = await self.get_body()
+        data = json.loads(body)
+        try:
+            result = await async_sql_connector.update_user(args[1], data)
+        except ValueError:
+            self.handle_error(400)
+            return
+        self.handle_success(201, result)
+
+    async def incident_update(self, *args):
+        """
+        Updates information about an incident.
+        """
+        body = await self.get_body()
+        data = json.loads(body)
+        try:
+            result = await async_sql_connector.update_incident(args[1], data)
+        except ValueError:
+            self.handle_error(400)
+            return
+        self.handle_success(201, result)
+
+    async def comment_update(self, *args):
+        """
+        Updates information about a comment.
+        """
+        body = await self.get_body()
+        data = json.loads(body)
+        try:
+            result = await async_sql_connector.update_comment(args[1], data)
+        except ValueError:
+            self.handle_error(400)
+            return
+        self.handle_success(201, result)
+
+
+# METHOD DELETE
+
+    async def delete_user(self, *args):
+        """
+        Deletes a user.
+
+        Returns:
+        None
+        """
+        user = await async_sql_connector.delete_user(args[1])
+        self.handle_success(200, user)
+
+
+class AsyncHTTPServer:
+    """
+    Minimal HTTP/1.1 server on asyncio streams that dispatches requests to AsyncServer.
+    """
+    handler_class = AsyncServer
+    idle_timeout = KEEPALIVE_TIMEOUT
+
+    def __init__(self):
+        self.closing = False
+        self.connections = {}
+        self.counters = {"requests": 0, "in_flight": 0}
+
+    async def handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self.connections[task] = True
+        try:
+            while not self.closing:
+                self.connections[task] = True
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                except (ValueError, asyncio.LimitOverrunError):
+                    # The request line exceeds the limit of the stream reader.
+                    self.reject(writer, 414)
+                    break
+                if not request_line.strip():
+                    break
+                self.connections[task] = False
+                try:
+                    command, path, request_version = request_line.decode("latin-1").split()
+                except ValueError:
+                    self.reject(writer, 400)
+                    break
+                try:
+                    headers = await self.read_headers(reader)
+                except (ValueError, asyncio.LimitOverrunError, http.client.HTTPException):
+                    self.reject(writer, 431)
+                    break
+                handler = self.handler_class(
+                    reader, writer, self, command, path, request_version, headers)
+                self.counters["requests"] += 1
+                self.counters["in_flight"] += 1
+                try:
+                    keep_alive = await handler.handle()
+                finally:
+                    self.counters["in_flight"] -= 1
+                if not keep_alive:
+                    break
+        except (asyncio.CancelledError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections.pop(task, None)
+            writer.close()
+
+    def reject(self, writer, code):
+        """
+        Answers a request that cannot be parsed, the connection is closed afterwards.
+        """
+        writer.write(f"HTTP/1.1 {code} {HTTPStatus(code).phrase}\r\n"
+                     "Content-Length: 0\r\nConnection: close\r\n\r\n".encode("latin-1"))
+
+    async def read_headers(self, reader):
+        lines = []
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            lines.append(line)
+        return http.client.parse_headers(io.BytesIO(b"".join(lines) + b"\r\n"))
+
+    async def drain(self):
+        """
+        Stops keep-alive, closes idle connections and waits for in-flight requests.
+        """
+        self.closing = True
+        for task, idle in list(self.connections.items()):
+            if idle:
+                task.cancel()
+        if self.connections:
+            await asyncio.wait(list(self.connections))
+
+    def stats(self):
+        return {
+            "connections": len(self.connections),
+            "requests": self.counters["requests"],
+            "in_flight": self.counters["in_flight"],
+        }
+
+
+async def serve(host, port, stop=None):
+    """
+    Serves requests until the stop event is set, then drains in-flight requests.
+    """
+    http_server = AsyncHTTPServer()
+    stop = stop or asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+    server = await asyncio.start_server(
+        http_server.handle_connection, host, port,
+        backlog=int(os.getenv("BACKEND_BACKLOG", 64)))
+    try:
+        await stop.wait()
+    finally:
+        server.close()
+        if async_events.hub is not None:
+            await async_events.hub.close()
+        await http_server.drain()
+        await async_sql_connector.close_pool()
+
+
+def run(host="0.0.0.0", port=8090):
+    asyncio.run(serve(host, port))
+
+
+if __name__ == "__main__":
+    HOST = "0.0.0.0"
+    PORT = int(os.getenv("PORT", 8090))
+    run(HOST, PORT)
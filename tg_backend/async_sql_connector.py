@@ -0,0 +1,384 @@
+import asyncio
+import asyncpg
+import contextlib
+import sql_connector
+from cache import cached
+from sql_connector import cache, invalidate_incident, invalidate_users, PoolTimeout, to_native_placeholders
+from sql_connector import (
+    build_insert,
+    split_view_detail,
+    STATEMENTS,
+    build_create_incident,
+    build_batch_insert,
+    build_batch_create_incidents,
+    group_batch,
+    parse_incident_ids,
+    status_results,
+    batch_error,
+    item_error,
+    BATCH_STATUS_QUERY,
+    CLAIM_NOTIFICATIONS_QUERY,
+    parse_claim,
+    build_ack_notifications,
+    INCIDENT_BATCH_FIELDS,
+    COMMENT_BATCH_FIELDS,
+    build_upsert_user,
+    build_update,
+    build_page_query,
+    split_page,
+    INCIDENT_REQUIRED_FIELDS,
+    COMMENT_REQUIRED_FIELDS
+)
+
+
+_pool = None
+# Held while the pool is created, the first requests would otherwise create a pool each.
+_pool_lock = asyncio.Lock()
+
+
+async def get_pool():
+    """
+    Returns the asyncpg connection pool, creating it on first use.
+
+    Returns:
+    asyncpg.Pool or None: The pool, or None if no database is configured.
+    """
+    global _pool
+    if sql_connector.DATABASE_URI is None:
+        return None
+    if _pool is not None:
+        return _pool
+    async with _pool_lock:
+        if _pool is None:
+            options = {}
+            if not sql_connector.PREPARED_STATEMENTS:
+                # Named statements cached per connection break behind a pooler in transaction mode.
+                options["statement_cache_size"] = 0
+            _pool = await asyncpg.create_pool(
+                sql_connector.DATABASE_URI,
+                min_size=sql_connector.POOL_MIN_SIZE,
+                max_size=sql_connector.POOL_MAX_SIZE,
+                max_inactive_connection_lifetime=sql_connector.POOL_MAX_LIFETIME,
+                **options)
+    return _pool
+
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def pool_stats():
+    """
+    Returns statistics of the asyncpg connection pool.
+
+    Returns:
+    dict or None: Pool statistics, or None if the pool is not created yet.
+    """
+    if _pool is None:
+        return None
+    size = _pool.get_size()
+    idle = _pool.get_idle_size()
+    return {
+        "min_size": _pool.get_min_size(),
+        "max_size": _pool.get_max_size(),
+        "size": size,
+        "in_use": size - idle,
+        "idle": idle,
+    }
+
+
+async def execute_query(query, parameters=None):
+    """
+    Executes the given SQL query with optional parameters on a pooled connection.
+
+    Args:
+    query (str): The SQL query to execute, using "%s" placeholders.
+    parameters (tuple, optional): Parameters for the query.
+
+    Returns:
+    list or None: Result set of the query execution if successful, else None.
+    """
+    try:
+        pool = await get_pool()
+    except Exception as e:
+        print(f'Error', e)
+        return None
+    if pool is None:
+        return None
+    async with pool.acquire() as connection:
+        rows = await connection.fetch(
+            to_native_placeholders(query), *(parameters or ()))
+    return [dict(row) for row in rows]
+
+
+async def execute_statement(name, parameters=None):
+    """
+    Executes a statement of the sql_connector registry. asyncpg prepares every query on the
+    connection and keeps it in its statement cache, so the registry only fixes the query text.
+    The cache is turned off with PSQL_PREPARED_STATEMENTS=0, see get_pool().
+
+    Args:
+    name (str): A key of STATEMENTS.
+    parameters (tuple, optional): Parameters for the statement.
+
+    Returns:
+    list or None: Result set of the statement if successful, else None.
+    """
+    return await execute_query(STATEMENTS[name], parameters)
+
+
+# ===============#
+#   METHOD GET   #
+# ===============#
+
+@cached(cache, "user")
+async def get_single_user(user_id):
+    return await execute_statement("get_single_user", (user_id,))
+
+
+@cached(cache, "incident")
+async def get_single_incident(incident_id):
+    return await execute_statement("get_single_incident", (incident_id,))
+
+
+async def get_single_comment(comment_id):
+    return await execute_statement("get_single_comment", (comment_id,))
+
+
+@cached(cache, "view")
+async def get_single_view(view_id):
+    return await execute_statement("get_single_view", (view_id,))
+
+
+async def get_views_watermark():
+    return await execute_statement("get_views_watermark")
+
+
+async def get_view_detail(incident_id):
+    return split_view_detail(await execute_statement("get_view_detail", (incident_id,)))
+
+
+async def list_page(relation, **kwargs):
+    rows = await execute_query(*build_page_query(relation, **kwargs))
+    return split_page(relation, rows, kwargs.get("limit"), kwargs.get("sort"))
+
+
+class Transaction:
+    """
+    Unit of work: statements executed on one pooled connection and committed together.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def execute(self, query, parameters=None):
+        rows = await self.connection.fetch(
+            to_native_placeholders(query), *(parameters or ()))
+        return [dict(row) for row in rows]
+
+    async def execute_values(self, query, rows):
+        """
+        Executes a statement with a single "VALUES %s" placeholder for all the given rows at once.
+        """
+        values = ", ".join("(" + ", ".join(["%s"] * len(row)) + ")" for row in rows)
+        parameters = [value for row in rows for value in row]
+        return await self.execute(query.replace("VALUES %s", f"VALUES {values}", 1), parameters)
+
+    def savepoint(self):
+        """
+        Nested transaction, rolled back on its own when the block raises.
+        """
+        return self.connection.transaction()
+
+
+@contextlib.asynccontextmanager
+async def transaction():
+    """
+    Async context manager yielding a Transaction that is committed when the block exits normally
+    and rolled back when it raises.
+    """
+    pool = await get_pool()
+    if pool is None:
+        raise PoolTimeout("No database configured")
+    async with pool.acquire() as connection:
+        async with connection.transaction():
+            yield Transaction(connection)
+
+
+async def stream_query(query, parameters=None, batch_size=sql_connector.STREAM_BATCH_SIZE):
+    """
+    Executes the given SQL query through a server-side cursor and yields the rows
+    while they are prefetched batch by batch.
+
+    Args:
+    query (str): The SQL query to execute, using "%s" placeholders.
+    parameters (tuple, optional): Parameters for the query.
+    batch_size (int): Rows prefetched from the server per round-trip.
+
+    Yields:
+    dict: One row of the result set.
+    """
+    pool = await get_pool()
+    if pool is None:
+        return
+    async with pool.acquire() as connection:
+        async with connection.transaction():
+            cursor = connection.cursor(
+                to_native_placeholders(query), *(parameters or ()), prefetch=batch_size)
+            async for row in cursor:
+                yield dict(row)
+
+
+def stream_page(relation, **kwargs):
+    """
+    Streams the rows of a relation, see sql_connector.stream_page().
+    """
+    rows = stream_query(*build_page_query(relation, **kwargs))
+    if kwargs.get("limit") is None:
+        return rows
+    return _take(rows, min(kwargs["limit"], sql_connector.MAX_PAGE_SIZE))
+
+
+async def _take(rows, count):
+    try:
+        async for row in rows:
+            if count <= 0:
+                break
+            count -= 1
+            yield row
+    finally:
+        await rows.aclose()
+
+
+# ===============#
+#   METHOD POST  #
+# ===============#
+
+async def upsert_user(data):
+    statement = build_upsert_user(data)
+    if statement is None:
+        return None
+    result = await execute_query(*statement)
+    if not result:
+        return None
+    created = result[0].pop("created")
+    return result, created
+
+
+async def create_incident(data):
+    statement = build_create_incident(data)
+    if statement is None:
+        return None
+    async with transaction() as tx:
+        return await tx.execute(*statement)
+
+
+async def create_comment(data):
+    statement = build_insert("t_comment", data, COMMENT_REQUIRED_FIELDS)
+    if statement is None:
+        return None
+    result = await execute_query(*statement)
+    invalidate_incident(data["incident_id"])
+    return result
+
+
+# Errors of a single batch item, other errors abort the whole batch.
+ITEM_ERRORS = (asyncpg.exceptions.DataError, asyncpg.exceptions.IntegrityConstraintViolationError, ValueError)
+
+
+async def insert_batch(tx, query, group, results):
+    try:
+        async with tx.savepoint():
+            rows = await tx.execute_values(query, [values for _, values in group])
+        for (index, _), row in zip(group, rows):
+            results[index] = {"index": index, "status": 201, "data": row}
+        return
+    except ITEM_ERRORS:
+        pass
+    for index, values in group:
+        try:
+            async with tx.savepoint():
+                row, = await tx.execute_values(query, [values])
+            results[index] = {"index": index, "status": 201, "data": row}
+        except ITEM_ERRORS as e:
+            results[index] = batch_error(index, item_error(e))
+
+
+async def create_incidents(items):
+    results, groups = group_batch(items, INCIDENT_REQUIRED_FIELDS, INCIDENT_BATCH_FIELDS)
+    async with transaction() as tx:
+        for columns, group in groups.items():
+            await insert_batch(tx, build_batch_create_incidents(columns), group, results)
+    return results
+
+
+async def create_comments(items):
+    results, groups = group_batch(items, COMMENT_REQUIRED_FIELDS, COMMENT_BATCH_FIELDS)
+    async with transaction() as tx:
+        for columns, group in groups.items():
+            await insert_batch(tx, build_batch_insert("t_comment", columns), group, results)
+    for result in results:
+        if result["status"] == 201:
+            invalidate_incident(result["data"]["incident_id"])
+    return results
+
+
+async def change_statuses(data):
+    if not all(field in data for field in ("incident_ids", "incident_status", "created_by")):
+        return None
+    results, incident_ids = parse_incident_ids(data["incident_ids"])
+    async with transaction() as tx:
+        rows = await tx.execute(BATCH_STATUS_QUERY, (
+            data["created_by"], data["incident_status"], data.get("comment", ""), list(incident_ids)))
+    return status_results(results, incident_ids, rows)
+
+
+async def claim_notifications(data):
+    limit, lease = parse_claim(data)
+    rows = await execute_query(CLAIM_NOTIFICATIONS_QUERY, (lease, limit))
+    return sorted(rows or [], key=lambda row: row["id"])
+
+
+async def ack_notifications(data):
+    statements = build_ack_notifications(data)
+    async with transaction() as tx:
+        for query, parameters in statements:
+            await tx.execute(query, parameters)
+    return {key: len(data.get(key, [])) for key in ("sent", "retry", "failed")}
+
+
+# ===============#
+#   METHOD PUT   #
+# ===============#
+
+async def update_user(user_id, data):
+    result = await execute_query(*build_update("t_user", "id", user_id, data))
+    invalidate_users()
+    return result
+
+
+async def update_incident(incident_id, data):
+    result = await execute_query(*build_update("t_incident", "id", incident_id, data))
+    invalidate_incident(incident_id)
+    return result
+
+
+async def update_comment(user_id, data):
+    result = await execute_query(*build_update("t_comment", "created_by", user_id, data))
+    if cache is not None:
+        cache.invalidate_kind("view")
+    return result
+
+
+# ================#
+#  METHOD DELETE  #
+# ================#
+
+async def delete_user(user_id):
+    result = await execute_query('DELETE FROM t_user WHERE id = %s RETURNING *', (user_id,))
+    if cache is not None:
+        cache.clear()
+    return result
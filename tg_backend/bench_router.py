@@ -0,0 +1,61 @@
+"""
+Micro-benchmark of request routing: the per-request cost of resolving a path to its handler.
+
+Usage:
+python bench_router.py [requests]
+"""
+import re
+import sys
+import timeit
+from urllib.parse import parse_qs, urlparse, urlsplit
+
+from main import Server
+from router import PARAMETER
+
+PATHS = [
+    "/users",
+    "/users/9b2e6c5e-1f0b-4c1a-8d4e-7a3f2b1c0d9e",
+    "/incidents?reported_by=9b2e6c5e-1f0b-4c1a-8d4e-7a3f2b1c0d9e&limit=50&order=desc",
+    "/views/watermark",
+    "/views/9b2e6c5e-1f0b-4c1a-8d4e-7a3f2b1c0d9e",
+    "/stats",
+]
+
+# The regex table and loop find_route used before the router.
+LEGACY_ROUTES = {
+    "^" + PARAMETER.sub("([^/]+)", template) + "$": method_name
+    for template, method_name in Server.routes["GET"].items()
+}
+# Static routes have to be tried before the parameterized route of the same prefix.
+LEGACY_ROUTES = dict(sorted(LEGACY_ROUTES.items(), key=lambda route: "(" in route[0]))
+
+
+def legacy_find_route(path):
+    for route in LEGACY_ROUTES:
+        parsed_url = urlparse(path)
+        query = parse_qs(parsed_url.query)
+        result = re.search(route, parsed_url.path)
+        if result is not None:
+            return LEGACY_ROUTES[route], result.groups(), query
+    return None
+
+
+def router_find_route(path):
+    parsed_url = urlsplit(path)
+    method_name, groups = Server.router.resolve("GET", parsed_url.path)
+    query = parse_qs(parsed_url.query) if parsed_url.query else {}
+    return method_name, groups, query
+
+
+def measure(find_route, requests):
+    def run():
+        for path in PATHS:
+            find_route(path)
+    seconds = min(timeit.repeat(run, number=requests // len(PATHS), repeat=5))
+    return seconds / (requests // len(PATHS) * len(PATHS)) * 1e6
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 60000
+    for name, find_route in (("regex loop", legacy_find_route), ("router", router_find_route)):
+        print(f"{name:>10}: {measure(find_route, requests):.2f} us/request")
@@ -0,0 +1,168 @@
+import time
+import inspect
+import functools
+import threading
+from collections import OrderedDict
+
+# Invalidation generations are kept per slot of the key hash, so that they take constant memory.
+GENERATION_SLOTS = 4096
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire `ttl` seconds after they were stored.
+    """
+
+    def __init__(self, maxsize=1024, ttl=30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by invalidate(), invalidate_kind() and clear(), see generation().
+        self._generations = [0] * GENERATION_SLOTS
+        self._kind_generations = {}
+        self._epoch = 0
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def get(self, key):
+        """
+        Looks a key up.
+
+        Args:
+        key: The cache key.
+
+        Returns:
+        tuple: (True, value) on a hit, (False, None) on a miss.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return True, value
+                del self._data[key]
+                self._counters["expirations"] += 1
+            self._counters["misses"] += 1
+            return False, None
+
+    def generation(self, key):
+        """
+        Returns the invalidation generation of a key, taken before its value is loaded.
+
+        Args:
+        key: The cache key.
+
+        Returns:
+        tuple: Token for set(), it changes whenever the key may have been invalidated.
+        """
+        with self._lock:
+            return self._generation(key)
+
+    def _generation(self, key):
+        return self._epoch, self._kind_generations.get(key[0], 0), self._generations[hash(key) % GENERATION_SLOTS]
+
+    def set(self, key, value, generation=None):
+        """
+        Stores a value, unless the key was invalidated since generation was taken: the value
+        may then have been loaded before the write that invalidated it.
+
+        Args:
+        key: The cache key.
+        value: The value.
+        generation (tuple, optional): Token returned by generation() before the value was loaded.
+
+        Returns:
+        bool: True if the value was stored.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation(key):
+                return False
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._counters["evictions"] += 1
+            return True
+
+    def invalidate(self, key):
+        with self._lock:
+            self._generations[hash(key) % GENERATION_SLOTS] += 1
+            if self._data.pop(key, None) is not None:
+                self._counters["invalidations"] += 1
+
+    def invalidate_kind(self, kind):
+        """
+        Drops every entry whose key starts with `kind`.
+        """
+        with self._lock:
+            self._kind_generations[kind] = self._kind_generations.get(kind, 0) + 1
+            keys = [key for key in self._data if key[0] == kind]
+            for key in keys:
+                del self._data[key]
+            self._counters["invalidations"] += len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._counters["invalidations"] += len(self._data)
+            self._data.clear()
+
+    def stats(self):
+        """
+        Returns cache counters.
+
+        Returns:
+        dict: Size, hits, misses, evictions, expirations and invalidations.
+        """
+        with self._lock:
+            result = dict(self._counters)
+            result["size"] = len(self._data)
+        result["max_size"] = self.maxsize
+        result["ttl"] = self.ttl
+        return result
+
+
+def cached(cache, kind):
+    """
+    Caches non-empty results of a function, or coroutine function, under (kind, *args).
+    Cached results are shared between callers and must not be modified. A result is not stored
+    if its key was invalidated while it was loaded.
+
+    Args:
+    cache (TTLCache or None): The cache, None disables caching.
+    kind (str): First element of the cache keys, used for invalidation.
+
+    Returns:
+    function: The decorator.
+    """
+    def decorator(function):
+        if cache is None:
+            return function
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args):
+                hit, value = cache.get((kind,) + args)
+                if hit:
+                    return value
+                generation = cache.generation((kind,) + args)
+                value = await function(*args)
+                if value:
+                    cache.set((kind,) + args, value, generation)
+                return value
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args):
+            hit, value = cache.get((kind,) + args)
+            if hit:
+                return value
+            generation = cache.generation((kind,) + args)
+            value = function(*args)
+            if value:
+                cache.set((kind,) + args, value, generation)
+            return value
+        return wrapper
+    return decorator
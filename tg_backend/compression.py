@@ -0,0 +1,109 @@
+import os
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_ENABLED = os.getenv('BACKEND_COMPRESSION', '1') == '1'
+# Bodies smaller than this are sent as they are, compressing them costs more than it saves.
+COMPRESSION_MIN_SIZE = int(os.getenv('BACKEND_COMPRESSION_MIN_SIZE', 1024))
+GZIP_LEVEL = int(os.getenv('BACKEND_GZIP_LEVEL', 6))
+
+
+class GzipCompressor:
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        # Sync flush so that every streamed chunk can be decoded as soon as it arrives.
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=5)
+
+    def compress(self, data):
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+# Supported content codings, in the order the server prefers them.
+COMPRESSORS = {}
+if zstandard is not None:
+    COMPRESSORS["zstd"] = ZstdCompressor
+if brotli is not None:
+    COMPRESSORS["br"] = BrotliCompressor
+COMPRESSORS["gzip"] = GzipCompressor
+
+
+def negotiate(accept_encoding):
+    """
+    Chooses the content coding of a response from the Accept-Encoding request header.
+
+    Args:
+    accept_encoding (str or None): The Accept-Encoding header.
+
+    Returns:
+    str or None: The chosen coding, or None to send the body as it is.
+    """
+    if not COMPRESSION_ENABLED or not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, parameters = item.strip().partition(";")
+        weight = 1.0
+        parameter, _, value = parameters.strip().partition("=")
+        if parameter.strip() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for coding in COMPRESSORS:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(data, coding):
+    """
+    Compresses a whole body.
+
+    Args:
+    data (bytes): The body.
+    coding (str): A key of COMPRESSORS.
+
+    Returns:
+    bytes: The compressed body.
+    """
+    if coding == "gzip":
+        return gzip.compress(data, GZIP_LEVEL, mtime=0)
+    compressor = COMPRESSORS[coding]()
+    return compressor.compress(data) + compressor.finish()
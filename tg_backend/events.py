@@ -0,0 +1,247 @@
+import os
+import json
+import uuid
+import select
+import threading
+import collections
+import psycopg2
+import sql_connector
+
+# Channel the triggers of migration 0006 notify on every incident and comment change.
+EVENTS_CHANNEL = 'incident_events'
+
+EVENTS_ENABLED = os.getenv('BACKEND_EVENTS', '1') == '1'
+EVENTS_HEARTBEAT = float(os.getenv('BACKEND_EVENTS_HEARTBEAT', 15))
+EVENTS_REPLAY_SIZE = int(os.getenv('BACKEND_EVENTS_REPLAY_SIZE', 256))
+EVENTS_MAX_SUBSCRIBERS = int(os.getenv('BACKEND_EVENTS_MAX_SUBSCRIBERS', 1000))
+EVENTS_RECONNECT_DELAY = 5
+
+# Sent first on every stream: how long browsers wait before reconnecting.
+RETRY_FRAME = b"retry: 3000\n\n"
+HEARTBEAT_FRAME = b": keep-alive\n\n"
+# Sent instead of a replay when the events after Last-Event-ID are gone, the subscriber has to reload.
+RESET_FRAME = b"event: reset\ndata: {}\n\n"
+
+
+def format_event(event_id, payload):
+    """
+    Formats a notification as a server-sent event named after its "type" field.
+
+    Args:
+    event_id (str): The event id.
+    payload (str): The JSON notification payload.
+
+    Returns:
+    bytes: The event frame.
+    """
+    try:
+        event_type = json.loads(payload).get("type", "message")
+    except (ValueError, AttributeError):
+        event_type = "message"
+    lines = [f"id: {event_id}", f"event: {event_type}"]
+    lines.extend(f"data: {line}" for line in payload.splitlines())
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+def chunk(data):
+    """
+    Returns:
+    bytes: data as one chunk of a chunked response body.
+    """
+    return b"%x\r\n%s\r\n" % (len(data), data)
+
+
+class EventLog:
+    """
+    Numbers the events of this process and keeps the latest ones, so that a subscriber
+    reconnecting with Last-Event-ID receives what it missed.
+    """
+
+    def __init__(self, size=EVENTS_REPLAY_SIZE):
+        # Ids of another process or an earlier run of this one never match.
+        self.epoch = uuid.uuid4().hex[:8]
+        self.sequence = 0
+        self.frames = collections.deque(maxlen=max(size, 1))
+
+    def append(self, payload):
+        """
+        Args:
+        payload (str): The JSON notification payload.
+
+        Returns:
+        bytes: The event frame.
+        """
+        self.sequence += 1
+        frame = format_event(f"{self.epoch}-{self.sequence}", payload)
+        self.frames.append((self.sequence, frame))
+        return frame
+
+    def replay(self, last_event_id):
+        """
+        Returns the frames a subscriber missed.
+
+        Args:
+        last_event_id (str or None): The Last-Event-ID header of the subscriber.
+
+        Returns:
+        list: Frames after last_event_id, or [RESET_FRAME] if they are no longer kept.
+        """
+        if not last_event_id:
+            return []
+        epoch, _, sequence = last_event_id.partition("-")
+        try:
+            sequence = int(sequence)
+        except ValueError:
+            return [RESET_FRAME]
+        if epoch != self.epoch or sequence > self.sequence:
+            return [RESET_FRAME]
+        if sequence < self.sequence and self.frames[0][0] > sequence + 1:
+            return [RESET_FRAME]
+        return [frame for number, frame in self.frames if number > sequence]
+
+
+class EventHub:
+    """
+    Fans the notifications of one LISTEN connection out to the sockets of every subscriber.
+
+    A single thread serves all subscribers: idle ones cost a socket and a heartbeat every
+    EVENTS_HEARTBEAT seconds, not a worker thread. Sockets are written without blocking;
+    a subscriber too slow to take a whole frame is disconnected and catches up on reconnect.
+    """
+
+    def __init__(self, dsn, heartbeat=EVENTS_HEARTBEAT, max_subscribers=EVENTS_MAX_SUBSCRIBERS):
+        self.dsn = dsn
+        self.heartbeat = heartbeat
+        self.max_subscribers = max_subscribers
+        self.log = EventLog()
+        self._lock = threading.Lock()
+        # Subscribed connections and whether their response uses chunked transfer coding.
+        self._subscribers = {}
+        self._stopping = threading.Event()
+        self._thread = None
+        self._counters = {"events": 0, "subscribed": 0, "dropped": 0}
+
+    def start(self):
+        """
+        Starts listening, once. Without a dsn events only come from publish().
+        """
+        with self._lock:
+            if self._thread is None and self.dsn is not None:
+                self._thread = threading.Thread(target=self._listen, name="event-hub", daemon=True)
+                self._thread.start()
+
+    def accepting(self):
+        """
+        Returns:
+        bool: True if another subscriber can be added.
+        """
+        with self._lock:
+            return not self._stopping.is_set() and len(self._subscribers) < self.max_subscribers
+
+    def subscribe(self, connection, last_event_id=None, chunked=False):
+        """
+        Sends the missed events to a connection whose response headers were written, then
+        adds it to the subscribers. The hub owns the connection from then on.
+
+        Args:
+        connection (socket.socket): The client connection.
+        last_event_id (str, optional): The Last-Event-ID header of the request.
+        chunked (bool): Whether the response uses chunked transfer coding.
+
+        Returns:
+        bool: False if the connection could not be subscribed and is still owned by the caller.
+        """
+        self.start()
+        with self._lock:
+            if self._stopping.is_set() or len(self._subscribers) >= self.max_subscribers:
+                return False
+            try:
+                data = RETRY_FRAME + b"".join(self.log.replay(last_event_id))
+                connection.sendall(chunk(data) if chunked else data)
+                connection.setblocking(False)
+            except OSError:
+                return False
+            self._subscribers[connection] = chunked
+            self._counters["subscribed"] += 1
+        return True
+
+    def publish(self, payload):
+        """
+        Sends a notification to every subscriber.
+
+        Args:
+        payload (str): The JSON notification payload.
+        """
+        with self._lock:
+            self._counters["events"] += 1
+            self._broadcast(self.log.append(payload))
+
+    def _broadcast(self, frame):
+        chunked_frame = chunk(frame)
+        for connection, chunked in list(self._subscribers.items()):
+            data = chunked_frame if chunked else frame
+            try:
+                if connection.send(data) == len(data):
+                    continue
+            except OSError:
+                pass
+            self._drop(connection)
+
+    def _drop(self, connection):
+        del self._subscribers[connection]
+        self._counters["dropped"] += 1
+        try:
+            connection.close()
+        except OSError:
+            pass
+
+    def _listen(self):
+        while not self._stopping.is_set():
+            connection = None
+            try:
+                connection = psycopg2.connect(self.dsn)
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {EVENTS_CHANNEL}")
+                while not self._stopping.is_set():
+                    if select.select([connection], [], [], self.heartbeat) == ([], [], []):
+                        with self._lock:
+                            self._broadcast(HEARTBEAT_FRAME)
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        self.publish(connection.notifies.pop(0).payload)
+            except Exception as e:
+                print('Error', e)
+                self._stopping.wait(EVENTS_RECONNECT_DELAY)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+    def close(self):
+        """
+        Disconnects every subscriber and stops listening.
+        """
+        self._stopping.set()
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, {}
+            for connection, chunked in subscribers.items():
+                try:
+                    if chunked:
+                        connection.send(b"0\r\n\r\n")
+                    connection.close()
+                except OSError:
+                    pass
+
+    def stats(self):
+        """
+        Returns:
+        dict: Current subscribers and totals of events, subscriptions and dropped subscribers.
+        """
+        with self._lock:
+            result = dict(self._counters)
+            result["subscribers"] = len(self._subscribers)
+        return result
+
+
+hub = EventHub(sql_connector.DATABASE_URI) if EVENTS_ENABLED and sql_connector.DATABASE_URI is not None else None
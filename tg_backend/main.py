@@ -1,55 +1,260 @@
 import os
+import time
+import select
+import signal
+import threading
 import http.server
 import sql_connector
+import migrate
+import events
+import ratelimit
+from pool_server import ThreadPoolHTTPServer
+from router import Router, BadParameter
+from serializer import Encode, TIME_FORMAT, dumps
+from compression import COMPRESSORS, COMPRESSION_MIN_SIZE, compress, negotiate
 import json
 import datetime
-import re
-from urllib.parse import parse_qs, urlparse
+import hashlib
+from urllib.parse import parse_qs, urlsplit
 
 
-TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+STREAM_CHUNK_SIZE = 64 * 1024
+# Seconds an idle persistent connection keeps its worker thread.
+KEEPALIVE_TIMEOUT = float(os.getenv('BACKEND_KEEPALIVE_TIMEOUT', 5))
+# How often an idle persistent connection checks whether other connections wait for its worker.
+KEEPALIVE_POLL_INTERVAL = 0.05
+MAX_BODY_SIZE = int(os.getenv('BACKEND_MAX_BODY_SIZE', 4 * 1024 * 1024))
 
 
-class Encode(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, datetime.datetime):
-            return obj.strftime(TIME_FORMAT)
-        return super().default(obj)
+class BodyTooLarge(Exception):
+    """
+    Raised when a request body exceeds MAX_BODY_SIZE.
+    """
+
+
+class MalformedBody(Exception):
+    """
+    Raised when the Content-Length or the chunked encoding of a request body cannot be parsed.
+    """
+
+
+def entity_tag(data):
+    """
+    Computes a strong ETag from a response body.
+
+    Args:
+    data (bytes): The response body.
+
+    Returns:
+    str: The quoted entity tag.
+    """
+    return '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Checks an If-None-Match header against the current entity tag.
+
+    Args:
+    if_none_match (str or None): The If-None-Match request header.
+    etag (str): The entity tag of the current representation.
+
+    Returns:
+    bool: True if the client copy is current and 304 may be returned.
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or "W/" + etag in tags
+
+
+def page_arguments(kwargs, relation):
+    """
+    Extracts pagination and filter arguments from parsed query parameters.
+
+    Args:
+    kwargs (dict): Query parameters as returned by parse_qs.
+    relation (str): The listed relation.
+
+    Returns:
+    dict: Keyword arguments for sql_connector.build_page_query().
+
+    Raises:
+    ValueError: If a parameter is malformed.
+    """
+    page = {"filters": {}}
+    for name, values in kwargs.items():
+        if name == "limit":
+            page["limit"] = int(values[0])
+            if page["limit"] < 1:
+                raise ValueError('Unexpected limit')
+        elif name == "after":
+            page["after"] = values[0]
+        elif name in ("since", "until"):
+            page[name] = datetime.datetime.fromisoformat(values[0])
+        elif name == "stream":
+            continue
+        elif name in ("order", "sort"):
+            page[name] = values[0]
+        elif name in sql_connector.PAGE_FILTERS[relation]:
+            page["filters"][name] = values
+        else:
+            raise ValueError(f'Unexpected parameter {name}')
+    return page
+
+
+def batch_status(results):
+    """
+    Returns:
+    int: 201 if every item of a batch succeeded, else 207.
+    """
+    return 201 if all(result["status"] == 201 for result in results) else 207
 
 
-class Server(http.server.BaseHTTPRequestHandler):
+class HandlerMixin:
+    """
+    Request handling shared by Server and AsyncServer: rate limiting and the negotiation
+    of the content coding and the streaming format of a response.
+    """
+
+    def throttle(self, verb, method_name):
+        """
+        Charges the request to the token bucket of its client and route class.
+
+        Returns:
+        float: 0 if the request may run, else the seconds the client has to wait.
+        """
+        if ratelimit.limiter is None:
+            return 0.0
+        name = ratelimit.internal_client(self.headers)
+        if name is not None:
+            return ratelimit.internal_limiter.take(name, ratelimit.route_class(verb, method_name))
+        client = ratelimit.client_identity(self.headers, self.client_address)
+        return ratelimit.limiter.take(client, ratelimit.route_class(verb, method_name))
+
+    def build_response(self, code, data, headers=None):
+        """
+        Tags the body of a GET response, replaces it with 304 if the client copy is current
+        and compresses it otherwise.
+
+        Args:
+        code (int): The HTTP status code.
+        data (bytes or None): The response body.
+        headers (dict, optional): Additional response headers.
+
+        Returns:
+        tuple: (code, body, headers) to send.
+        """
+        headers = dict(headers or {})
+        if self.command == "GET" and code == 200 and data is not None:
+            headers["ETag"] = entity_tag(data)
+            if etag_matches(self.headers.get("If-None-Match"), headers["ETag"]):
+                # Same ETag and Vary as the 200 the client holds.
+                self.content_coding(data, headers)
+                headers.pop("Content-Encoding", None)
+                return 304, None, headers
+        return code, self.encode_body(data, headers), headers
+
+    def content_coding(self, data, headers):
+        """
+        Selects the best content coding the client accepts for a response body and sets the
+        Vary, Content-Encoding and ETag headers of the compressed response.
+        Bodies below COMPRESSION_MIN_SIZE are left as they are.
+
+        Args:
+        data (bytes or None): The response body.
+        headers (dict): Response headers, updated in place.
+
+        Returns:
+        str or None: The content coding, or None to send the body as it is.
+        """
+        if data is None or len(data) < COMPRESSION_MIN_SIZE:
+            return None
+        headers["Vary"] = "Accept-Encoding"
+        coding = negotiate(self.headers.get("Accept-Encoding"))
+        if coding is None:
+            return None
+        headers["Content-Encoding"] = coding
+        if "ETag" in headers:
+            # The compressed bytes differ from the ones the strong tag was computed from.
+            headers["ETag"] = "W/" + headers["ETag"]
+        return coding
+
+    def encode_body(self, data, headers):
+        """
+        Compresses a response body with the coding selected by content_coding().
+
+        Args:
+        data (bytes or None): The response body.
+        headers (dict): Response headers, updated in place.
+
+        Returns:
+        bytes or None: The body to send.
+        """
+        coding = self.content_coding(data, headers)
+        return compress(data, coding) if coding is not None else data
+
+    def stream_format(self, kwargs):
+        """
+        Returns the requested streaming format: "ndjson" for `Accept: application/x-ndjson`
+        or `?stream=ndjson`, "json" for `?stream=json`, None for a buffered response.
+        """
+        if "stream" in kwargs:
+            return "ndjson" if kwargs["stream"][0] == "ndjson" else "json"
+        if "application/x-ndjson" in self.headers.get("Accept", ""):
+            return "ndjson"
+        return None
+
+
+class Server(HandlerMixin, http.server.BaseHTTPRequestHandler):
     """
     Custom HTTP request handler that implements RESTful API endpoints for managing users, incidents, and comments.
     """
     routes = {
         "GET": {
-            "^/users$": "list_users",
-            "^/users/([^/]+)$": "get_user",
-            "^/incidents$": "list_incidents",
-            "^/incidents/([^/]+)$": "get_incident",
-            "^/comments$": "list_comments",
-            "^/comments/([^/]+)$": "get_comment",
-            "^/views$": "list_views",
-            "^/views/([^/]+)$": "get_view"
+            "/users": "list_users",
+            "/users/{user_id:uuid}": "get_user",
+            "/incidents": "list_incidents",
+            "/incidents/{incident_id:uuid}": "get_incident",
+            "/comments": "list_comments",
+            "/comments/{user_id:uuid}": "get_comment",
+            "/views": "list_views",
+            "/views/watermark": "get_views_watermark",
+            "/views/{incident_id:uuid}": "get_view",
+            "/views/{incident_id:uuid}/detail": "get_view_detail",
+            "/stats": "get_stats",
+            "/events": "get_events"
         },
         "POST": {
-            "^/users$": "create_user",
-            "^/incidents$": "create_incident",
-            "^/comments$": "create_comment"
+            "/users": "create_user",
+            "/incidents": "create_incident",
+            "/comments": "create_comment",
+            "/incidents/batch": "create_incidents",
+            "/comments/batch": "create_comments",
+            "/incidents/status": "change_statuses",
+            "/notifications/claim": "claim_notifications",
+            "/notifications/ack": "ack_notifications"
         },
         "PUT": {
-            "^/users/([^/]+)$": "user_update",
-            "^/incidents/([^/]+)$": "incident_update",
-            "^/comments/([^/]+)$": "comment_update"
+            "/users/{user_id:uuid}": "user_update",
+            "/incidents/{incident_id:uuid}": "incident_update",
+            "/comments/{user_id:uuid}": "comment_update"
         },
         "DELETE": {
-            "^/users/([^/]+)$": "delete_user"
+            "/users/{user_id:uuid}": "delete_user"
         }
     }
+    router = Router(routes)
+
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT
+    disable_nagle_algorithm = True
+    body_read = False
 
     def find_route(self, verb):
         """
         Finds the appropriate route handler based on the HTTP method and URL path.
+        Afterwards reads the request body if the handler did not, so the connection can be reused.
 
         Args:
         verb (str): The HTTP method (GET, POST, PUT, DELETE).
@@ -57,71 +262,321 @@ class Server(http.server.BaseHTTPRequestHandler):
         Returns:
         None
         """
-        for route in self.routes[verb]:
-            parsed_url = urlparse(self.path)
-            query = parse_qs(parsed_url.query)
-            result = re.search(route, parsed_url.path)
-            if result is not None:
-                method_name = self.routes[verb][route]
-                if hasattr(self, method_name):
-                    method = getattr(self, method_name)
-                    try:
-                        method(self, *result.groups(), **query)
-                    except Exception as e:
-                        print(e)
-                        self.handle_error(500)
-                    return
-        self.handle_error(501)
-
-    def handle_error(self, code):
+        self.body_read = False
+        self.dispatch(verb)
+        self.discard_body()
+
+    def dispatch(self, verb):
+        """
+        Calls the handler of the request, responding with 400, 413, 500 or 501 when it cannot.
+        """
+        parsed_url = urlsplit(self.path)
+        try:
+            method_name, groups = self.router.resolve(verb, parsed_url.path)
+        except BadParameter:
+            self.handle_error(400)
+            return
+        if method_name is None or not hasattr(self, method_name):
+            self.handle_error(501)
+            return
+        delay = self.throttle(verb, method_name)
+        if delay:
+            self.handle_error(429, {"Retry-After": ratelimit.retry_after(delay)})
+            return
+        query = parse_qs(parsed_url.query) if parsed_url.query else {}
+        method = getattr(self, method_name)
+        try:
+            method(self, *groups, **query)
+        except BodyTooLarge:
+            self.close_connection = True
+            self.handle_error(413)
+        except MalformedBody:
+            # The next request cannot be found in the stream.
+            self.close_connection = True
+            self.handle_error(400)
+        except Exception as e:
+            print(e)
+            self.handle_error(500)
+
+    def discard_body(self):
+        """
+        Reads the request body the handler left unread, so that the next request on a persistent
+        connection starts at its request line. Closes the connection if the body is too large
+        or malformed.
+        """
+        if self.body_read or self.close_connection:
+            return
+        try:
+            self.get_body()
+        except (BodyTooLarge, MalformedBody):
+            self.close_connection = True
+
+    def handle(self):
+        """
+        Serves the requests of a connection, waiting for the next one with wait_for_request().
+        """
+        self.handle_one_request()
+        while not self.close_connection:
+            if not self.wait_for_request():
+                self.close_connection = True
+                return
+            self.handle_one_request()
+
+    def wait_for_request(self):
+        """
+        Waits up to KEEPALIVE_TIMEOUT for the next request of an idle persistent connection.
+        Gives up as soon as accepted connections wait for a worker: the idle client reconnects
+        when it has a request, the queued one could not be served before the timeout.
+
+        Returns:
+        bool: True if a request arrived.
+        """
+        if self.request_buffered():
+            return True
+        pooled = isinstance(self.server, ThreadPoolHTTPServer)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            wait = min(remaining, KEEPALIVE_POLL_INTERVAL) if pooled else remaining
+            if select.select([self.connection], [], [], wait)[0]:
+                return True
+            if pooled and self.server.saturated():
+                return False
+
+    def request_buffered(self):
+        """
+        Returns:
+        bool: True if a pipelined request is already in the read buffer, select() does not see it.
+        """
+        peek = getattr(self.rfile, "peek", None)
+        if peek is None:
+            # Not a buffered socket stream, everything left is already readable.
+            return True
+        self.connection.setblocking(False)
+        try:
+            return bool(peek(1))
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def end_headers(self):
+        # A persistent connection holds a worker thread, so it is closed while other connections wait for one.
+        if not self.close_connection and isinstance(self.server, ThreadPoolHTTPServer) and self.server.saturated():
+            self.send_header("Connection", "close")
+        super().end_headers()
+
+    def handle_error(self, code, headers=None):
         """
         Handles HTTP error responses.
 
         Args:
         code (int): The HTTP status code.
+        headers (dict, optional): Additional response headers.
 
         Returns:
         None
         """
         self.send_response(code)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        if self.close_connection:
+            self.send_header("Connection", "close")
         self.end_headers()
 
-    def handle_success(self, code, *arg):
+    def handle_success(self, code, *arg, headers=None):
         """
         Handles successful HTTP responses.
 
         Args:
         code (int): The HTTP status code.
         *arg: Additional response data.
+        headers (dict, optional): Additional response headers.
 
         Returns:
         None
         """
+        code, data, headers = self.build_response(code, dumps(arg[0]) if len(arg) == 1 else None, headers)
         self.send_response(code)
-        self.send_header("Content-Type", "Application/JSON")
+        if data is not None:
+            self.send_header("Content-Type", "Application/JSON")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if code != 304:
+            self.send_header("Content-Length", str(len(data) if data is not None else 0))
         self.end_headers()
-        if len(arg) == 1:
-            string = json.dumps(arg[0], cls=Encode)
-            data = bytes(string, 'utf-8')
+        if data is not None:
             self.wfile.write(data)
 
-    def get_body(self):
+    def handle_list(self, relation, kwargs):
         """
-        Retrieves the request body.
+        Responds with one page of a relation, the next page cursor goes into X-Next-Cursor.
+        Streams the rows instead if the client asked for it, see stream_format().
+
+        Args:
+        relation (str): The listed relation.
+        kwargs (dict): Query parameters of the request.
 
         Returns:
-        str: The request body as a string.
+        None
         """
-        if "Content-Length" in self.headers:
-            return self.rfile.read(int(self.headers["Content-Length"]))
+        stream_format = self.stream_format(kwargs)
+        try:
+            page = page_arguments(kwargs, relation)
+            if stream_format is not None:
+                rows = sql_connector.stream_page(relation, **page)
+            else:
+                rows, next_cursor = sql_connector.list_page(relation, **page)
+        except ValueError:
+            self.handle_error(400)
+            return
+        if stream_format is not None:
+            self.handle_stream(200, rows, stream_format)
+            return
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        self.handle_success(200, rows, headers=headers)
+
+    def handle_batch(self, batch, data):
+        """
+        Runs a batch operation and responds with its per-item results:
+        201 if every item succeeded, else 207.
+
+        Args:
+        batch (callable): The sql_connector batch function.
+        data: The decoded request body.
+
+        Returns:
+        None
+        """
+        try:
+            results = batch(data)
+        except ValueError:
+            self.handle_error(400)
+            return
+        if results is None:
+            self.handle_error(400)
+            return
+        self.handle_success(batch_status(results), results)
+
+    def handle_stream(self, code, rows, stream_format="json"):
+        """
+        Streams rows as a JSON array or as newline delimited JSON while they are read.
+        Uses chunked transfer encoding on HTTP/1.1 connections and closes the connection otherwise.
+
+        Args:
+        code (int): The HTTP status code.
+        rows (iterator): Rows to encode.
+        stream_format (str): "json" or "ndjson".
+
+        Returns:
+        None
+        """
+        rows = iter(rows)
+        first = next(rows, None)
+        chunked = self.protocol_version >= "HTTP/1.1" and self.request_version >= "HTTP/1.1"
+        self.send_response(code)
+        if stream_format == "ndjson":
+            self.send_header("Content-Type", "application/x-ndjson")
+            prefix, separator, suffix = b"", b"\n", b"\n"
+        else:
+            self.send_header("Content-Type", "Application/JSON")
+            prefix, separator, suffix = b"[", b",", b"]"
+        coding = negotiate(self.headers.get("Accept-Encoding"))
+        compressor = COMPRESSORS[coding]() if coding is not None else None
+        self.send_header("Vary", "Accept-Encoding")
+        if coding is not None:
+            self.send_header("Content-Encoding", coding)
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+
+        def write(data, final=False):
+            if compressor is not None:
+                data = compressor.compress(data) + (compressor.finish() if final else b"")
+            if not data:
+                return
+            if chunked:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            else:
+                self.wfile.write(data)
+
+        buffer = [prefix]
+        size = 0
+        try:
+            if first is not None:
+                buffer.append(dumps(first))
+            for row in rows:
+                data = dumps(row)
+                buffer.append(separator)
+                buffer.append(data)
+                size += len(data)
+                if size >= STREAM_CHUNK_SIZE:
+                    write(b"".join(buffer))
+                    buffer, size = [], 0
+            if stream_format == "json" or first is not None:
+                buffer.append(suffix)
+            write(b"".join(buffer), final=True)
+            if chunked:
+                self.wfile.write(b"0\r\n\r\n")
+        except Exception as e:
+            print(e)
+            self.close_connection = True
+        finally:
+            close = getattr(rows, "close", None)
+            if close is not None:
+                close()
+
+    def get_body(self):
+        """
+        Retrieves the request body, sent with Content-Length or with chunked transfer encoding.
+
+        Returns:
+        bytes: The request body.
+
+        Raises:
+        BodyTooLarge: If the body exceeds MAX_BODY_SIZE.
+        MalformedBody: If the Content-Length or the chunked encoding is malformed.
+        """
+        self.body_read = True
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            try:
+                return self.read_chunked_body()
+            except ValueError:
+                raise MalformedBody()
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            raise MalformedBody()
+        if length < 0:
+            raise MalformedBody()
+        if length > MAX_BODY_SIZE:
+            raise BodyTooLarge()
+        return self.rfile.read(length)
+
+    def read_chunked_body(self):
         body = []
+        size = 0
         while True:
-            chunk = self.rfile.read(1024)
-            body.append(chunk)
-            if int(chunk.strip(), 16) == 0:
-                break
-        body = b"".join(body)
-        return body.decode('utf-8')
+            line = self.rfile.readline(1024)
+            chunk_size = int(line.split(b";", 1)[0].strip(), 16)
+            if chunk_size < 0:
+                raise ValueError('Negative chunk size')
+            if chunk_size == 0:
+                # Trailer fields end with an empty line.
+                while self.rfile.readline(1024) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(body)
+            size += chunk_size
+            if size > MAX_BODY_SIZE:
+                raise BodyTooLarge()
+            body.append(self.rfile.read(chunk_size))
+            self.rfile.readline(1024)
 
     def do_GET(self):
         self.find_route("GET")
@@ -142,8 +597,7 @@ class Server(http.server.BaseHTTPRequestHandler):
         """
         Retrieves a list of users.
         """
-        users = sql_connector.list_users()
-        self.handle_success(200, users)
+        self.handle_list("t_user", kwargs)
 
     def get_user(self, *args, **kwargs):
         """
@@ -156,12 +610,7 @@ class Server(http.server.BaseHTTPRequestHandler):
         """
         Retrieves a list of incidents.
         """
-        if 'reported_by' in kwargs:
-            incidents = sql_connector.list_incidents_by_reporter(
-                kwargs['reported_by'][0])
-        else:
-            incidents = sql_connector.list_incidents()
-        self.handle_success(200, incidents)
+        self.handle_list("t_incident", kwargs)
 
     def get_incident(self, *args, **kwargs):
         """
@@ -174,12 +623,7 @@ class Server(http.server.BaseHTTPRequestHandler):
         """
         Retrieves a list of comments.
         """
-        if 'incident_id' in kwargs:
-            comments = sql_connector.list_comments_by_incident(
-                kwargs['incident_id'][0])
-        else:
-            comments = sql_connector.list_comments()
-        self.handle_success(200, comments)
+        self.handle_list("t_comment", kwargs)
 
     def get_comment(self, *args, **kwargs):
         """
@@ -192,8 +636,7 @@ class Server(http.server.BaseHTTPRequestHandler):
         """
         Retrieves a list of incident views.
         """
-        incidents = sql_connector.list_views()
-        self.handle_success(200, incidents)
+        self.handle_list("t_incident_dashboard", kwargs)
 
     def get_view(self, *args, **kwargs):
         """
@@ -202,6 +645,59 @@ class Server(http.server.BaseHTTPRequestHandler):
         incident = sql_connector.get_single_view(args[1])[0]
         self.handle_success(200, incident)
 
+    def get_view_detail(self, *args, **kwargs):
+        """
+        Retrieves an incident view together with its comments.
+        """
+        detail = sql_connector.get_view_detail(args[1])
+        if detail is None:
+            self.handle_error(404)
+            return
+        self.handle_success(200, detail)
+
+    def get_views_watermark(self, *args, **kwargs):
+        """
+        Retrieves the time of the latest incident view refresh.
+        """
+        watermark = sql_connector.get_views_watermark()[0]
+        self.handle_success(200, watermark)
+
+    def get_stats(self, *args, **kwargs):
+        """
+        Retrieves runtime statistics of the backend.
+        """
+        stats = {"pool": sql_connector.pool_stats(), "cache": sql_connector.cache_stats()}
+        if isinstance(self.server, ThreadPoolHTTPServer):
+            stats["server"] = self.server.stats()
+        if events.hub is not None:
+            stats["events"] = events.hub.stats()
+        if ratelimit.limiter is not None:
+            stats["rate_limit"] = ratelimit.limiter.stats()
+        if ratelimit.internal_limiter is not None:
+            stats["rate_limit_internal"] = ratelimit.internal_limiter.stats()
+        self.handle_success(200, stats)
+
+    def get_events(self, *args, **kwargs):
+        """
+        Subscribes to the change feed of incidents and comments as server-sent events.
+        The connection is handed over to events.hub, so the worker thread is released at once.
+        """
+        if events.hub is None or not isinstance(self.server, ThreadPoolHTTPServer) \
+                or not events.hub.accepting():
+            self.handle_error(503)
+            return
+        chunked = self.request_version == "HTTP/1.1"
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        if events.hub.subscribe(self.connection, self.headers.get("Last-Event-ID"), chunked):
+            self.server.detach_request(self.connection)
+
 
 # METHOD POST | Returns: None
 
@@ -216,16 +712,11 @@ class Server(http.server.BaseHTTPRequestHandler):
             self.handle_error(400)
             return
 
-        result = sql_connector.find_user(
-            "telegram_user_id", user["telegram_user_id"])
-        if len(result) != 0:
-            self.handle_success(200, result)
-            return
-
-        result = sql_connector.create_user(user)
+        result = sql_connector.upsert_user(user)
 
         if result is not None:
-            self.handle_success(201, result)
+            rows, created = result
+            self.handle_success(201 if created else 200, rows)
         else:
             self.handle_error(400)
 
@@ -238,9 +729,6 @@ class Server(http.server.BaseHTTPRequestHandler):
         result = sql_connector.create_incident(incident)
 
         if result is not None:
-            sql_connector.create_comment({
-                "created_by": result[0]["reported_by"], "incident_id": result[0]["id"], "incident_status": "Open", "comment": ""
-            })
             self.handle_success(201, result)
         else:
             self.handle_error(400)
@@ -258,6 +746,51 @@ class Server(http.server.BaseHTTPRequestHandler):
         else:
             self.handle_error(400)
 
+    def create_incidents(self, *args):
+        """
+        Creates many incidents in one transaction and reports the result of every item.
+        """
+        body = self.get_body()
+        self.handle_batch(sql_connector.create_incidents, json.loads(body))
+
+    def create_comments(self, *args):
+        """
+        Creates many comments in one transaction and reports the result of every item.
+        """
+        body = self.get_body()
+        self.handle_batch(sql_connector.create_comments, json.loads(body))
+
+    def change_statuses(self, *args):
+        """
+        Changes the status of many incidents and reports the result of every incident.
+        """
+        body = self.get_body()
+        self.handle_batch(sql_connector.change_statuses, json.loads(body))
+
+    def claim_notifications(self, *args):
+        """
+        Leases due Telegram notifications to a notification worker.
+        """
+        body = self.get_body()
+        try:
+            notifications = sql_connector.claim_notifications(json.loads(body) if body else {})
+        except ValueError:
+            self.handle_error(400)
+            return
+        self.handle_success(200, notifications)
+
+    def ack_notifications(self, *args):
+        """
+        Records the delivery outcome of claimed notifications.
+        """
+        body = self.get_body()
+        try:
+            counts = sql_connector.ack_notifications(json.loads(body))
+        except (ValueError, KeyError, TypeError):
+            self.handle_error(400)
+            return
+        self.handle_success(200, counts)
+
 
 # METHOD PUT | Returns: None
 
@@ -267,7 +800,11 @@ class Server(http.server.BaseHTTPRequestHandler):
         """
         body = self.get_body()
         data = json.loads(body)
-        result = sql_connector.update_user(args[1], data)
+        try:
+            result = sql_connector.update_user(args[1], data)
+        except ValueError:
+            self.handle_error(400)
+            return
         self.handle_success(201, result)
 
     def incident_update(self, *args):
@@ -276,7 +813,11 @@ class Server(http.server.BaseHTTPRequestHandler):
         """
         body = self.get_body()
         data = json.loads(body)
-        result = sql_connector.update_incident(args[1], data)
+        try:
+            result = sql_connector.update_incident(args[1], data)
+        except ValueError:
+            self.handle_error(400)
+            return
         self.handle_success(201, result)
 
     def comment_update(self, *args):
@@ -285,7 +826,11 @@ class Server(http.server.BaseHTTPRequestHandler):
         """
         body = self.get_body()
         data = json.loads(body)
-        result = sql_connector.update_comment(args[1], data)
+        try:
+            result = sql_connector.update_comment(args[1], data)
+        except ValueError:
+            self.handle_error(400)
+            return
         self.handle_success(201, result)
 
 
@@ -302,8 +847,69 @@ class Server(http.server.BaseHTTPRequestHandler):
         self.handle_success(200, user)
 
 
+class SingleServer(Server):
+    """
+    Request handler of the "single" server mode. Answers with HTTP/1.0 and closes every
+    connection, an idle persistent client would hold the only thread until KEEPALIVE_TIMEOUT.
+    """
+    protocol_version = "HTTP/1.0"
+
+
+def create_server(host, port):
+    """
+    Creates the HTTP server selected by the BACKEND_SERVER_MODE environment variable.
+
+    Args:
+    host (str): The interface to listen on.
+    port (int): The port to listen on.
+
+    Returns:
+    http.server.HTTPServer: "single" serves one request at a time, "threaded" uses a worker pool.
+    The "async" mode is served by async_main instead, see run().
+    """
+    mode = os.getenv("BACKEND_SERVER_MODE", "threaded")
+    if mode == "single":
+        return http.server.HTTPServer((host, port), SingleServer)
+    if mode == "threaded":
+        workers = int(os.getenv("BACKEND_WORKERS", 8))
+        backlog = int(os.getenv("BACKEND_BACKLOG", 64))
+        if workers > sql_connector.POOL_MAX_SIZE:
+            print(f"BACKEND_WORKERS={workers} exceeds PSQL_POOL_MAX={sql_connector.POOL_MAX_SIZE}, "
+                  "workers will wait for database connections")
+        return ThreadPoolHTTPServer((host, port), Server, workers, backlog)
+    raise ValueError(f"Unknown BACKEND_SERVER_MODE: {mode}")
+
+
+def run(host="0.0.0.0", port=8090):
+    """
+    Applies pending schema migrations, then serves requests until SIGTERM or SIGINT
+    and drains in-flight requests.
+    """
+    if os.getenv("BACKEND_MIGRATE", "1") == "1":
+        migrate.apply_migrations()
+    if os.getenv("BACKEND_SERVER_MODE") == "async":
+        import async_main
+        async_main.run(host, port)
+        return
+    webServer = create_server(host, port)
+
+    def stop(signum, frame):
+        threading.Thread(target=webServer.shutdown).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    try:
+        webServer.serve_forever()
+    finally:
+        if events.hub is not None:
+            events.hub.close()
+        webServer.server_close()
+        pool = sql_connector.get_pool()
+        if pool is not None:
+            pool.closeall()
+
+
 if __name__ == "__main__":
     HOST = "0.0.0.0"
     PORT = int(os.getenv("PORT", 8090))
-    webServer = http.server.HTTPServer((HOST, PORT), Server)
-    webServer.serve_forever()
+    run(HOST, PORT)
@@ -0,0 +1,92 @@
+import os
+import re
+import sql_connector
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+MIGRATION_FILE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+# Serializes migrations of backend instances starting at the same time.
+MIGRATION_LOCK_ID = 7310001
+
+SCHEMA_VERSION_TABLE = '''
+CREATE TABLE IF NOT EXISTS public.t_schema_version (
+    version INTEGER PRIMARY KEY NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    applied_at TIMESTAMPTZ DEFAULT now() NOT NULL
+)
+'''
+
+
+def list_migrations(directory=MIGRATIONS_DIR):
+    """
+    Lists the migration files of a directory in version order.
+
+    Args:
+    directory (str): Directory containing NNNN_name.sql files.
+
+    Returns:
+    list: (version, name, path) tuples sorted by version.
+
+    Raises:
+    Exception: If two migrations share a version.
+    """
+    migrations = {}
+    for file_name in os.listdir(directory):
+        match = MIGRATION_FILE.match(file_name)
+        if match is None:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise Exception(f'Duplicate migration version {version}')
+        migrations[version] = (version, match.group(2), os.path.join(directory, file_name))
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def apply_migrations(directory=MIGRATIONS_DIR):
+    """
+    Applies the migrations that are not recorded in t_schema_version yet.
+    All pending migrations run in one transaction, so a failing migration leaves the schema unchanged.
+
+    Args:
+    directory (str): Directory containing the migration files.
+
+    Returns:
+    list or None: Versions applied by this call, or None if no database is configured.
+    """
+    pool = sql_connector.get_pool()
+    if pool is None:
+        return None
+    applied = []
+    with pool.connection() as connection:
+        with connection:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', (MIGRATION_LOCK_ID,))
+                cursor.execute(SCHEMA_VERSION_TABLE)
+                cursor.execute('SELECT version FROM t_schema_version')
+                done = {row[0] for row in cursor.fetchall()}
+                for version, name, path in list_migrations(directory):
+                    if version in done:
+                        continue
+                    with open(path, encoding='utf-8') as file:
+                        cursor.execute(file.read())
+                    cursor.execute(
+                        'INSERT INTO t_schema_version (version, name) VALUES (%s, %s)', (version, name))
+                    print(f'Applied migration {version:04d}_{name}')
+                    applied.append(version)
+    return applied
+
+
+def schema_version():
+    """
+    Returns the latest applied migration version.
+
+    Returns:
+    int or None: The version, or None if no migration was applied.
+    """
+    result = sql_connector.execute_query('SELECT max(version) AS version FROM t_schema_version')
+    return result[0]["version"] if result else None
+
+
+if __name__ == "__main__":
+    print(apply_migrations())
@@ -0,0 +1,25 @@
+/* === Migration 0001: indexes of the hot backend queries === */
+
+/* find_user by telegram_user_id on every bot /start */
+CREATE INDEX IF NOT EXISTS idx_t_user_telegram_user_id
+    ON public.t_user (telegram_user_id);
+
+/* list_comments_by_incident and the latest comment of an incident */
+CREATE INDEX IF NOT EXISTS idx_t_comment_incident_created_at
+    ON public.t_comment (incident_id, created_at DESC)
+    INCLUDE (incident_status, created_by);
+
+/* get_single_comment and update_comment by author */
+CREATE INDEX IF NOT EXISTS idx_t_comment_created_by
+    ON public.t_comment (created_by);
+
+/* list_incidents_by_reporter, ordered like the keyset pages */
+CREATE INDEX IF NOT EXISTS idx_t_incident_reported_by
+    ON public.t_incident (reported_by, reported_at, id);
+
+/* Keyset pages of /users and /comments */
+CREATE INDEX IF NOT EXISTS idx_t_user_created_at
+    ON public.t_user (created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_t_comment_created_at
+    ON public.t_comment (created_at, incident_id);
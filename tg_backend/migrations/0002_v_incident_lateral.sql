@@ -0,0 +1,41 @@
+/* === Migration 0002: v_incident on indexed "latest comment per incident" lookups === */
+
+/* The latest comment lookup uses idx_t_comment_incident_created_at from 0001 */
+
+/* Tags of an incident */
+CREATE INDEX IF NOT EXISTS idx_t_incident_tag_incident_id
+    ON public.t_incident_tag (incident_id, tag_id);
+
+/* Keyset pagination of incidents and views */
+CREATE INDEX IF NOT EXISTS idx_t_incident_reported_at
+    ON public.t_incident (reported_at, id);
+
+/* Status and tags are computed per selected incident only */
+CREATE OR REPLACE VIEW public.v_incident AS
+    SELECT
+    t_incident.id AS incident_id,
+    t_reporter.username AS reported_by_username,
+    t_processor.username AS processed_by_username,
+    t_incident.reported_at AS reported_at,
+    t_last_comment.created_at AS updated_at,
+    t_last_comment.incident_status AS incident_status,
+    t_incident.description AS description,
+    t_incident.urgency AS urgency,
+    t_incident.impact AS impact,
+    t_tags.tags AS tags
+    FROM public.t_incident
+    LEFT JOIN public.t_user AS t_reporter ON t_incident.reported_by = t_reporter.id
+    LEFT JOIN LATERAL (
+        SELECT created_at, created_by, incident_status
+        FROM public.t_comment
+        WHERE t_comment.incident_id = t_incident.id
+        ORDER BY created_at DESC
+        LIMIT 1
+    ) AS t_last_comment ON true
+    LEFT JOIN public.t_user AS t_processor ON t_last_comment.created_by = t_processor.id
+    LEFT JOIN LATERAL (
+        SELECT string_agg(t_tag.name, ', ') AS tags
+        FROM public.t_incident_tag
+        JOIN public.t_tag ON t_incident_tag.tag_id = t_tag.id
+        WHERE t_incident_tag.incident_id = t_incident.id
+    ) AS t_tags ON true;
@@ -0,0 +1,142 @@
+/* === Migration 0003: incrementally maintained incident dashboard === */
+
+/* One precomputed v_incident row per incident */
+CREATE TABLE
+    IF NOT EXISTS public.t_incident_dashboard (
+        incident_id UUID PRIMARY KEY NOT NULL,
+        reported_by_username VARCHAR(50),
+        processed_by_username VARCHAR(50),
+        reported_at TIMESTAMPTZ NOT NULL,
+        updated_at TIMESTAMPTZ,
+        incident_status incident_status,
+        description TEXT,
+        urgency urgency NOT NULL,
+        impact impact NOT NULL,
+        tags TEXT,
+        refreshed_at TIMESTAMPTZ DEFAULT clock_timestamp() NOT NULL,
+        CONSTRAINT fk_t_incident
+            FOREIGN KEY (incident_id)
+                REFERENCES public.t_incident (id)
+                    ON DELETE CASCADE
+    );
+
+/* Keyset pages of /views */
+CREATE INDEX IF NOT EXISTS idx_t_incident_dashboard_reported_at
+    ON public.t_incident_dashboard (reported_at, incident_id);
+
+/* Freshness watermark */
+CREATE INDEX IF NOT EXISTS idx_t_incident_dashboard_refreshed_at
+    ON public.t_incident_dashboard (refreshed_at);
+
+/* Recomputes the dashboard row of one incident from v_incident */
+CREATE OR REPLACE FUNCTION public.refresh_incident_dashboard(p_incident_id UUID)
+RETURNS void AS $$
+    INSERT INTO public.t_incident_dashboard
+    SELECT v_incident.*, clock_timestamp()
+    FROM public.v_incident
+    WHERE v_incident.incident_id = p_incident_id
+    ON CONFLICT (incident_id) DO UPDATE SET
+        reported_by_username = EXCLUDED.reported_by_username,
+        processed_by_username = EXCLUDED.processed_by_username,
+        reported_at = EXCLUDED.reported_at,
+        updated_at = EXCLUDED.updated_at,
+        incident_status = EXCLUDED.incident_status,
+        description = EXCLUDED.description,
+        urgency = EXCLUDED.urgency,
+        impact = EXCLUDED.impact,
+        tags = EXCLUDED.tags,
+        refreshed_at = EXCLUDED.refreshed_at;
+$$ LANGUAGE sql;
+
+/* Incident inserted or updated */
+CREATE OR REPLACE FUNCTION public.tr_incident_dashboard_incident()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM public.refresh_incident_dashboard(NEW.id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+/* Comment changed: status, processor and update time of its incident */
+CREATE OR REPLACE FUNCTION public.tr_incident_dashboard_comment()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM public.refresh_incident_dashboard(OLD.incident_id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND (TG_OP = 'INSERT' OR NEW.incident_id <> OLD.incident_id) THEN
+        PERFORM public.refresh_incident_dashboard(NEW.incident_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+/* Tag assigned or removed */
+CREATE OR REPLACE FUNCTION public.tr_incident_dashboard_incident_tag()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM public.refresh_incident_dashboard(OLD.incident_id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM public.refresh_incident_dashboard(NEW.incident_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+/* Tag renamed */
+CREATE OR REPLACE FUNCTION public.tr_incident_dashboard_tag()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM public.refresh_incident_dashboard(t_incident_tag.incident_id)
+    FROM public.t_incident_tag
+    WHERE t_incident_tag.tag_id = NEW.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+/* Username changed: incidents reported or last processed by the user */
+CREATE OR REPLACE FUNCTION public.tr_incident_dashboard_user()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM public.refresh_incident_dashboard(affected.incident_id)
+    FROM (
+        SELECT id AS incident_id FROM public.t_incident WHERE reported_by = NEW.id
+        UNION
+        SELECT incident_id FROM public.t_comment WHERE created_by = NEW.id
+    ) AS affected;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tr_incident_dashboard ON public.t_incident;
+CREATE TRIGGER tr_incident_dashboard
+    AFTER INSERT OR UPDATE ON public.t_incident
+    FOR EACH ROW EXECUTE FUNCTION public.tr_incident_dashboard_incident();
+
+DROP TRIGGER IF EXISTS tr_incident_dashboard ON public.t_comment;
+CREATE TRIGGER tr_incident_dashboard
+    AFTER INSERT OR UPDATE OR DELETE ON public.t_comment
+    FOR EACH ROW EXECUTE FUNCTION public.tr_incident_dashboard_comment();
+
+DROP TRIGGER IF EXISTS tr_incident_dashboard ON public.t_incident_tag;
+CREATE TRIGGER tr_incident_dashboard
+    AFTER INSERT OR UPDATE OR DELETE ON public.t_incident_tag
+    FOR EACH ROW EXECUTE FUNCTION public.tr_incident_dashboard_incident_tag();
+
+DROP TRIGGER IF EXISTS tr_incident_dashboard ON public.t_tag;
+CREATE TRIGGER tr_incident_dashboard
+    AFTER UPDATE OF name ON public.t_tag
+    FOR EACH ROW EXECUTE FUNCTION public.tr_incident_dashboard_tag();
+
+DROP TRIGGER IF EXISTS tr_incident_dashboard ON public.t_user;
+CREATE TRIGGER tr_incident_dashboard
+    AFTER UPDATE OF username ON public.t_user
+    FOR EACH ROW EXECUTE FUNCTION public.tr_incident_dashboard_user();
+
+/* Backfill */
+INSERT INTO public.t_incident_dashboard
+SELECT v_incident.*, clock_timestamp()
+FROM public.v_incident
+ON CONFLICT (incident_id) DO NOTHING;
@@ -0,0 +1,16 @@
+/* === Migration 0004: one user per Telegram id, target of the POST /users upsert === */
+
+/* Older duplicates keep the Telegram id, newer ones are detached instead of deleted with their incidents */
+UPDATE public.t_user AS u
+SET telegram_user_id = NULL
+WHERE EXISTS (
+    SELECT 1
+    FROM public.t_user AS older
+    WHERE older.telegram_user_id = u.telegram_user_id
+      AND (older.created_at, older.id) < (u.created_at, u.id)
+);
+
+DROP INDEX IF EXISTS public.idx_t_user_telegram_user_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_t_user_telegram_user_id
+    ON public.t_user (telegram_user_id);
@@ -0,0 +1,9 @@
+/* === Migration 0005: keyset indexes of the sortable dashboard columns === */
+
+/* Admin index sorted by urgency, descending pages use a backward scan */
+CREATE INDEX IF NOT EXISTS idx_t_incident_dashboard_urgency
+    ON public.t_incident_dashboard (urgency, incident_id);
+
+/* Admin index sorted by impact */
+CREATE INDEX IF NOT EXISTS idx_t_incident_dashboard_impact
+    ON public.t_incident_dashboard (impact, incident_id);
@@ -0,0 +1,38 @@
+/* === Migration 0006: change feed of incidents and comments, delivered on commit to LISTEN incident_events === */
+
+/* Incident inserted or updated */
+CREATE OR REPLACE FUNCTION public.tr_incident_events_incident()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('incident_events', json_build_object(
+        'type', 'incident',
+        'incident_id', NEW.id
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+/* Comment inserted, it may have changed the status of its incident */
+CREATE OR REPLACE FUNCTION public.tr_incident_events_comment()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('incident_events', json_build_object(
+        'type', 'comment',
+        'incident_id', NEW.incident_id,
+        'incident_status', NEW.incident_status,
+        'created_by', NEW.created_by,
+        'created_at', NEW.created_at
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tr_incident_events ON public.t_incident;
+CREATE TRIGGER tr_incident_events
+    AFTER INSERT OR UPDATE ON public.t_incident
+    FOR EACH ROW EXECUTE FUNCTION public.tr_incident_events_incident();
+
+DROP TRIGGER IF EXISTS tr_incident_events ON public.t_comment;
+CREATE TRIGGER tr_incident_events
+    AFTER INSERT ON public.t_comment
+    FOR EACH ROW EXECUTE FUNCTION public.tr_incident_events_comment();
@@ -0,0 +1,60 @@
+/* === Migration 0007: outbox of Telegram notifications, filled in the transaction of the status change === */
+
+CREATE TABLE
+    IF NOT EXISTS public.t_notification_outbox (
+        id BIGSERIAL PRIMARY KEY,
+        chat_id BIGINT NOT NULL,
+        incident_id UUID NOT NULL,
+        incident_status incident_status NOT NULL,
+        comment TEXT,
+        created_at TIMESTAMPTZ DEFAULT now() NOT NULL,
+        available_at TIMESTAMPTZ DEFAULT now() NOT NULL,
+        locked_until TIMESTAMPTZ,
+        attempts INTEGER DEFAULT 0 NOT NULL,
+        sent_at TIMESTAMPTZ,
+        failed_at TIMESTAMPTZ,
+        last_error TEXT,
+        CONSTRAINT fk_t_incident
+            FOREIGN KEY (incident_id)
+                REFERENCES public.t_incident (id)
+                    ON DELETE CASCADE
+    );
+
+/* Pending notifications in claim order, delivered and failed ones drop out of the index */
+CREATE INDEX IF NOT EXISTS idx_t_notification_outbox_pending
+    ON public.t_notification_outbox (available_at, id)
+    WHERE sent_at IS NULL AND failed_at IS NULL;
+
+/* Comment changed the status of an incident someone else reported: notify the reporter */
+CREATE OR REPLACE FUNCTION public.tr_notification_outbox_comment()
+RETURNS trigger AS $$
+BEGIN
+    INSERT INTO public.t_notification_outbox (chat_id, incident_id, incident_status, comment)
+    SELECT reporter.telegram_user_id, NEW.incident_id, NEW.incident_status, NEW.comment
+    FROM public.t_incident AS i
+    JOIN public.t_user AS reporter ON reporter.id = i.reported_by
+    WHERE i.id = NEW.incident_id
+      AND i.reported_by <> NEW.created_by
+      AND reporter.telegram_user_id IS NOT NULL
+      AND NEW.incident_status IS DISTINCT FROM (
+          SELECT previous.incident_status
+          FROM public.t_comment AS previous
+          WHERE previous.incident_id = NEW.incident_id
+            AND previous.ctid <> NEW.ctid
+          ORDER BY previous.created_at DESC
+          LIMIT 1
+      )
+      AND EXISTS (
+          SELECT 1
+          FROM public.t_comment AS previous
+          WHERE previous.incident_id = NEW.incident_id
+            AND previous.ctid <> NEW.ctid
+      );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tr_notification_outbox ON public.t_comment;
+CREATE TRIGGER tr_notification_outbox
+    AFTER INSERT ON public.t_comment
+    FOR EACH ROW EXECUTE FUNCTION public.tr_notification_outbox_comment();
@@ -0,0 +1,62 @@
+/* === Migration 0008: surrogate key of comments, orders the comments written by one statement or transaction === */
+
+/* Existing comments are numbered in creation order, new ones take the next value of the sequence */
+ALTER TABLE public.t_comment ADD COLUMN IF NOT EXISTS id BIGINT;
+
+CREATE SEQUENCE IF NOT EXISTS public.t_comment_id_seq OWNED BY public.t_comment.id;
+
+/* Numbering does not change the dashboard, its per-row trigger is skipped */
+ALTER TABLE public.t_comment DISABLE TRIGGER tr_incident_dashboard;
+
+UPDATE public.t_comment AS c
+SET id = numbered.id
+FROM (
+    SELECT ctid, row_number() OVER (ORDER BY created_at, incident_id, created_by) AS id
+    FROM public.t_comment
+    WHERE id IS NULL
+) AS numbered
+WHERE c.ctid = numbered.ctid;
+
+ALTER TABLE public.t_comment ENABLE TRIGGER tr_incident_dashboard;
+
+SELECT setval('public.t_comment_id_seq', COALESCE(max(id), 0) + 1, false) FROM public.t_comment;
+
+ALTER TABLE public.t_comment
+    ALTER COLUMN id SET DEFAULT nextval('public.t_comment_id_seq'),
+    ALTER COLUMN id SET NOT NULL;
+
+DO $$ BEGIN
+    ALTER TABLE public.t_comment ADD CONSTRAINT t_comment_pkey PRIMARY KEY (id);
+EXCEPTION
+    WHEN invalid_table_definition THEN NULL;
+END $$;
+
+/* Previous comment of an incident, looked up by the notification trigger */
+CREATE INDEX IF NOT EXISTS idx_t_comment_incident_id
+    ON public.t_comment (incident_id, id);
+
+/* Comment changed the status of an incident someone else reported: notify the reporter.
+   The previous comment is the one with the next lower id, comments inserted by the same
+   statement share now() and are only ordered by their ids. */
+CREATE OR REPLACE FUNCTION public.tr_notification_outbox_comment()
+RETURNS trigger AS $$
+BEGIN
+    INSERT INTO public.t_notification_outbox (chat_id, incident_id, incident_status, comment)
+    SELECT reporter.telegram_user_id, NEW.incident_id, NEW.incident_status, NEW.comment
+    FROM public.t_incident AS i
+    JOIN public.t_user AS reporter ON reporter.id = i.reported_by
+    JOIN LATERAL (
+        SELECT previous.incident_status
+        FROM public.t_comment AS previous
+        WHERE previous.incident_id = NEW.incident_id
+          AND previous.id < NEW.id
+        ORDER BY previous.id DESC
+        LIMIT 1
+    ) AS previous ON true
+    WHERE i.id = NEW.incident_id
+      AND i.reported_by <> NEW.created_by
+      AND reporter.telegram_user_id IS NOT NULL
+      AND previous.incident_status IS DISTINCT FROM NEW.incident_status;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
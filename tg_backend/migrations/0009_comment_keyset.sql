@@ -0,0 +1,7 @@
+/* === Migration 0009: keyset of /comments pages on the unique comment id === */
+
+/* (created_at, incident_id) is not unique, comments of one incident written by one transaction share now() */
+CREATE INDEX IF NOT EXISTS idx_t_comment_created_at_id
+    ON public.t_comment (created_at, id);
+
+DROP INDEX IF EXISTS public.idx_t_comment_created_at;
@@ -0,0 +1,46 @@
+/* === Migration 0010: comment id breaks created_at ties of the latest comment per incident === */
+
+/* Comments written by one transaction share now(), the latest one is the one with the highest id */
+CREATE INDEX IF NOT EXISTS idx_t_comment_incident_latest
+    ON public.t_comment (incident_id, created_at DESC, id DESC)
+    INCLUDE (incident_status, created_by);
+
+DROP INDEX IF EXISTS public.idx_t_comment_incident_created_at;
+
+CREATE OR REPLACE VIEW public.v_incident AS
+    SELECT
+    t_incident.id AS incident_id,
+    t_reporter.username AS reported_by_username,
+    t_processor.username AS processed_by_username,
+    t_incident.reported_at AS reported_at,
+    t_last_comment.created_at AS updated_at,
+    t_last_comment.incident_status AS incident_status,
+    t_incident.description AS description,
+    t_incident.urgency AS urgency,
+    t_incident.impact AS impact,
+    t_tags.tags AS tags
+    FROM public.t_incident
+    LEFT JOIN public.t_user AS t_reporter ON t_incident.reported_by = t_reporter.id
+    LEFT JOIN LATERAL (
+        SELECT created_at, created_by, incident_status
+        FROM public.t_comment
+        WHERE t_comment.incident_id = t_incident.id
+        ORDER BY created_at DESC, id DESC
+        LIMIT 1
+    ) AS t_last_comment ON true
+    LEFT JOIN public.t_user AS t_processor ON t_last_comment.created_by = t_processor.id
+    LEFT JOIN LATERAL (
+        SELECT string_agg(t_tag.name, ', ') AS tags
+        FROM public.t_incident_tag
+        JOIN public.t_tag ON t_incident_tag.tag_id = t_tag.id
+        WHERE t_incident_tag.incident_id = t_incident.id
+    ) AS t_tags ON true;
+
+/* Only dashboard rows of incidents with tied comments can change */
+SELECT public.refresh_incident_dashboard(tied.incident_id)
+FROM (
+    SELECT DISTINCT incident_id
+    FROM public.t_comment
+    GROUP BY incident_id, created_at
+    HAVING count(*) > 1
+) AS tied;
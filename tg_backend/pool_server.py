@@ -0,0 +1,118 @@
+import queue
+import threading
+import http.server
+
+
+REJECT_RESPONSE = b"HTTP/1.0 503 Service Unavailable\r\n" \
+    b"Content-Length: 0\r\n" \
+    b"Retry-After: 1\r\n" \
+    b"Connection: close\r\n\r\n"
+
+
+class ThreadPoolHTTPServer(http.server.HTTPServer):
+    """
+    HTTP server that hands accepted connections to a fixed set of worker threads.
+
+    Accepted connections wait in a bounded backlog; once the backlog is full new
+    connections are answered with 503 straight from the accept loop.
+    """
+
+    def __init__(self, server_address, handler_class, workers=8, backlog=64):
+        self.request_queue_size = backlog
+        self.workers = max(workers, 1)
+        self._backlog = queue.Queue(maxsize=max(backlog, 1))
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._detached = set()
+        self._counters = {"accepted": 0, "rejected": 0, "completed": 0}
+        # Set before binding: a failed bind calls server_close() from TCPServer.__init__.
+        self._threads = []
+        super().__init__(server_address, handler_class)
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"http-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def process_request(self, request, client_address):
+        """
+        Queues the connection for a worker or sheds it with 503.
+        """
+        try:
+            self._backlog.put_nowait((request, client_address))
+        except queue.Full:
+            with self._lock:
+                self._counters["rejected"] += 1
+            self.reject_request(request)
+            self.shutdown_request(request)
+            return
+        with self._lock:
+            self._counters["accepted"] += 1
+
+    def saturated(self):
+        """
+        Returns:
+        bool: True if accepted connections are waiting for a worker.
+        """
+        return not self._backlog.empty()
+
+    def detach_request(self, request):
+        """
+        Hands a connection over to another owner: its worker returns without closing it.
+        """
+        with self._lock:
+            self._detached.add(request)
+
+    def reject_request(self, request):
+        try:
+            request.sendall(REJECT_RESPONSE)
+        except OSError:
+            pass
+
+    def _work(self):
+        while True:
+            item = self._backlog.get()
+            if item is None:
+                return
+            request, client_address = item
+            with self._lock:
+                self._in_flight += 1
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                with self._lock:
+                    detached = request in self._detached
+                    self._detached.discard(request)
+                if not detached:
+                    self.shutdown_request(request)
+                with self._lock:
+                    self._in_flight -= 1
+                    self._counters["completed"] += 1
+
+    def server_close(self):
+        """
+        Stops listening, then lets the workers drain queued and in-flight requests.
+        """
+        super().server_close()
+        for _ in self._threads:
+            self._backlog.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def stats(self):
+        """
+        Returns worker and backlog counters.
+
+        Returns:
+        dict: Worker count, queued and in-flight requests and totals.
+        """
+        with self._lock:
+            result = dict(self._counters)
+            result["in_flight"] = self._in_flight
+        result["workers"] = self.workers
+        result["backlog"] = self._backlog.maxsize
+        result["queued"] = self._backlog.qsize()
+        return result
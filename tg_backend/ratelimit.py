@@ -0,0 +1,230 @@
+import os
+import hmac
+import math
+import time
+import threading
+from collections import OrderedDict
+
+RATE_LIMIT_ENABLED = os.getenv('BACKEND_RATE_LIMIT', '1') == '1'
+# Header naming the client when the backend runs behind a proxy, e.g. X-Forwarded-For; the peer address otherwise.
+RATE_LIMIT_KEY_HEADER = os.getenv('BACKEND_RATE_LIMIT_KEY_HEADER')
+# Proxies appending to the key header in front of the backend, the client is the entry they appended last.
+RATE_LIMIT_TRUSTED_HOPS = max(int(os.getenv('BACKEND_RATE_LIMIT_TRUSTED_HOPS', 1)), 1)
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv('BACKEND_RATE_LIMIT_MAX_CLIENTS', 10000))
+# Trusted internal clients as "name=key" pairs, comma separated. A request carrying a key in
+# INTERNAL_CLIENT_HEADER is charged to the internal budget of its client instead of its address.
+INTERNAL_CLIENT_HEADER = "X-Client-Key"
+INTERNAL_CLIENTS = os.getenv('BACKEND_INTERNAL_CLIENTS', '')
+
+# Route class: (tokens refilled per second, bucket size) unless overridden by BACKEND_RATE_<CLASS>="rate/burst".
+DEFAULT_BUDGETS = {
+    "read": (200.0, 400.0),
+    "list": (20.0, 50.0),
+    "write": (50.0, 100.0),
+    "batch": (2.0, 10.0),
+}
+# Budgets of one internal client, e.g. the bot serving all of its users, unless overridden by
+# BACKEND_RATE_INTERNAL_<CLASS>="rate/burst".
+DEFAULT_INTERNAL_BUDGETS = {
+    "read": (2000.0, 4000.0),
+    "list": (500.0, 1000.0),
+    "write": (500.0, 1000.0),
+    "batch": (20.0, 50.0),
+}
+
+BATCH_ROUTES = {"create_incidents", "create_comments", "change_statuses"}
+
+
+def parse_budget(value):
+    """
+    Args:
+    value (str): "rate/burst", for example "5/20".
+
+    Returns:
+    tuple: (rate, burst) as floats.
+
+    Raises:
+    ValueError: If the value is malformed or not positive.
+    """
+    rate, _, burst = value.partition("/")
+    rate = float(rate)
+    burst = float(burst) if burst else max(rate, 1.0)
+    if rate <= 0 or burst < 1:
+        raise ValueError(f"Malformed rate limit budget {value}")
+    return rate, burst
+
+
+def load_budgets(defaults=DEFAULT_BUDGETS, prefix="BACKEND_RATE_"):
+    """
+    Returns:
+    dict: (rate, burst) of every route class, the defaults overridden by the environment.
+    """
+    budgets = dict(defaults)
+    for route_class in budgets:
+        value = os.getenv(f"{prefix}{route_class.upper()}")
+        if value:
+            budgets[route_class] = parse_budget(value)
+    return budgets
+
+
+def route_class(verb, method_name):
+    """
+    Returns the budget a request is charged to: list endpoints scan many rows and cost far more
+    than point reads, batches more than single writes.
+
+    Args:
+    verb (str): The HTTP method.
+    method_name (str): The handler of the route.
+
+    Returns:
+    str: A key of DEFAULT_BUDGETS.
+    """
+    if method_name.startswith("list_"):
+        return "list"
+    if verb == "GET":
+        return "read"
+    if method_name in BATCH_ROUTES:
+        return "batch"
+    return "write"
+
+
+class RateLimiter:
+    """
+    Token buckets per client and route class, refilled continuously at the rate of the class.
+
+    Buckets of the least recently seen clients are dropped beyond max_clients, a dropped client
+    starts again with a full bucket.
+    """
+
+    def __init__(self, budgets, max_clients=RATE_LIMIT_MAX_CLIENTS, clock=time.monotonic):
+        self.budgets = budgets
+        self.max_clients = max_clients
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._clients = OrderedDict()
+        self._limited = 0
+
+    def take(self, client, route_class, cost=1.0):
+        """
+        Takes tokens for one request.
+
+        Args:
+        client (str): The client identity.
+        route_class (str): The route class of the request.
+        cost (float): Tokens the request costs.
+
+        Returns:
+        float: 0 if the request is allowed, else the seconds until enough tokens are available.
+        """
+        rate, burst = self.budgets[route_class]
+        now = self.clock()
+        with self._lock:
+            state = self._clients.get(client)
+            if state is None:
+                state = {"buckets": {}, "allowed": {}, "limited": {}}
+                self._clients[client] = state
+                while len(self._clients) > self.max_clients:
+                    self._clients.popitem(last=False)
+            else:
+                self._clients.move_to_end(client)
+            tokens, updated = state["buckets"].get(route_class, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= cost:
+                state["buckets"][route_class] = (tokens - cost, now)
+                state["allowed"][route_class] = state["allowed"].get(route_class, 0) + 1
+                return 0.0
+            state["buckets"][route_class] = (tokens, now)
+            state["limited"][route_class] = state["limited"].get(route_class, 0) + 1
+            self._limited += 1
+            return (cost - tokens) / rate
+
+    def stats(self, top=20):
+        """
+        Returns:
+        dict: Budgets, the number of tracked clients, limited requests in total and the allowed
+        and limited requests of the top clients by limited requests.
+        """
+        with self._lock:
+            clients = [(client, dict(state["allowed"]), dict(state["limited"]))
+                       for client, state in self._clients.items()]
+            limited = self._limited
+        clients.sort(key=lambda item: (sum(item[2].values()), sum(item[1].values())), reverse=True)
+        return {
+            "budgets": {name: {"rate": rate, "burst": burst} for name, (rate, burst) in self.budgets.items()},
+            "clients_tracked": len(clients),
+            "limited": limited,
+            "clients": {client: {"allowed": allowed_counts, "limited": limited_counts}
+                        for client, allowed_counts, limited_counts in clients[:top]},
+        }
+
+
+def client_identity(headers, client_address):
+    """
+    Args:
+    headers (Message): The request headers.
+    client_address (tuple or None): The peer address.
+
+    Returns:
+    str: The client a request is charged to. Entries left of the trusted proxies are sent by the
+    client itself and ignored, rotating them does not give a client a new bucket.
+    """
+    if RATE_LIMIT_KEY_HEADER:
+        value = headers.get(RATE_LIMIT_KEY_HEADER)
+        entries = [entry.strip() for entry in value.split(",") if entry.strip()] if value else []
+        if entries:
+            return entries[-min(RATE_LIMIT_TRUSTED_HOPS, len(entries))]
+    return client_address[0] if client_address else "unknown"
+
+
+def parse_internal_clients(value):
+    """
+    Args:
+    value (str): "name=key" pairs, comma separated, for example "bot=s3cret".
+
+    Returns:
+    dict: Key to client name.
+
+    Raises:
+    ValueError: If a pair is malformed.
+    """
+    clients = {}
+    for pair in value.split(","):
+        if not pair.strip():
+            continue
+        name, _, key = pair.partition("=")
+        if not name.strip() or not key.strip():
+            raise ValueError(f"Malformed internal client {pair}")
+        clients[key.strip()] = name.strip()
+    return clients
+
+
+def internal_client(headers):
+    """
+    Args:
+    headers (Message): The request headers.
+
+    Returns:
+    str or None: The name of the internal client whose key the request carries.
+    """
+    key = headers.get(INTERNAL_CLIENT_HEADER)
+    if not key:
+        return None
+    name = None
+    for known, known_name in internal_clients.items():
+        if hmac.compare_digest(key.encode(), known.encode()):
+            name = known_name
+    return name
+
+
+def retry_after(seconds):
+    """
+    Returns:
+    str: The Retry-After header value, whole seconds rounded up.
+    """
+    return str(max(1, math.ceil(seconds)))
+
+
+internal_clients = parse_internal_clients(INTERNAL_CLIENTS)
+limiter = RateLimiter(load_budgets()) if RATE_LIMIT_ENABLED else None
+internal_limiter = RateLimiter(load_budgets(DEFAULT_INTERNAL_BUDGETS, "BACKEND_RATE_INTERNAL_")) \
+    if RATE_LIMIT_ENABLED and internal_clients else None
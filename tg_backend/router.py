@@ -0,0 +1,92 @@
+import re
+import uuid
+
+# Path parameter types: the regex a path segment must match and the converter applied to it.
+PARAMETER_TYPES = {
+    "str": (r"[^/]+", str),
+    "int": (r"-?\d+", int),
+    "uuid": (r"[^/]+", lambda value: str(uuid.UUID(value))),
+}
+
+PARAMETER = re.compile(r"\{(\w+)(?::(\w+))?\}")
+
+
+class BadParameter(ValueError):
+    """
+    Raised when a path matches a route but one of its parameters has the wrong type.
+    """
+
+
+class Router:
+    """
+    Routes compiled once and indexed by HTTP method and first path segment, so that a request
+    is resolved with a dictionary lookup and at most a few regex matches.
+
+    Route templates are paths whose parameters are written as {name} or {name:type},
+    for example "/users/{user_id:uuid}". Routes without parameters take precedence.
+    """
+
+    def __init__(self, routes):
+        self.static = {}
+        self.dynamic = {}
+        for verb, table in routes.items():
+            self.static[verb] = {}
+            self.dynamic[verb] = {}
+            for template, method_name in table.items():
+                if PARAMETER.search(template) is None:
+                    self.static[verb][template] = method_name
+                    continue
+                self.dynamic[verb].setdefault(self.first_segment(template), []).append(
+                    self.compile(template) + (method_name,))
+
+    @staticmethod
+    def first_segment(path):
+        return path.split("/", 2)[1] if path.startswith("/") else ""
+
+    @staticmethod
+    def compile(template):
+        """
+        Args:
+        template (str): The route template.
+
+        Returns:
+        tuple: (compiled pattern, converters of its groups).
+        """
+        pattern = []
+        converters = []
+        position = 0
+        for match in PARAMETER.finditer(template):
+            regex, converter = PARAMETER_TYPES[match.group(2) or "str"]
+            pattern.append(re.escape(template[position:match.start()]))
+            pattern.append(f"({regex})")
+            converters.append(converter)
+            position = match.end()
+        pattern.append(re.escape(template[position:]))
+        return re.compile("".join(pattern)), tuple(converters)
+
+    def resolve(self, verb, path):
+        """
+        Finds the route of a request path.
+
+        Args:
+        verb (str): The HTTP method.
+        path (str): The path of the request URL, without the query string.
+
+        Returns:
+        tuple: (method name, converted path parameters), or (None, ()) if no route matches.
+
+        Raises:
+        BadParameter: If the path matches a route but a parameter cannot be converted.
+        """
+        method_name = self.static.get(verb, {}).get(path)
+        if method_name is not None:
+            return method_name, ()
+        for pattern, converters, method_name in self.dynamic.get(verb, {}).get(self.first_segment(path), ()):
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+            try:
+                return method_name, tuple(convert(value) for convert, value in zip(converters, match.groups()))
+            except ValueError as e:
+                raise BadParameter(f"Malformed path parameter: {e}") from None
+        return None, ()
@@ -0,0 +1,87 @@
+import os
+import enum
+import json
+import uuid
+import datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def default(obj):
+    """
+    Converts the values JSON has no type for, datetimes are formatted with TIME_FORMAT.
+
+    Raises:
+    TypeError: If the value cannot be serialized.
+    """
+    if isinstance(obj, datetime.datetime):
+        # isoformat() gives the TIME_FORMAT text for four digit years at half the cost of strftime().
+        if obj.year >= 1000:
+            return obj.isoformat(" ", "seconds")[:19]
+        return obj.strftime(TIME_FORMAT)
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class Encode(json.JSONEncoder):
+    def default(self, obj):
+        return default(obj)
+
+
+def dumps_json(obj):
+    """
+    Serializes obj to UTF-8 JSON with the standard library.
+
+    Returns:
+    bytes: The JSON document.
+    """
+    return json.dumps(obj, cls=Encode).encode('utf-8')
+
+
+def dumps_orjson(obj):
+    """
+    Serializes obj to UTF-8 JSON with orjson. Datetimes are passed to default() so they keep TIME_FORMAT,
+    UUIDs and enums are serialized natively.
+
+    Returns:
+    bytes: The JSON document.
+    """
+    return orjson.dumps(obj, default=default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+
+
+SERIALIZERS = {"json": dumps_json}
+if orjson is not None:
+    SERIALIZERS["orjson"] = dumps_orjson
+
+
+def get_serializer(name=None):
+    """
+    Returns the serializer selected by name or by the BACKEND_SERIALIZER environment variable,
+    "auto" picks orjson when it is installed.
+
+    Args:
+    name (str, optional): "auto", "orjson" or "json".
+
+    Returns:
+    callable: Function serializing an object to bytes.
+
+    Raises:
+    ValueError: If the serializer is unknown or not installed.
+    """
+    name = name or os.getenv('BACKEND_SERIALIZER', 'auto')
+    if name == "auto":
+        name = "orjson" if "orjson" in SERIALIZERS else "json"
+    if name not in SERIALIZERS:
+        raise ValueError(f"Serializer {name} is not available")
+    return SERIALIZERS[name]
+
+
+dumps = get_serializer()
@@ -1,7 +1,17 @@
 import os
+import re
 import json
+import time
+import uuid
+import base64
+import datetime
+import itertools
+import threading
+import contextlib
 import psycopg2
+import psycopg2.errors
 import psycopg2.extras
+from cache import TTLCache, cached
 
 
 def get_vcap_fields(service_name, fields):
@@ -29,9 +39,351 @@ def get_vcap_fields(service_name, fields):
     return None
 
 
+PLACEHOLDER = re.compile(r"%s")
+
+
+def to_native_placeholders(query):
+    """
+    Converts psycopg2 "%s" placeholders into PostgreSQL "$1", "$2", ... placeholders,
+    as used by PREPARE and asyncpg.
+
+    Args:
+    query (str): The SQL query using "%s" placeholders.
+
+    Returns:
+    str: The SQL query using numbered placeholders.
+    """
+    counter = iter(range(1, query.count("%s") + 1))
+    return PLACEHOLDER.sub(lambda match: f"${next(counter)}", query)
+
+
+class PoolTimeout(Exception):
+    """
+    Raised when no connection becomes available within the pool timeout.
+    """
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of PostgreSQL connections.
+
+    Connections are opened lazily up to `maxconn`, health-checked when they are
+    checked out after being idle and recycled once they exceed `max_lifetime`.
+    Callers that cannot get a connection wait up to `timeout` seconds.
+    """
+
+    def __init__(self, dsn, minconn=1, maxconn=10, timeout=30.0,
+                 max_lifetime=1800.0, healthcheck_idle=30.0):
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = max(maxconn, 1)
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.healthcheck_idle = healthcheck_idle
+        self.pid = os.getpid()
+        self._cond = threading.Condition()
+        self._idle = []
+        self._in_use = {}
+        # Names of the statements prepared on every open connection, see prepare().
+        self._prepared = {}
+        self._size = 0
+        self._counters = {
+            "checkouts": 0,
+            "connects": 0,
+            "discarded": 0,
+            "prepares": 0,
+            "timeouts": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+        for _ in range(min(minconn, self.maxconn)):
+            try:
+                connection = self._connect()
+            except Exception as e:
+                print('Error', e)
+                break
+            self._size += 1
+            now = time.monotonic()
+            self._idle.append((connection, now, now))
+
+    def _connect(self):
+        connection = psycopg2.connect(self.dsn)
+        with self._cond:
+            self._counters["connects"] += 1
+        return connection
+
+    def _checkout(self, deadline):
+        """
+        Takes an idle connection or reserves a slot for a new one.
+
+        Returns:
+        tuple: (connection, created_at, idle_since); connection is None when a new one must be opened.
+        """
+        with self._cond:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.maxconn:
+                    self._size += 1
+                    return None, None, None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters["timeouts"] += 1
+                    raise PoolTimeout(
+                        f'No connection available within {self.timeout}s')
+                self._cond.wait(remaining)
+
+    def _is_healthy(self, connection, created_at, idle_since):
+        if connection.closed:
+            return False
+        now = time.monotonic()
+        if self.max_lifetime and now - created_at > self.max_lifetime:
+            return False
+        if now - idle_since > self.healthcheck_idle:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                connection.rollback()
+            except Exception:
+                return False
+        return True
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._prepared.pop(id(connection), None)
+            self._size -= 1
+            self._counters["discarded"] += 1
+            self._cond.notify()
+
+    def getconn(self):
+        """
+        Checks a connection out of the pool, waiting if all of them are in use.
+
+        Returns:
+        connection: A healthy psycopg2 connection.
+
+        Raises:
+        PoolTimeout: If no connection became available in time.
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+        while True:
+            connection, created_at, idle_since = self._checkout(deadline)
+            if connection is None:
+                try:
+                    connection = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                created_at = time.monotonic()
+            elif not self._is_healthy(connection, created_at, idle_since):
+                self._close(connection)
+                continue
+            waited = time.monotonic() - started
+            with self._cond:
+                self._in_use[id(connection)] = created_at
+                self._counters["checkouts"] += 1
+                self._counters["wait_time_total"] += waited
+                self._counters["wait_time_max"] = max(
+                    self._counters["wait_time_max"], waited)
+            return connection
+
+    def putconn(self, connection, discard=False):
+        """
+        Returns a connection to the pool, closing it if it is broken or expired.
+
+        Args:
+        connection: The connection obtained from getconn().
+        discard (bool): Close the connection instead of reusing it.
+
+        Returns:
+        None
+        """
+        with self._cond:
+            created_at = self._in_use.pop(id(connection), None)
+        if created_at is None:
+            return
+        if not discard and not connection.closed:
+            try:
+                if connection.info.transaction_status != \
+                        psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            except Exception:
+                discard = True
+        if discard or connection.closed \
+                or (self.max_lifetime and time.monotonic() - created_at > self.max_lifetime):
+            self._close(connection)
+            return
+        with self._cond:
+            self._idle.append((connection, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def prepare(self, connection, cursor, name, query):
+        """
+        Prepares a statement on a checked out connection unless it already was. Prepared
+        statements live as long as the session, a rollback does not drop them.
+
+        Args:
+        connection: The connection obtained from getconn().
+        cursor: A cursor of the connection.
+        name (str): The statement name.
+        query (str): The SQL query, using "%s" placeholders.
+        """
+        with self._cond:
+            prepared = self._prepared.setdefault(id(connection), set())
+        if name in prepared:
+            return
+        cursor.execute(f"PREPARE {name} AS {to_native_placeholders(query)}")
+        with self._cond:
+            prepared.add(name)
+            self._counters["prepares"] += 1
+
+    @contextlib.contextmanager
+    def connection(self):
+        """
+        Context manager that checks a connection out and always returns it.
+        Connections that failed at the protocol level are discarded.
+        """
+        connection = self.getconn()
+        broken = False
+        try:
+            yield connection
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.putconn(connection, discard=broken)
+
+    def stats(self):
+        """
+        Returns pool usage counters.
+
+        Returns:
+        dict: Pool size, in-use and idle connections and wait time statistics.
+        """
+        with self._cond:
+            result = dict(self._counters)
+            result.update({
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                "size": self._size,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+            })
+        checkouts = result["checkouts"]
+        result["wait_time_avg"] = result["wait_time_total"] / checkouts if checkouts else 0.0
+        return result
+
+    def closeall(self):
+        """
+        Closes every idle connection.
+        """
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for connection, _, _ in idle:
+            self._close(connection)
+
+
+PSQL = get_vcap_fields('psql', ['credentials'])
+DATABASE_URI = PSQL['credentials']['uri'] if PSQL is not None else None
+
+POOL_MIN_SIZE = int(os.getenv('PSQL_POOL_MIN', 1))
+POOL_MAX_SIZE = int(os.getenv('PSQL_POOL_MAX', 10))
+POOL_TIMEOUT = float(os.getenv('PSQL_POOL_TIMEOUT', 30))
+POOL_MAX_LIFETIME = float(os.getenv('PSQL_POOL_MAX_LIFETIME', 1800))
+POOL_HEALTHCHECK_IDLE = float(os.getenv('PSQL_POOL_HEALTHCHECK_IDLE', 30))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Returns the process-wide connection pool, creating it on first use.
+    A new pool is created after fork so processes never share sockets.
+
+    Returns:
+    ConnectionPool or None: The pool, or None if no database is configured.
+    """
+    global _pool
+    if DATABASE_URI is None:
+        return None
+    pool = _pool
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = ConnectionPool(
+                DATABASE_URI, POOL_MIN_SIZE, POOL_MAX_SIZE, POOL_TIMEOUT,
+                POOL_MAX_LIFETIME, POOL_HEALTHCHECK_IDLE)
+        return _pool
+
+
+def pool_stats():
+    """
+    Returns statistics of the connection pool.
+
+    Returns:
+    dict or None: Pool statistics, or None if no database is configured.
+    """
+    pool = get_pool()
+    return pool.stats() if pool is not None else None
+
+
+CACHE_ENABLED = os.getenv('BACKEND_CACHE_ENABLED', '1') == '1'
+CACHE_SIZE = int(os.getenv('BACKEND_CACHE_SIZE', 1024))
+CACHE_TTL = float(os.getenv('BACKEND_CACHE_TTL', 30))
+
+# Single-entity reads, invalidated by the writes of this process and expired after CACHE_TTL.
+cache = TTLCache(CACHE_SIZE, CACHE_TTL) if CACHE_ENABLED else None
+
+
+def cache_stats():
+    """
+    Returns statistics of the read cache.
+
+    Returns:
+    dict or None: Cache statistics, or None if the cache is disabled.
+    """
+    return cache.stats() if cache is not None else None
+
+
+def invalidate_incident(incident_id):
+    """
+    Drops the cached incident and incident view after a write.
+
+    Args:
+    incident_id (str or UUID): The incident id, in any form uuid.UUID() accepts. Cache keys hold
+    the canonical form the router produces.
+    """
+    if cache is None:
+        return
+    try:
+        incident_id = str(uuid.UUID(str(incident_id)))
+    except ValueError:
+        return
+    cache.invalidate(("incident", incident_id))
+    cache.invalidate(("view", incident_id))
+
+
+def invalidate_users():
+    """
+    Drops cached users and the views showing user names after a user write.
+    """
+    if cache is not None:
+        cache.invalidate_kind("user")
+        cache.invalidate_kind("view")
+
+
 def execute_query(query, parameters=None):
     """
-    Executes the given SQL query with optional parameters.
+    Executes the given SQL query with optional parameters on a pooled connection.
 
     Args:
     query (str): The SQL query to execute.
@@ -40,170 +392,1017 @@ def execute_query(query, parameters=None):
     Returns:
     list or None: Result set of the query execution if successful, else None.
     """
-    psql = get_vcap_fields('psql', ['credentials'])
-    if psql is not None:
-        uri = psql['credentials']['uri']
+    pool = get_pool()
+    if pool is None:
+        return None
+    try:
+        connection = pool.getconn()
+    except Exception as e:
+        print(f'Error', e)
+        return None
+    broken = False
+    try:
+        with connection:
+            with connection.cursor(
+                    cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                if parameters:
+                    cursor.execute(query, parameters)
+                else:
+                    cursor.execute(query)
+                return cursor.fetchall()
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
+    finally:
+        pool.putconn(connection, discard=broken)
+
+
+# Server-side prepared statements have to be turned off behind a pooler in transaction mode.
+PREPARED_STATEMENTS = os.getenv('PSQL_PREPARED_STATEMENTS', '1') == '1'
+
+VIEW_DETAIL_QUERY = """
+    SELECT d.*,
+        c.id AS comment_id,
+        c.created_by AS comment_created_by,
+        c.created_at AS comment_created_at,
+        c.incident_status AS comment_incident_status,
+        c.comment AS comment_comment
+    FROM t_incident_dashboard AS d
+    LEFT JOIN t_comment AS c ON c.incident_id = d.incident_id
+    WHERE d.incident_id = %s
+    ORDER BY c.created_at, c.id
+"""
+
+# Registry of the repeated point queries, executed by name so that they are planned once per connection.
+STATEMENTS = {
+    "get_single_user": 'SELECT * FROM t_user WHERE id = %s',
+    "get_single_incident": 'SELECT * FROM t_incident WHERE id = %s',
+    "get_single_comment": 'SELECT * FROM t_comment WHERE created_by = %s',
+    "get_single_view": 'SELECT * FROM t_incident_dashboard WHERE incident_id = %s',
+    "get_view_detail": VIEW_DETAIL_QUERY,
+    "get_views_watermark": 'SELECT max(refreshed_at) AS refreshed_at FROM t_incident_dashboard',
+}
+
+
+def execute_statement(name, parameters=None):
+    """
+    Executes a statement of the registry, prepared on the pooled connection the first time
+    the connection runs it.
+
+    Args:
+    name (str): A key of STATEMENTS.
+    parameters (tuple, optional): Parameters for the statement.
+
+    Returns:
+    list or None: Result set of the statement if successful, else None.
+    """
+    query = STATEMENTS[name]
+    if not PREPARED_STATEMENTS:
+        return execute_query(query, parameters)
+    pool = get_pool()
+    if pool is None:
+        return None
+    parameters = tuple(parameters or ())
+    execute = f"EXECUTE {name} ({', '.join(['%s'] * len(parameters))})" if parameters else f"EXECUTE {name}"
+    for attempt in range(2):
         try:
-            connection = psycopg2.connect(uri)
-            cursor = connection.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor)
+            connection = pool.getconn()
         except Exception as e:
             print(f'Error', e)
-        else:
+            return None
+        broken = False
+        try:
             with connection:
-                with cursor:
-                    if parameters:
-                        cursor.execute(query, parameters)
-                    else:
-                        cursor.execute(query)
+                with connection.cursor(
+                        cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                    pool.prepare(connection, cursor, name, query)
+                    cursor.execute(execute, parameters)
                     return cursor.fetchall()
+        except psycopg2.errors.FeatureNotSupported:
+            # "cached plan must not change result type": a migration changed the table under
+            # the prepared statement, the connection is replaced and the statement prepared again.
+            broken = True
+            if attempt:
+                raise
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            pool.putconn(connection, discard=broken)
 
 
-def find_user(key, value):
+class Transaction:
+    """
+    Unit of work: statements executed on one pooled connection and committed together.
     """
-    Searches for a user in the database based on the given key and value.
 
-    Args:
-    key (str): The column name to search by.
-    value (str): The value to search for.
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, query, parameters=None):
+        """
+        Executes a statement of the transaction.
+
+        Args:
+        query (str): The SQL query to execute.
+        parameters (tuple, optional): Parameters for the query.
+
+        Returns:
+        list: Result set of the statement, empty if it returns no rows.
+        """
+        with self.connection.cursor(
+                cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            cursor.execute(query, parameters or None)
+            return cursor.fetchall() if cursor.description is not None else []
+
+    def execute_values(self, query, rows):
+        """
+        Executes a statement with a single "VALUES %s" placeholder for all the given rows at once.
+
+        Args:
+        query (str): The SQL query containing "VALUES %s".
+        rows (list): Tuples of column values.
+
+        Returns:
+        list: Rows returned by the statement, in the order of the given rows.
+        """
+        with self.connection.cursor(
+                cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            return psycopg2.extras.execute_values(
+                cursor, query, rows, page_size=max(len(rows), 1), fetch=True)
+
+    @contextlib.contextmanager
+    def savepoint(self):
+        """
+        Context manager that rolls the transaction back to the start of the block when it raises,
+        keeping the statements executed before.
+        """
+        self.execute("SAVEPOINT batch_item")
+        try:
+            yield
+        except psycopg2.Error:
+            self.execute("ROLLBACK TO SAVEPOINT batch_item")
+            raise
+        self.execute("RELEASE SAVEPOINT batch_item")
+
+
+@contextlib.contextmanager
+def transaction():
+    """
+    Context manager yielding a Transaction that is committed when the block exits normally
+    and rolled back when it raises.
 
-    Returns:
-    list or None: Result set of the user search if successful, else None.
-    
     Raises:
-    Exception: If an unexpected column name is provided.
+    PoolTimeout: If no database is configured or no connection is free in time.
+    """
+    pool = get_pool()
+    if pool is None:
+        raise PoolTimeout("No database configured")
+    with pool.connection() as connection:
+        with connection:
+            yield Transaction(connection)
+
+
+STREAM_BATCH_SIZE = int(os.getenv('BACKEND_STREAM_BATCH_SIZE', 500))
+
+
+def stream_query(query, parameters=None, batch_size=STREAM_BATCH_SIZE):
+    """
+    Executes the given SQL query through a server-side cursor and yields the rows batch by batch,
+    so that only one batch is held in memory at a time. The pooled connection is held until the
+    generator is exhausted or closed.
+
+    Args:
+    query (str): The SQL query to execute.
+    parameters (tuple, optional): Parameters for the query.
+    batch_size (int): Rows fetched from the server per round-trip.
+
+    Yields:
+    dict: One row of the result set.
     """
-    if key not in ('first_name', 'last_name', 'username', 'telegram_user_id',):
-        raise Exception('Unexpected Column Name')
-    return execute_query(f'SELECT * FROM t_user WHERE {key} = %s', (value,))
+    pool = get_pool()
+    if pool is None:
+        return
+    with pool.connection() as connection:
+        with connection:
+            with connection.cursor(
+                    name=f"stream_{uuid.uuid4().hex}",
+                    cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(query, parameters)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
 
 
 # ===============#
 #   METHOD GET   #
 # ===============#
 
-def list_users():
-    return execute_query('SELECT * FROM t_user')
+@cached(cache, "user")
+def get_single_user(user_id):
+    return execute_statement("get_single_user", (user_id,))
 
 
-def get_single_user(user_id):
-    return execute_query('SELECT * FROM t_user WHERE id = %s', (user_id,))
+@cached(cache, "incident")
+def get_single_incident(incident_id):
+    return execute_statement("get_single_incident", (incident_id,))
 
 
-def list_incidents():
-    return execute_query('SELECT * FROM t_incident')
+def get_single_comment(comment_id):
+    return execute_statement("get_single_comment", (comment_id,))
 
 
-def get_single_incident(incident_id):
-    return execute_query('SELECT * FROM t_incident WHERE id = %s', (incident_id,))
+@cached(cache, "view")
+def get_single_view(view_id):
+    return execute_statement("get_single_view", (view_id,))
 
 
-def list_comments():
-    return execute_query('SELECT * FROM t_comment')
+def get_views_watermark():
+    return execute_statement("get_views_watermark")
 
 
-def list_comments_by_incident(incident_id):
-    return execute_query('SELECT * FROM t_comment WHERE incident_id = %s', (incident_id,))
 
+def split_view_detail(rows):
+    """
+    Splits the rows of VIEW_DETAIL_QUERY, one per comment, into the incident view and its comments.
 
-def get_single_comment(comment_id):
-    return execute_query('SELECT * FROM t_comment WHERE created_by = %s', (comment_id,))
+    Args:
+    rows (list): Rows of the query.
 
+    Returns:
+    dict or None: {"incident": view, "comments": [comment, ...]}, or None if the incident does not exist.
+    """
+    if not rows:
+        return None
+    incident = {key: value for key, value in rows[0].items() if not key.startswith("comment_")}
+    comments = [
+        {
+            "id": row["comment_id"],
+            "created_by": row["comment_created_by"],
+            "incident_id": incident["incident_id"],
+            "created_at": row["comment_created_at"],
+            "incident_status": row["comment_incident_status"],
+            "comment": row["comment_comment"],
+        }
+        for row in rows if row["comment_id"] is not None
+    ]
+    return {"incident": incident, "comments": comments}
 
-def list_views():
-    return execute_query('SELECT * FROM v_incident')
 
+def get_view_detail(incident_id):
+    """
+    Reads an incident view together with its comments in one query.
 
-def get_single_view(view_id):
-    return execute_query('SELECT * FROM v_incident WHERE incident_id = %s', (view_id,))
+    Args:
+    incident_id (str): The incident id.
+
+    Returns:
+    dict or None: {"incident": view, "comments": [comment, ...]}, or None if the incident does not exist.
+    """
+    return split_view_detail(execute_statement("get_view_detail", (incident_id,)))
+
+
+# ===============#
+#   PAGINATION   #
+# ===============#
+
+MAX_PAGE_SIZE = int(os.getenv('BACKEND_MAX_PAGE_SIZE', 500))
+
+# Keyset columns of every listable relation: a timestamp and a tie-breaking id.
+PAGE_KEYS = {
+    "t_user": ("created_at", "id"),
+    "t_incident": ("reported_at", "id"),
+    "t_comment": ("created_at", "id"),
+    "v_incident": ("reported_at", "incident_id"),
+    "t_incident_dashboard": ("reported_at", "incident_id"),
+}
+
+# Query parameters accepted as filters, mapped to the filtered column.
+PAGE_FILTERS = {
+    "t_user": {"username": "username"},
+    "t_incident": {"reported_by": "reported_by", "urgency": "urgency", "impact": "impact"},
+    "t_comment": {"incident_id": "incident_id", "created_by": "created_by", "status": "incident_status"},
+    "v_incident": {"status": "incident_status", "urgency": "urgency", "impact": "impact"},
+    "t_incident_dashboard": {"status": "incident_status", "urgency": "urgency", "impact": "impact"},
+}
+
+
+# Columns a relation can be sorted by besides its timestamp, they must be NOT NULL to work as a keyset.
+PAGE_SORTS = {
+    "t_incident": {"urgency": "urgency", "impact": "impact"},
+    "v_incident": {"urgency": "urgency", "impact": "impact"},
+    "t_incident_dashboard": {"urgency": "urgency", "impact": "impact"},
+}
+
+
+def page_key(relation, sort=None):
+    """
+    Returns the keyset columns of a relation sorted by sort.
+
+    Args:
+    relation (str): One of the PAGE_KEYS relations.
+    sort (str, optional): A PAGE_SORTS name or the timestamp column, the timestamp column by default.
+
+    Returns:
+    tuple: (sort column, tie-breaking id column).
+
+    Raises:
+    ValueError: If the relation cannot be sorted by sort.
+    """
+    time_column, id_column = PAGE_KEYS[relation]
+    if sort is None or sort == time_column:
+        return time_column, id_column
+    column = PAGE_SORTS.get(relation, {}).get(sort)
+    if column is None:
+        raise ValueError('Unexpected sort')
+    return column, id_column
+
+
+def encode_cursor(relation, row, sort=None):
+    """
+    Encodes the keyset position of a row into an opaque cursor.
+
+    Args:
+    relation (str): The relation the row belongs to.
+    row (dict): The last row of a page.
+    sort (str, optional): The sort of the page.
+
+    Returns:
+    str: URL-safe cursor.
+    """
+    values = []
+    for column in page_key(relation, sort):
+        value = row[column]
+        if isinstance(value, datetime.datetime):
+            value = value.isoformat()
+        elif not isinstance(value, int):
+            value = str(value)
+        values.append(value)
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, timestamp=True):
+    """
+    Decodes a cursor produced by encode_cursor().
+
+    Args:
+    cursor (str): The cursor.
+    timestamp (bool): Whether the first keyset value is a timestamp.
+
+    Returns:
+    list: Keyset values, a timestamp parsed into a datetime.
+
+    Raises:
+    ValueError: If the cursor is malformed.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError('Malformed cursor')
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError('Malformed cursor')
+    if not timestamp:
+        return values
+    try:
+        return [datetime.datetime.fromisoformat(values[0]), values[1]]
+    except (TypeError, ValueError):
+        raise ValueError('Malformed cursor')
+
+
+def build_page_query(relation, filters=None, limit=None, after=None,
+                     since=None, until=None, order="asc", sort=None):
+    """
+    Builds a keyset paginated SELECT over a relation.
+
+    Args:
+    relation (str): One of the PAGE_KEYS relations.
+    filters (dict, optional): Filter name to a list of accepted values.
+    limit (int, optional): Maximum rows in the page, capped at MAX_PAGE_SIZE.
+    after (str, optional): Cursor of the previous page.
+    since (datetime, optional): Inclusive lower bound of the timestamp column.
+    until (datetime, optional): Exclusive upper bound of the timestamp column.
+    order (str): "asc" or "desc" by the sort column.
+    sort (str, optional): Sort column, see page_key().
+
+    Returns:
+    tuple: (query, parameters), the query fetches one row more than the limit.
+
+    Raises:
+    ValueError: If a filter, the order, the sort or the cursor is not valid.
+    """
+    time_column = PAGE_KEYS[relation][0]
+    sort_column, id_column = page_key(relation, sort)
+    if order not in ("asc", "desc"):
+        raise ValueError('Unexpected order')
+    conditions = []
+    parameters = []
+    for name, values in (filters or {}).items():
+        column = PAGE_FILTERS[relation].get(name)
+        if column is None:
+            raise ValueError('Unexpected filter')
+        conditions.append(f"{column} IN ({', '.join(['%s'] * len(values))})")
+        parameters.extend(values)
+    if since is not None:
+        conditions.append(f"{time_column} >= %s")
+        parameters.append(since)
+    if until is not None:
+        conditions.append(f"{time_column} < %s")
+        parameters.append(until)
+    if after is not None:
+        comparison = ">" if order == "asc" else "<"
+        conditions.append(f"({sort_column}, {id_column}) {comparison} (%s, %s)")
+        parameters.extend(decode_cursor(after, timestamp=sort_column == time_column))
+    query = f"SELECT * FROM {relation}"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {sort_column} {order.upper()}, {id_column} {order.upper()}"
+    if limit is not None:
+        query += " LIMIT %s"
+        parameters.append(min(limit, MAX_PAGE_SIZE) + 1)
+    return query, tuple(parameters)
+
+
+def split_page(relation, rows, limit=None, sort=None):
+    """
+    Trims the extra row fetched by build_page_query() and derives the next cursor.
+
+    Args:
+    relation (str): The paginated relation.
+    rows (list): Rows returned by the page query.
+    limit (int, optional): The requested limit.
+    sort (str, optional): The sort of the page.
+
+    Returns:
+    tuple: (rows, next_cursor), next_cursor is None on the last page.
+    """
+    if limit is None or rows is None:
+        return rows, None
+    limit = min(limit, MAX_PAGE_SIZE)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(relation, rows[-1], sort)
+
+
+def list_page(relation, **kwargs):
+    """
+    Lists one keyset page of a relation, see build_page_query() for the arguments.
+
+    Returns:
+    tuple: (rows, next_cursor).
+    """
+    rows = execute_query(*build_page_query(relation, **kwargs))
+    return split_page(relation, rows, kwargs.get("limit"), kwargs.get("sort"))
+
+
+def stream_page(relation, **kwargs):
+    """
+    Streams the rows of a relation, see build_page_query() for the arguments.
+    The limit, if any, bounds the stream and no next cursor is produced.
+
+    Returns:
+    iterator: Rows of the relation.
+    """
+    rows = stream_query(*build_page_query(relation, **kwargs))
+    if kwargs.get("limit") is None:
+        return rows
+    return _take(rows, min(kwargs["limit"], MAX_PAGE_SIZE))
+
+
+def _take(rows, count):
+    with contextlib.closing(rows):
+        yield from itertools.islice(rows, count)
 
-def list_incidents_by_reporter(reporter_id):
-    return execute_query('SELECT * FROM t_incident WHERE reported_by = %s', (reporter_id,))
 
 # ===============#
 #   METHOD POST  #
 # ===============#
 
-def create_user(data):
-    required_fields = ["username", "first_name",
-                       "last_name", "telegram_user_id"]
+USER_REQUIRED_FIELDS = ["username", "first_name", "last_name", "telegram_user_id"]
+INCIDENT_REQUIRED_FIELDS = ["reported_by", "description", "urgency", "impact"]
+COMMENT_REQUIRED_FIELDS = ["created_by", "incident_id", "incident_status", "comment"]
+
+# Columns request bodies may write, in the order they appear in the generated statements.
+WRITABLE_COLUMNS = {
+    "t_user": ("username", "first_name", "last_name", "telegram_user_id"),
+    "t_incident": ("reported_by", "reported_at", "description", "urgency", "impact"),
+    "t_comment": ("created_by", "incident_id", "created_at", "incident_status", "comment"),
+}
 
-    if all(field in data for field in required_fields):
-        columns = ", ".join(data.keys())
-        placeholders = ", ".join(["%s"] * len(data))
 
-        query = f"INSERT INTO t_user ({columns}) VALUES ({placeholders}) RETURNING id"
+def writable_columns(table, data):
+    """
+    Returns the columns of data in a stable order, so that equal sets of columns always
+    produce the same statement text.
 
-        parameters = tuple(data.values())
+    Args:
+    table (str): A key of WRITABLE_COLUMNS.
+    data (dict): Column values from a request body.
 
-        return execute_query(query, parameters)
-    else:
+    Returns:
+    list: The columns of data.
+
+    Raises:
+    ValueError: If data is empty or holds a column that is not writable.
+    """
+    if not isinstance(data, dict) or not data:
+        raise ValueError('No columns')
+    allowed = WRITABLE_COLUMNS[table]
+    unknown = [column for column in data if column not in allowed]
+    if unknown:
+        raise ValueError(f'Unexpected Column Name {unknown}')
+    return [column for column in allowed if column in data]
+
+
+def parse_timestamps(data):
+    """
+    Parses the ISO 8601 strings of the *_at columns, asyncpg only binds datetimes to timestamptz.
+
+    Args:
+    data (dict): Column values from a request body.
+
+    Returns:
+    dict: The column values with datetimes for the timestamps.
+
+    Raises:
+    ValueError: If a timestamp is malformed.
+    """
+    return {column: datetime.datetime.fromisoformat(value)
+            if column.endswith("_at") and isinstance(value, str) else value
+            for column, value in data.items()}
+
+
+def build_insert(table, data, required_fields, returning="*"):
+    """
+    Builds an INSERT statement for the given row.
+
+    Args:
+    table (str): The table to insert into.
+    data (dict): Column values of the new row.
+    required_fields (list): Columns that must be present in data.
+    returning (str): The RETURNING clause.
+
+    Returns:
+    tuple or None: (query, parameters), or None if a required field is missing or a column is not writable.
+    """
+    if not isinstance(data, dict) or not all(field in data for field in required_fields):
+        return None
+    try:
+        columns = writable_columns(table, data)
+        data = parse_timestamps(data)
+    except ValueError:
         return None
+    placeholders = ", ".join(["%s"] * len(columns))
+    query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) RETURNING {returning}"
+    return query, tuple(data[column] for column in columns)
 
 
-def create_incident(data):
-    required_fields = ["reported_by", "description", "urgency", "impact"]
+def build_upsert_user(data):
+    """
+    Builds an INSERT of the user that returns the existing row when the Telegram id is already known.
 
-    if all(field in data for field in required_fields):
-        columns = ", ".join(data.keys())
-        placeholders = ", ".join(["%s"] * len(data))
+    Args:
+    data (dict): Column values of the user.
 
-        query = f"INSERT INTO t_incident ({columns}) VALUES ({placeholders}) RETURNING *"
+    Returns:
+    tuple or None: (query, parameters), or None if a required field is missing.
+    """
+    statement = build_insert("t_user", data, USER_REQUIRED_FIELDS, "id, (xmax = 0) AS created")
+    if statement is None:
+        return None
+    query, parameters = statement
+    head, returning = query.split(" RETURNING ")
+    query = (f"{head} ON CONFLICT (telegram_user_id) "
+             f"DO UPDATE SET telegram_user_id = EXCLUDED.telegram_user_id RETURNING {returning}")
+    return query, parameters
 
-        parameters = tuple(data.values())
 
-        return execute_query(query, parameters)
-    else:
+def upsert_user(data):
+    """
+    Creates the user unless a user with the same Telegram id exists, in one statement.
+
+    Args:
+    data (dict): Column values of the user.
+
+    Returns:
+    tuple or None: (rows with the user id, True if the user was created), or None if a required field is missing.
+    """
+    statement = build_upsert_user(data)
+    if statement is None:
+        return None
+    result = execute_query(*statement)
+    if not result:
+        return None
+    created = result[0].pop("created")
+    return result, created
+
+
+def build_create_incident(data, status="Open"):
+    """
+    Builds one statement inserting the incident together with its initial status comment.
+
+    Args:
+    data (dict): Column values of the new incident.
+    status (str): Status of the initial comment.
+
+    Returns:
+    tuple or None: (query, parameters) returning the incident row, or None if a required field is missing.
+    """
+    statement = build_insert("t_incident", data, INCIDENT_REQUIRED_FIELDS)
+    if statement is None:
+        return None
+    query, parameters = statement
+    query = (f"WITH incident AS ({query}), "
+             "initial_status AS ("
+             "INSERT INTO t_comment (created_by, incident_id, incident_status, comment) "
+             "SELECT reported_by, id, %s, '' FROM incident) "
+             "SELECT * FROM incident")
+    return query, parameters + (status,)
+
+
+def create_incident(data):
+    statement = build_create_incident(data)
+    if statement is None:
         return None
+    with transaction() as tx:
+        return tx.execute(*statement)
 
 
 def create_comment(data):
-    required_fields = ["created_by", "incident_id",
-                       "incident_status", "comment"]
+    statement = build_insert("t_comment", data, COMMENT_REQUIRED_FIELDS)
+    if statement is None:
+        return None
+    result = execute_query(*statement)
+    invalidate_incident(data["incident_id"])
+    return result
 
-    if all(field in data for field in required_fields):
-        columns = ", ".join(data.keys())
-        placeholders = ", ".join(["%s"] * len(data))
 
-        query = f"INSERT INTO t_comment ({columns}) VALUES ({placeholders}) RETURNING *"
+MAX_BATCH_SIZE = int(os.getenv('BACKEND_MAX_BATCH_SIZE', 1000))
 
-        parameters = tuple(data.values())
+INCIDENT_BATCH_FIELDS = INCIDENT_REQUIRED_FIELDS + ["reported_at"]
+COMMENT_BATCH_FIELDS = COMMENT_REQUIRED_FIELDS + ["created_at"]
 
-        return execute_query(query, parameters)
-    else:
+# Errors of a single batch item, other errors abort the whole batch.
+ITEM_ERRORS = (psycopg2.DataError, psycopg2.IntegrityError)
+
+
+def batch_error(index, error, status=400):
+    return {"index": index, "status": status, "error": error}
+
+
+def group_batch(items, required_fields, allowed_fields):
+    """
+    Validates the items of a batch and groups the valid ones by their set of columns,
+    so that every group can be inserted by one multi-row statement.
+
+    Args:
+    items (list): Column values of the rows to insert.
+    required_fields (list): Columns every item must have.
+    allowed_fields (list): Columns an item may have.
+
+    Returns:
+    tuple: (results, groups), results holds an error for every invalid item and None for the others,
+    groups maps a tuple of columns to a list of (index, values).
+
+    Raises:
+    ValueError: If the batch is not a list or is larger than MAX_BATCH_SIZE.
+    """
+    if not isinstance(items, list):
+        raise ValueError("Batch must be a list")
+    if len(items) > MAX_BATCH_SIZE:
+        raise ValueError(f"Batch is limited to {MAX_BATCH_SIZE} items")
+    results = [None] * len(items)
+    groups = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = batch_error(index, "Item must be an object")
+            continue
+        missing = [field for field in required_fields if field not in item]
+        unknown = [field for field in item if field not in allowed_fields]
+        if missing or unknown:
+            results[index] = batch_error(index, f"Missing fields: {missing}, unknown fields: {unknown}")
+            continue
+        try:
+            values = parse_timestamps(item)
+        except ValueError:
+            results[index] = batch_error(index, "Malformed timestamp")
+            continue
+        columns = tuple(field for field in allowed_fields if field in values)
+        groups.setdefault(columns, []).append((index, tuple(values[field] for field in columns)))
+    return results, groups
+
+
+def item_error(error):
+    diag = getattr(error, "diag", None)
+    return getattr(diag, "message_primary", None) or str(error).strip().split("\n")[0]
+
+
+def insert_batch(tx, query, group, results):
+    """
+    Inserts a group of batch items with one statement. If the statement fails, the items are
+    retried one by one under savepoints to find the failing ones, the others are still inserted.
+
+    Args:
+    tx (Transaction): The transaction of the batch.
+    query (str): The INSERT statement containing "VALUES %s".
+    group (list): (index, values) of the items.
+    results (list): Per-item results, filled in place.
+    """
+    try:
+        with tx.savepoint():
+            rows = tx.execute_values(query, [values for _, values in group])
+        for (index, _), row in zip(group, rows):
+            results[index] = {"index": index, "status": 201, "data": row}
+        return
+    except ITEM_ERRORS:
+        pass
+    for index, values in group:
+        try:
+            with tx.savepoint():
+                row, = tx.execute_values(query, [values])
+            results[index] = {"index": index, "status": 201, "data": row}
+        except ITEM_ERRORS as e:
+            results[index] = batch_error(index, item_error(e))
+
+
+def build_batch_insert(table, columns, returning="*"):
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s RETURNING {returning}"
+
+
+def build_batch_create_incidents(columns):
+    """
+    Builds one statement inserting many incidents together with their initial "Open" status comments.
+
+    Args:
+    columns (tuple): Columns of the incident rows.
+
+    Returns:
+    str: The statement containing "VALUES %s".
+    """
+    return (f"WITH incident AS ({build_batch_insert('t_incident', columns)}), "
+            "initial_status AS ("
+            "INSERT INTO t_comment (created_by, incident_id, incident_status, comment) "
+            "SELECT reported_by, id, 'Open', '' FROM incident) "
+            "SELECT * FROM incident")
+
+
+def create_incidents(items):
+    """
+    Creates many incidents, each with its initial status comment, in one transaction.
+
+    Args:
+    items (list): Column values of the incidents.
+
+    Returns:
+    list: Per-item results with the index of the item, a status code and the incident or an error.
+    """
+    results, groups = group_batch(items, INCIDENT_REQUIRED_FIELDS, INCIDENT_BATCH_FIELDS)
+    with transaction() as tx:
+        for columns, group in groups.items():
+            insert_batch(tx, build_batch_create_incidents(columns), group, results)
+    return results
+
+
+def create_comments(items):
+    """
+    Creates many comments in one transaction.
+
+    Args:
+    items (list): Column values of the comments.
+
+    Returns:
+    list: Per-item results with the index of the item, a status code and the comment or an error.
+    """
+    results, groups = group_batch(items, COMMENT_REQUIRED_FIELDS, COMMENT_BATCH_FIELDS)
+    with transaction() as tx:
+        for columns, group in groups.items():
+            insert_batch(tx, build_batch_insert("t_comment", columns), group, results)
+    for result in results:
+        if result["status"] == 201:
+            invalidate_incident(result["data"]["incident_id"])
+    return results
+
+
+BATCH_STATUS_QUERY = """
+    INSERT INTO t_comment (created_by, incident_id, incident_status, comment)
+    SELECT %s, t_incident.id, %s, %s
+    FROM t_incident
+    WHERE t_incident.id = ANY(%s::uuid[])
+    RETURNING *
+"""
+
+
+def change_statuses(data):
+    """
+    Sets the status of many incidents with one statement, adding a status comment to each of them.
+
+    Args:
+    data (dict): "incident_ids", "incident_status", "created_by" and an optional "comment".
+
+    Returns:
+    list or None: Per-incident results, 404 for unknown incidents, or None if a field is missing.
+
+    Raises:
+    ValueError: If "incident_ids" is not a list or has more than MAX_BATCH_SIZE entries.
+    """
+    if not all(field in data for field in ("incident_ids", "incident_status", "created_by")):
         return None
+    results, incident_ids = parse_incident_ids(data["incident_ids"])
+    with transaction() as tx:
+        rows = tx.execute(BATCH_STATUS_QUERY, (
+            data["created_by"], data["incident_status"], data.get("comment", ""), list(incident_ids)))
+    return status_results(results, incident_ids, rows)
+
+
+def parse_incident_ids(incident_ids):
+    """
+    Returns:
+    tuple: (results, incident_ids), results holds an error for every malformed id and None for the others,
+    incident_ids maps the valid ids to their index.
+    """
+    if not isinstance(incident_ids, list):
+        raise ValueError("incident_ids must be a list")
+    if len(incident_ids) > MAX_BATCH_SIZE:
+        raise ValueError(f"Batch is limited to {MAX_BATCH_SIZE} items")
+    results = [None] * len(incident_ids)
+    valid = {}
+    for index, incident_id in enumerate(incident_ids):
+        try:
+            incident_id = str(uuid.UUID(str(incident_id)))
+        except ValueError:
+            results[index] = batch_error(index, "Malformed incident id")
+            continue
+        if incident_id in valid:
+            results[index] = batch_error(index, "Duplicate incident id")
+        else:
+            valid[incident_id] = index
+    return results, valid
+
+
+def status_results(results, incident_ids, rows):
+    for row in rows:
+        index = incident_ids.pop(str(row["incident_id"]))
+        results[index] = {"index": index, "status": 201, "data": row}
+        invalidate_incident(row["incident_id"])
+    for incident_id, index in incident_ids.items():
+        results[index] = batch_error(index, "Incident not found", 404)
+    return results
+
+
+NOTIFICATION_MAX_CLAIM = int(os.getenv('BACKEND_NOTIFICATION_MAX_CLAIM', 100))
+
+CLAIM_NOTIFICATIONS_QUERY = """
+    UPDATE t_notification_outbox AS o
+    SET locked_until = now() + make_interval(secs => %s), attempts = o.attempts + 1
+    FROM (
+        SELECT id
+        FROM t_notification_outbox
+        WHERE sent_at IS NULL AND failed_at IS NULL AND available_at <= now()
+          AND (locked_until IS NULL OR locked_until < now())
+        ORDER BY available_at, id
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    ) AS due
+    WHERE o.id = due.id
+    RETURNING o.id, o.chat_id, o.incident_id, o.incident_status, o.comment, o.created_at, o.attempts
+"""
+
+
+def parse_claim(data):
+    """
+    Returns:
+    tuple: (limit, lease seconds) of a claim request.
+
+    Raises:
+    ValueError: If the limit or the lease is not a positive number.
+    """
+    limit = int(data.get("limit", NOTIFICATION_MAX_CLAIM))
+    lease = float(data.get("lease", 60))
+    if limit < 1 or lease <= 0:
+        raise ValueError("limit and lease must be positive")
+    return min(limit, NOTIFICATION_MAX_CLAIM), lease
+
+
+def claim_notifications(data):
+    """
+    Leases due notifications to the caller. Concurrent workers claim disjoint rows, a notification
+    that is not acknowledged before its lease ends is claimed again.
+
+    Args:
+    data (dict): Optional "limit" and "lease" in seconds.
+
+    Returns:
+    list: The claimed notifications, oldest first.
+
+    Raises:
+    ValueError: If the limit or the lease is not valid.
+    """
+    limit, lease = parse_claim(data)
+    rows = execute_query(CLAIM_NOTIFICATIONS_QUERY, (lease, limit))
+    return sorted(rows or [], key=lambda row: row["id"])
+
+
+def build_ack_notifications(data):
+    """
+    Builds the statements recording the outcome of claimed notifications.
+
+    Args:
+    data (dict): "sent" ids, "retry" items with "id", "delay" in seconds and "error",
+    "failed" items with "id" and "error" that are not retried.
+
+    Returns:
+    list: (query, parameters) tuples.
+
+    Raises:
+    ValueError: If an item is malformed.
+    """
+    statements = []
+    sent = [int(notification_id) for notification_id in data.get("sent", [])]
+    if sent:
+        statements.append((
+            "UPDATE t_notification_outbox SET sent_at = now(), locked_until = NULL, last_error = NULL "
+            "WHERE id = ANY(%s) AND sent_at IS NULL", (sent,)))
+    for item in data.get("retry", []):
+        statements.append((
+            "UPDATE t_notification_outbox SET locked_until = NULL, last_error = %s, "
+            "available_at = now() + make_interval(secs => %s) WHERE id = %s AND sent_at IS NULL",
+            (str(item.get("error", "")), max(float(item.get("delay", 0)), 0.0), int(item["id"]))))
+    for item in data.get("failed", []):
+        statements.append((
+            "UPDATE t_notification_outbox SET failed_at = now(), locked_until = NULL, last_error = %s "
+            "WHERE id = %s AND sent_at IS NULL",
+            (str(item.get("error", "")), int(item["id"]))))
+    return statements
+
+
+def ack_notifications(data):
+    """
+    Records which claimed notifications were sent, have to be retried or failed for good.
+
+    Args:
+    data (dict): See build_ack_notifications().
+
+    Returns:
+    dict: Number of "sent", "retry" and "failed" items acknowledged.
+
+    Raises:
+    ValueError: If an item is malformed.
+    """
+    statements = build_ack_notifications(data)
+    with transaction() as tx:
+        for query, parameters in statements:
+            tx.execute(query, parameters)
+    return {key: len(data.get(key, [])) for key in ("sent", "retry", "failed")}
 
 
 # ===============#
 #   METHOD PUT   #
 # ===============#
 
+def build_update(table, key, key_value, data):
+    """
+    Builds an UPDATE statement for the rows matching key = key_value.
+
+    Args:
+    table (str): The table to update.
+    key (str): The column identifying the rows.
+    key_value: The value of the identifying column.
+    data (dict): Column values to set.
+
+    Returns:
+    tuple: (query, parameters).
+
+    Raises:
+    ValueError: If data is empty or holds a column that is not writable.
+    """
+    columns = writable_columns(table, data)
+    data = parse_timestamps(data)
+    set_clause = ", ".join(f"{column} = %s" for column in columns)
+    parameters = tuple(data[column] for column in columns) + (key_value,)
+    query = f"UPDATE {table} SET {set_clause} WHERE {key} = %s RETURNING *"
+    return query, parameters
+
+
 def update_user(user_id, data):
-    set_clause = ", ".join(f"{key} = %s" for key in data.keys())
-    parameters = tuple(data.values()) + (user_id,)
-    query = f"UPDATE t_user SET {set_clause} WHERE id = %s RETURNING *"
-    return execute_query(query, parameters)
+    result = execute_query(*build_update("t_user", "id", user_id, data))
+    invalidate_users()
+    return result
 
 
 def update_incident(incident_id, data):
-    set_clause = ", ".join(f"{key} = %s" for key in data.keys())
-    parameters = tuple(data.values()) + (incident_id,)
-    query = f"UPDATE t_incident SET {set_clause} WHERE id = %s RETURNING *"
-    return execute_query(query, parameters)
+    result = execute_query(*build_update("t_incident", "id", incident_id, data))
+    invalidate_incident(incident_id)
+    return result
 
 
 def update_comment(user_id, data):
-    set_clause = ", ".join(f"{key} = %s" for key in data.keys())
-    parameters = tuple(data.values()) + (user_id,)
-    query = f"UPDATE t_comment SET {set_clause} WHERE created_by = %s RETURNING *"
-    return execute_query(query, parameters)
-
-
-def update_status(user_id, data):
-    set_clause = ", ".join(f"{key} = %s" for key in data.keys())
-    parameters = tuple(data.values()) + (user_id,)
-    query = f"UPDATE t_comment SET {set_clause} WHERE created_by = %s RETURNING *"
-    return execute_query(query, parameters)
+    result = execute_query(*build_update("t_comment", "created_by", user_id, data))
+    if cache is not None:
+        cache.invalidate_kind("view")
+    return result
 
 
 # ================#
@@ -211,4 +1410,7 @@ def update_status(user_id, data):
 # ================#
 
 def delete_user(user_id):
-    return execute_query('DELETE FROM t_user WHERE id = %s RETURNING *', (user_id,))
+    result = execute_query('DELETE FROM t_user WHERE id = %s RETURNING *', (user_id,))
+    if cache is not None:
+        cache.clear()
+    return result
@@ -0,0 +1,85 @@
+import async_main
+import async_sql_connector
+import asyncio
+import json
+import unittest
+from unittest.mock import AsyncMock, patch
+
+
+class Test_AsyncServer(unittest.IsolatedAsyncioTestCase):
+    async def test_routes_and_keep_alive(self):
+        http_server = async_main.AsyncHTTPServer()
+        server = await asyncio.start_server(http_server.handle_connection, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        users = [{"id": "1", "username": "user"}]
+        with patch('async_sql_connector.execute_query', AsyncMock(return_value=users)):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            for path, status in (('/users', b'200'), ('/unknown', b'501')):
+                writer.write(f'GET {path} HTTP/1.1\r\nHost: test\r\n\r\n'.encode())
+                status_line = await reader.readline()
+                self.assertIn(status, status_line)
+                headers = await http_server.read_headers(reader)
+                body = await reader.readexactly(int(headers["Content-Length"]))
+                if status == b'200':
+                    self.assertEqual(json.loads(body), users)
+            writer.close()
+        server.close()
+        await http_server.drain()
+        self.assertEqual(http_server.stats()["requests"], 2)
+
+    async def test_not_modified(self):
+        http_server = async_main.AsyncHTTPServer()
+        server = await asyncio.start_server(http_server.handle_connection, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        path = '/views/00000000-0000-0000-0000-000000000001'
+        with patch('async_sql_connector.execute_query', AsyncMock(return_value=[{"incident_id": "1"}])):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(f'GET {path} HTTP/1.1\r\nHost: test\r\n\r\n'.encode())
+            self.assertIn(b' 200 ', await reader.readline())
+            headers = await http_server.read_headers(reader)
+            await reader.readexactly(int(headers["Content-Length"]))
+            writer.write(f'GET {path} HTTP/1.1\r\nHost: test\r\nIf-None-Match: {headers["ETag"]}\r\n\r\n'.encode())
+            self.assertIn(b' 304 ', await reader.readline())
+            not_modified = await http_server.read_headers(reader)
+            self.assertEqual(not_modified["ETag"], headers["ETag"])
+            self.assertNotIn("Content-Length", not_modified)
+            writer.close()
+        server.close()
+        await http_server.drain()
+
+    async def test_rejects_oversized_request_line(self):
+        http_server = async_main.AsyncHTTPServer()
+        server = await asyncio.start_server(http_server.handle_connection, '127.0.0.1', 0, limit=1024)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b'GET /' + b'a' * 2048 + b' HTTP/1.1\r\nHost: test\r\n\r\n')
+        self.assertIn(b' 414 ', await reader.readline())
+        writer.close()
+        server.close()
+        await http_server.drain()
+
+
+class Test_AsyncPool(unittest.IsolatedAsyncioTestCase):
+    async def test_pool_created_once(self):
+        async def create_pool(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return object()
+
+        with patch('sql_connector.DATABASE_URI', 'postgresql://test'), \
+                patch('async_sql_connector._pool', None), \
+                patch('asyncpg.create_pool', side_effect=create_pool) as create:
+            pools = await asyncio.gather(*(async_sql_connector.get_pool() for _ in range(5)))
+        self.assertEqual(create.call_count, 1)
+        self.assertEqual(len(set(map(id, pools))), 1)
+
+    async def test_statement_cache_off_without_prepared_statements(self):
+        with patch('sql_connector.DATABASE_URI', 'postgresql://test'), \
+                patch('sql_connector.PREPARED_STATEMENTS', False), \
+                patch('async_sql_connector._pool', None), \
+                patch('asyncpg.create_pool', AsyncMock()) as create:
+            await async_sql_connector.get_pool()
+        self.assertEqual(create.call_args.kwargs["statement_cache_size"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
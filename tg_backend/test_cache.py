@@ -0,0 +1,54 @@
+from cache import TTLCache, cached
+import unittest
+from unittest.mock import Mock, patch
+
+
+class Test_TTLCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set(("view", "1"), 1)
+        cache.set(("view", "2"), 2)
+        cache.get(("view", "1"))
+        cache.set(("view", "3"), 3)
+        self.assertEqual(cache.get(("view", "2")), (False, None))
+        self.assertEqual(cache.get(("view", "1")), (True, 1))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (2, 1, 1))
+
+    def test_expires_entries(self):
+        cache = TTLCache(ttl=10)
+        with patch('time.monotonic', return_value=100):
+            cache.set(("user", "1"), 1)
+        with patch('time.monotonic', return_value=111):
+            self.assertEqual(cache.get(("user", "1")), (False, None))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_cached_skips_empty_results(self):
+        cache = TTLCache()
+        lookup = Mock(side_effect=[[], [{"id": 1}], [{"id": 2}]])
+        function = cached(cache, "user")(lambda *args: lookup(*args))
+        self.assertEqual(function("telegram_user_id", 1), [])
+        self.assertEqual(function("telegram_user_id", 1), [{"id": 1}])
+        self.assertEqual(function("telegram_user_id", 1), [{"id": 1}])
+        cache.invalidate_kind("user")
+        self.assertEqual(function("telegram_user_id", 1), [{"id": 2}])
+
+    def test_cached_skips_results_invalidated_while_loading(self):
+        cache = TTLCache()
+
+        def load(incident_id):
+            # A concurrent write commits and invalidates after this stale row was read.
+            cache.invalidate(("view", incident_id))
+            return [{"incident_status": "Open"}]
+
+        function = cached(cache, "view")(load)
+        function("1")
+        self.assertEqual(cache.get(("view", "1")), (False, None))
+        generation = cache.generation(("view", "1"))
+        cache.invalidate_kind("view")
+        self.assertFalse(cache.set(("view", "1"), [], generation))
+        self.assertTrue(cache.set(("view", "1"), [], cache.generation(("view", "1"))))
+
+
+if __name__ == '__main__':
+    unittest.main()
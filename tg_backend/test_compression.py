@@ -0,0 +1,24 @@
+import gzip
+import unittest
+import compression
+
+
+class Test_Compression(unittest.TestCase):
+    def test_negotiate(self):
+        self.assertEqual(compression.negotiate("gzip, deflate"), "gzip")
+        self.assertEqual(compression.negotiate("gzip;q=0, identity"), None)
+        self.assertEqual(compression.negotiate("*"), next(iter(compression.COMPRESSORS)))
+        self.assertEqual(compression.negotiate("deflate, GZIP;q=0.5"), "gzip")
+        self.assertIsNone(compression.negotiate(None))
+        self.assertIsNone(compression.negotiate("identity"))
+
+    def test_streamed_gzip(self):
+        compressor = compression.COMPRESSORS["gzip"]()
+        chunks = [b'[{"id": 1}', b',{"id": 2}]']
+        data = b"".join(compressor.compress(chunk) for chunk in chunks) + compressor.finish()
+        self.assertEqual(gzip.decompress(data), b"".join(chunks))
+        self.assertEqual(gzip.decompress(compression.compress(b"x" * 2048, "gzip")), b"x" * 2048)
+
+
+if __name__ == '__main__':
+    unittest.main()
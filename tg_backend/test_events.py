@@ -0,0 +1,46 @@
+import events
+import socket
+import unittest
+
+
+class Test_EventLog(unittest.TestCase):
+    def test_replay(self):
+        log = events.EventLog(size=2)
+        first = log.append('{"type": "incident", "incident_id": "1"}')
+        self.assertIn(b"event: incident\n", first)
+        self.assertTrue(first.endswith(b'data: {"type": "incident", "incident_id": "1"}\n\n'))
+        second = log.append('{"type": "comment"}')
+        third = log.append('{"type": "comment"}')
+        self.assertEqual(log.replay(None), [])
+        self.assertEqual(log.replay(f"{log.epoch}-1"), [second, third])
+        self.assertEqual(log.replay(f"{log.epoch}-3"), [])
+        self.assertEqual(log.replay(f"{log.epoch}-0"), [events.RESET_FRAME])
+        self.assertEqual(log.replay("restarted-1"), [events.RESET_FRAME])
+
+
+class Test_EventHub(unittest.TestCase):
+    def test_broadcast(self):
+        hub = events.EventHub(None, max_subscribers=1)
+        hub.publish('{"type": "incident"}')
+        server, client = socket.socketpair()
+        try:
+            self.assertTrue(hub.subscribe(server, f"{hub.log.epoch}-0"))
+            self.assertFalse(hub.accepting())
+            hub.publish('{"type": "comment"}')
+            client.settimeout(1)
+            data = b""
+            while not data.endswith(b'data: {"type": "comment"}\n\n'):
+                data += client.recv(4096)
+            self.assertTrue(data.startswith(events.RETRY_FRAME))
+            self.assertIn(b"event: incident\n", data)
+            client.close()
+            hub.publish('{"type": "comment"}')
+            hub.publish('{"type": "comment"}')
+            self.assertEqual(hub.stats()["subscribers"], 0)
+        finally:
+            hub.close()
+            client.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,28 @@
-from main import Encode, Server
+from main import Encode, Server, SingleServer
 import json
+import ratelimit
 import unittest
-from unittest.mock import MagicMock, Mock
+from unittest.mock import MagicMock, Mock, patch
 import datetime
 from io import BytesIO as IO
 
+def dechunk(body):
+    data = []
+    while True:
+        size, body = body.split(b'\r\n', 1)
+        if int(size, 16) == 0:
+            return b''.join(data)
+        data.append(body[:int(size, 16)])
+        body = body[int(size, 16) + 2:]
+
+
+def serve(request):
+    mock_request = Mock()
+    mock_request.makefile.return_value = IO(request)
+    Server(mock_request, ('0.0.0.0', 8080), Mock())
+    return b''.join(call.args[0] for call in mock_request.sendall.call_args_list)
+
+
 class Test_Main(unittest.TestCase):
     def test_encode(self):
         dt = {"key":datetime.datetime.now()}
@@ -23,6 +41,119 @@ class Test_Main(unittest.TestCase):
         self.assertTrue(serv.list_users.called, 'serv.do_GET() should call serv.list_users()')
         self.assertFalse(serv.handle_error.called, 'serv.do_GET() should not call serv.handle_error()')
 
+    def test_stream_ndjson(self):
+        rows = [{"id": 1}, {"id": 2}]
+        mock_request = Mock()
+        mock_request.makefile.return_value = IO(b'GET /views?stream=ndjson HTTP/1.1\r\n\r\n')
+        with patch('sql_connector.stream_page', return_value=iter(rows)):
+            Server(mock_request, ('0.0.0.0', 8080), Mock())
+        output = b''.join(call.args[0] for call in mock_request.sendall.call_args_list)
+        head, body = output.split(b'\r\n\r\n', 1)
+        self.assertIn(b'application/x-ndjson', head)
+        self.assertIn(b'Transfer-Encoding: chunked', head)
+        self.assertEqual([json.loads(line) for line in dechunk(body).splitlines()], rows)
+
+    def test_not_modified(self):
+        def request(headers):
+            mock_request = Mock()
+            mock_request.makefile.return_value = IO(
+                b'GET /views/00000000-0000-0000-0000-000000000001 HTTP/1.1\r\n' + headers + b'\r\n')
+            with patch('sql_connector.get_single_view', return_value=[{"incident_id": "1"}]):
+                Server(mock_request, ('0.0.0.0', 8080), Mock())
+            return b''.join(call.args[0] for call in mock_request.sendall.call_args_list)
+
+        head, body = request(b'').split(b'\r\n\r\n', 1)
+        etag = [line for line in head.split(b'\r\n') if line.startswith(b'ETag: ')][0][6:]
+        self.assertEqual(json.loads(body), {"incident_id": "1"})
+        response = request(b'If-None-Match: ' + etag + b'\r\n')
+        self.assertIn(b' 304 ', response.split(b'\r\n')[0])
+        self.assertTrue(response.endswith(b'\r\n\r\n'))
+
+    def test_not_modified_compressed(self):
+        view = {"incident_id": "1", "description": "x" * 4096}
+
+        def request(headers):
+            with patch('sql_connector.get_single_view', return_value=[view]):
+                output = serve(b'GET /views/00000000-0000-0000-0000-000000000001 HTTP/1.1\r\n'
+                               b'Accept-Encoding: gzip\r\n' + headers + b'\r\n')
+            status, *lines = output.split(b'\r\n\r\n')[0].split(b'\r\n')
+            return status, dict(line.split(b': ', 1) for line in lines)
+
+        status, head = request(b'')
+        self.assertIn(b' 200 ', status)
+        self.assertTrue(head[b'ETag'].startswith(b'W/'))
+        status, not_modified = request(b'If-None-Match: ' + head[b'ETag'] + b'\r\n')
+        self.assertIn(b' 304 ', status)
+        self.assertEqual(not_modified[b'ETag'], head[b'ETag'])
+        self.assertEqual(not_modified[b'Vary'], b'Accept-Encoding')
+        self.assertNotIn(b'Content-Encoding', not_modified)
+
+
+    def test_keep_alive(self):
+        body = b'{"telegram_user_id": 1}'
+        chunked = b'5;ext=1\r\n' + body[:5] + b'\r\n' + b'%x\r\n' % (len(body) - 5) + body[5:] + b'\r\n0\r\n\r\n'
+        with patch('sql_connector.upsert_user', return_value=([{"id": "1"}], False)) as upsert_user, \
+                patch('sql_connector.list_page', return_value=([], None)):
+            output = serve(
+                b'POST /users HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n' + chunked +
+                b'POST /unknown HTTP/1.1\r\nContent-Length: 3\r\n\r\n{}\n' +
+                b'GET /users HTTP/1.1\r\n\r\n')
+        upsert_user.assert_called_once_with({"telegram_user_id": 1})
+        responses = output.split(b'HTTP/1.1 ')[1:]
+        self.assertEqual([response[:3] for response in responses], [b'200', b'501', b'200'])
+        for response in responses:
+            self.assertIn(b'Content-Length: ', response)
+            self.assertNotIn(b'Connection: close', response)
+
+    def test_malformed_chunked_body(self):
+        with patch('sql_connector.upsert_user') as upsert_user:
+            output = serve(b'POST /users HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n{}\r\n0\r\n\r\n' +
+                           b'GET /users HTTP/1.1\r\n\r\n')
+        upsert_user.assert_not_called()
+        self.assertEqual(output.count(b'HTTP/1.1 '), 1)
+        self.assertIn(b'HTTP/1.1 400 ', output)
+        self.assertIn(b'Connection: close', output)
+
+    def test_single_mode_closes_connection(self):
+        mock_request = Mock()
+        mock_request.makefile.return_value = IO(b'GET /users HTTP/1.1\r\n\r\nGET /users HTTP/1.1\r\n\r\n')
+        with patch('sql_connector.list_page', return_value=([], None)):
+            SingleServer(mock_request, ('0.0.0.0', 8080), Mock())
+        output = b''.join(call.args[0] for call in mock_request.sendall.call_args_list)
+        self.assertEqual(output.count(b'HTTP/1.0 200 '), 1)
+        self.assertNotIn(b'HTTP/1.1 ', output)
+
+    def test_body_too_large(self):
+        with patch('main.MAX_BODY_SIZE', 4):
+            output = serve(b'POST /users HTTP/1.1\r\nContent-Length: 5\r\n\r\n{"a":' +
+                           b'GET /users HTTP/1.1\r\n\r\n')
+        self.assertEqual(output.count(b'HTTP/1.1 '), 1)
+        self.assertIn(b' 413 ', output)
+        self.assertIn(b'Connection: close', output)
+
+    def test_rate_limited(self):
+        limiter = ratelimit.RateLimiter({"read": (1.0, 5.0), "list": (0.5, 1.0), "write": (1.0, 1.0),
+                                         "batch": (1.0, 1.0)})
+        with patch('ratelimit.limiter', limiter), patch('sql_connector.list_page', return_value=([], None)):
+            output = serve(b'GET /users HTTP/1.1\r\n\r\nGET /users HTTP/1.1\r\n\r\n')
+        first, second = output.split(b'HTTP/1.1 ')[1:]
+        self.assertTrue(first.startswith(b'200 '))
+        self.assertTrue(second.startswith(b'429 '))
+        self.assertIn(b'Retry-After: 2\r\n', second)
+        self.assertEqual(limiter.stats()["clients"]["0.0.0.0"], {"allowed": {"list": 1}, "limited": {"list": 1}})
+
+    def test_internal_client_budget(self):
+        budgets = {"read": (1.0, 1.0), "list": (0.5, 1.0), "write": (1.0, 1.0), "batch": (1.0, 1.0)}
+        limiter, internal_limiter = ratelimit.RateLimiter(budgets), ratelimit.RateLimiter(budgets)
+        request = b'GET /users HTTP/1.1\r\nX-Client-Key: s3cret\r\n\r\n'
+        with patch('ratelimit.limiter', limiter), patch('ratelimit.internal_limiter', internal_limiter), \
+                patch('ratelimit.internal_clients', {"s3cret": "bot"}), \
+                patch('sql_connector.list_page', return_value=([], None)):
+            output = serve(request + b'GET /users HTTP/1.1\r\n\r\n')
+        self.assertEqual([response[:3] for response in output.split(b'HTTP/1.1 ')[1:]], [b'200', b'200'])
+        self.assertEqual(internal_limiter.stats()["clients"]["bot"]["allowed"], {"list": 1})
+        self.assertEqual(limiter.stats()["clients"]["0.0.0.0"]["allowed"], {"list": 1})
+
 
 if __name__ == '__main__':
     unittest.main()
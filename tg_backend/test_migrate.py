@@ -0,0 +1,67 @@
+import migrate
+import os
+import sql_connector
+import tempfile
+import unittest
+
+
+class Test_Migrate(unittest.TestCase):
+    def test_list_migrations_in_version_order(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for file_name in ('0010_later.sql', '0002_second.sql', 'README.md', '0001_first.sql'):
+                open(os.path.join(directory, file_name), 'w').close()
+            versions = [(version, name) for version, name, _ in migrate.list_migrations(directory)]
+        self.assertEqual(versions, [(1, 'first'), (2, 'second'), (10, 'later')])
+
+    def test_shipped_migrations(self):
+        self.assertEqual(migrate.list_migrations()[0][1], 'hot_query_indexes')
+
+
+NOTIFICATION_SCENARIO = """
+    WITH reporter AS (
+        INSERT INTO t_user (username, telegram_user_id) VALUES ('outbox-reporter', -7310001) RETURNING id
+    ), admin AS (
+        INSERT INTO t_user (username) VALUES ('outbox-admin') RETURNING id
+    ), incident AS (
+        INSERT INTO t_incident (reported_by, description, urgency, impact)
+        SELECT reporter.id, 'Outbox trigger', 'Low', 'Low' FROM reporter
+        RETURNING id, reported_by
+    )
+    SELECT incident.id, incident.reported_by, admin.id FROM incident, admin
+"""
+
+
+class Test_NotificationTrigger(unittest.TestCase):
+    """
+    Runs the triggers of the shipped migrations against the configured database,
+    inside a transaction that is rolled back.
+    """
+
+    def setUp(self):
+        if sql_connector.DATABASE_URI is None:
+            self.skipTest('No database configured')
+        migrate.apply_migrations()
+
+    def test_notifies_status_changes_in_insert_order(self):
+        with sql_connector.get_pool().connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(NOTIFICATION_SCENARIO)
+                    incident_id, reporter_id, admin_id = cursor.fetchone()
+                    # One statement, one now(): Open, then In Progress twice, then Closed by the reporter.
+                    cursor.execute(
+                        "INSERT INTO t_comment (created_by, incident_id, incident_status, comment) "
+                        "VALUES (%s, %s, 'Open', ''), (%s, %s, 'In Progress', 'a'), "
+                        "(%s, %s, 'In Progress', 'b'), (%s, %s, 'Closed', 'c')",
+                        (reporter_id, incident_id, admin_id, incident_id,
+                         admin_id, incident_id, reporter_id, incident_id))
+                    cursor.execute(
+                        "SELECT incident_status, comment FROM t_notification_outbox WHERE incident_id = %s",
+                        (incident_id,))
+                    self.assertEqual(cursor.fetchall(), [('In Progress', 'a')])
+            finally:
+                connection.rollback()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+from main import Server
+from pool_server import ThreadPoolHTTPServer
+import socket
+import threading
+import time
+import unittest
+
+
+class Test_ThreadPoolHTTPServer(unittest.TestCase):
+    def test_sheds_load_when_backlog_is_full(self):
+        release = threading.Event()
+
+        class SlowServer(Server):
+            def list_users(self, *args, **kwargs):
+                release.wait(5)
+                self.handle_success(200, [])
+
+        server = ThreadPoolHTTPServer(('127.0.0.1', 0), SlowServer, workers=1, backlog=1)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        clients = []
+        try:
+            for _ in range(3):
+                client = socket.create_connection(server.server_address)
+                client.sendall(b'GET /users HTTP/1.0\r\n\r\n')
+                clients.append(client)
+                while server.stats()["accepted"] < len(clients) and not server.stats()["rejected"]:
+                    time.sleep(0.01)
+                if len(clients) == 1:
+                    while server.stats()["in_flight"] == 0:
+                        time.sleep(0.01)
+            rejected = clients[2].recv(1024)
+            self.assertTrue(rejected.startswith(b'HTTP/1.0 503'))
+            release.set()
+            for client in clients[:2]:
+                self.assertIn(b' 200 ', client.recv(1024))
+        finally:
+            release.set()
+            server.shutdown()
+            server.server_close()
+            thread.join()
+            for client in clients:
+                client.close()
+        self.assertEqual(server.stats()["rejected"], 1)
+        self.assertEqual(server.stats()["completed"], 2)
+
+    def test_idle_keepalive_yields_worker(self):
+        class FastServer(Server):
+            def list_users(self, *args, **kwargs):
+                self.handle_success(200, [])
+
+        server = ThreadPoolHTTPServer(('127.0.0.1', 0), FastServer, workers=2, backlog=8)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        clients = []
+        try:
+            # Two persistent clients stay idle on the two workers after their first request.
+            for _ in range(2):
+                client = socket.create_connection(server.server_address)
+                client.sendall(b'GET /users HTTP/1.1\r\nHost: x\r\n\r\n')
+                self.assertIn(b' 200 ', client.recv(1024))
+                clients.append(client)
+            started = time.monotonic()
+            client = socket.create_connection(server.server_address)
+            clients.append(client)
+            client.settimeout(3)
+            client.sendall(b'GET /users HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n')
+            self.assertIn(b' 200 ', client.recv(1024))
+            self.assertLess(time.monotonic() - started, Server.timeout / 2)
+            # An idle connection was closed to free its worker.
+            closed = 0
+            for idle in clients[:2]:
+                idle.settimeout(0.5)
+                try:
+                    while idle.recv(1024):
+                        pass
+                    closed += 1
+                except socket.timeout:
+                    pass
+            self.assertGreaterEqual(closed, 1)
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+            for client in clients:
+                client.close()
+
+    def test_bind_failure_raises_os_error(self):
+        taken = socket.socket()
+        taken.bind(('127.0.0.1', 0))
+        taken.listen()
+        try:
+            with self.assertRaises(OSError):
+                ThreadPoolHTTPServer(taken.getsockname(), Server, workers=1, backlog=1)
+        finally:
+            taken.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
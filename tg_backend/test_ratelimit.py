@@ -0,0 +1,55 @@
+import ratelimit
+import unittest
+from unittest.mock import patch
+
+
+class Test_RateLimiter(unittest.TestCase):
+    def test_token_bucket(self):
+        now = [0.0]
+        limiter = ratelimit.RateLimiter({"list": (2.0, 2.0), "read": (10.0, 10.0)}, max_clients=2,
+                                        clock=lambda: now[0])
+        self.assertEqual(limiter.take("a", "list"), 0)
+        self.assertEqual(limiter.take("a", "list"), 0)
+        self.assertAlmostEqual(limiter.take("a", "list"), 0.5)
+        self.assertEqual(limiter.take("a", "read"), 0, 'Route classes have separate budgets')
+        self.assertEqual(limiter.take("b", "list"), 0, 'Clients have separate budgets')
+        now[0] = 0.5
+        self.assertEqual(limiter.take("a", "list"), 0)
+        limiter.take("c", "list")
+        self.assertEqual(limiter.stats()["clients_tracked"], 2)
+        self.assertEqual(limiter.stats()["limited"], 1)
+
+    def test_route_class(self):
+        self.assertEqual(ratelimit.route_class("GET", "list_comments"), "list")
+        self.assertEqual(ratelimit.route_class("GET", "get_view"), "read")
+        self.assertEqual(ratelimit.route_class("POST", "create_comments"), "batch")
+        self.assertEqual(ratelimit.route_class("DELETE", "delete_user"), "write")
+        self.assertEqual(ratelimit.parse_budget("5/20"), (5.0, 20.0))
+        with self.assertRaises(ValueError):
+            ratelimit.parse_budget("0/1")
+
+
+    def test_client_identity(self):
+        headers = {"X-Forwarded-For": "203.0.113.7"}
+        spoofed = {"X-Forwarded-For": "198.51.100.1, 198.51.100.2, 203.0.113.7"}
+        with patch.object(ratelimit, 'RATE_LIMIT_KEY_HEADER', 'X-Forwarded-For'):
+            self.assertEqual(ratelimit.client_identity(headers, ("10.0.0.1", 5000)), "203.0.113.7")
+            self.assertEqual(ratelimit.client_identity(spoofed, ("10.0.0.1", 5000)), "203.0.113.7")
+            with patch.object(ratelimit, 'RATE_LIMIT_TRUSTED_HOPS', 2):
+                self.assertEqual(ratelimit.client_identity(spoofed, ("10.0.0.1", 5000)), "198.51.100.2")
+            self.assertEqual(ratelimit.client_identity({}, ("10.0.0.1", 5000)), "10.0.0.1")
+        with patch.object(ratelimit, 'RATE_LIMIT_KEY_HEADER', None):
+            self.assertEqual(ratelimit.client_identity(headers, ("10.0.0.1", 5000)), "10.0.0.1")
+
+    def test_internal_client(self):
+        clients = ratelimit.parse_internal_clients("bot=s3cret, admin=0ther")
+        self.assertEqual(clients, {"s3cret": "bot", "0ther": "admin"})
+        with patch.object(ratelimit, 'internal_clients', clients):
+            self.assertEqual(ratelimit.internal_client({"X-Client-Key": "s3cret"}), "bot")
+            self.assertIsNone(ratelimit.internal_client({"X-Client-Key": "guess"}))
+            self.assertIsNone(ratelimit.internal_client({}))
+        with self.assertRaises(ValueError):
+            ratelimit.parse_internal_clients("bot")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+from router import Router, BadParameter
+from main import Server
+
+
+class Test_Router(unittest.TestCase):
+    def test_resolve(self):
+        router = Server.router
+        user_id = "9B2E6C5E-1F0B-4C1A-8D4E-7A3F2B1C0D9E"
+        self.assertEqual(router.resolve("GET", "/users"), ("list_users", ()))
+        self.assertEqual(router.resolve("GET", f"/users/{user_id}"), ("get_user", (user_id.lower(),)))
+        self.assertEqual(router.resolve("GET", "/views/watermark"), ("get_views_watermark", ()))
+        self.assertEqual(router.resolve("POST", "/incidents/batch"), ("create_incidents", ()))
+        self.assertEqual(router.resolve("GET", "/users/a/b"), (None, ()))
+        self.assertEqual(router.resolve("PATCH", "/users"), (None, ()))
+        with self.assertRaises(BadParameter):
+            router.resolve("GET", "/views/1")
+
+    def test_typed_parameters(self):
+        router = Router({"GET": {"/pages/{number:int}/{name}": "get_page"}})
+        self.assertEqual(router.resolve("GET", "/pages/3/intro"), ("get_page", (3, "intro")))
+        self.assertEqual(router.resolve("GET", "/pages/x/intro"), (None, ()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import enum
+import json
+import uuid
+import datetime
+import unittest
+import serializer
+
+
+class Status(enum.Enum):
+    OPEN = "Open"
+
+
+class Test_Serializer(unittest.TestCase):
+    row = {
+        "incident_id": uuid.UUID("9b2e6c5e-1f0b-4c1a-8d4e-7a3f2b1c0d9e"),
+        "reported_at": datetime.datetime(2024, 3, 1, 12, 30, 5, 123456, tzinfo=datetime.timezone.utc),
+        "incident_status": Status.OPEN,
+        "description": "Überlauf",
+        "comments": [None, 1, 2.5, True],
+    }
+
+    def test_serializers_agree(self):
+        expected = {
+            "incident_id": "9b2e6c5e-1f0b-4c1a-8d4e-7a3f2b1c0d9e",
+            "reported_at": "2024-03-01 12:30:05",
+            "incident_status": "Open",
+            "description": "Überlauf",
+            "comments": [None, 1, 2.5, True],
+        }
+        for name, dumps in serializer.SERIALIZERS.items():
+            data = dumps(self.row)
+            self.assertIsInstance(data, bytes, name)
+            self.assertEqual(json.loads(data), expected, name)
+            self.assertIn(b'"2024-03-01 12:30:05"', data, name)
+
+    def test_time_format(self):
+        for value in (datetime.datetime(2024, 12, 31, 23, 59, 59, 999999),
+                      datetime.datetime(1000, 1, 1, tzinfo=datetime.timezone(datetime.timedelta(hours=-5))),
+                      datetime.datetime(999, 1, 1)):
+            self.assertEqual(serializer.default(value), value.strftime(serializer.TIME_FORMAT))
+
+    def test_get_serializer(self):
+        self.assertIs(serializer.get_serializer("json"), serializer.dumps_json)
+        with self.assertRaises(ValueError):
+            serializer.get_serializer("pickle")
+        with self.assertRaises(TypeError):
+            serializer.dumps_json({"value": object()})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,235 @@
+import sql_connector
+import datetime
+import unittest
+from unittest.mock import MagicMock, patch
+
+
+def fake_connection():
+    connection = MagicMock()
+    connection.closed = 0
+    connection.info.transaction_status = 0
+    return connection
+
+
+class Test_ConnectionPool(unittest.TestCase):
+    def test_reuses_connection(self):
+        with patch('psycopg2.connect', side_effect=lambda dsn: fake_connection()) as connect:
+            pool = sql_connector.ConnectionPool('dsn', minconn=0, maxconn=2)
+            first = pool.getconn()
+            pool.putconn(first)
+            second = pool.getconn()
+            pool.putconn(second)
+        self.assertIs(first, second, 'Returned connection should be reused')
+        self.assertEqual(connect.call_count, 1)
+        stats = pool.stats()
+        self.assertEqual(stats["in_use"], 0)
+        self.assertEqual(stats["idle"], 1)
+        self.assertEqual(stats["checkouts"], 2)
+
+    def test_discards_broken_connection(self):
+        with patch('psycopg2.connect', side_effect=lambda dsn: fake_connection()):
+            pool = sql_connector.ConnectionPool('dsn', minconn=0, maxconn=1, timeout=0.01)
+            with self.assertRaises(sql_connector.psycopg2.OperationalError):
+                with pool.connection():
+                    raise sql_connector.psycopg2.OperationalError()
+            self.assertEqual(pool.stats()["size"], 0)
+            with pool.connection() as connection:
+                self.assertFalse(connection.closed)
+            with pool.connection():
+                with self.assertRaises(sql_connector.PoolTimeout):
+                    pool.getconn()
+
+
+class Test_Pagination(unittest.TestCase):
+    def test_build_page_query(self):
+        rows = [{"reported_at": datetime.datetime(2024, 1, i + 1), "incident_id": str(i)} for i in range(3)]
+        page, cursor = sql_connector.split_page("v_incident", rows, 2)
+        self.assertEqual(len(page), 2)
+        query, parameters = sql_connector.build_page_query(
+            "v_incident", {"status": ["Open", "Closed"]}, limit=2, after=cursor)
+        self.assertEqual(query, "SELECT * FROM v_incident WHERE incident_status IN (%s, %s) "
+                                "AND (reported_at, incident_id) > (%s, %s) "
+                                "ORDER BY reported_at ASC, incident_id ASC LIMIT %s")
+        self.assertEqual(parameters, ("Open", "Closed", datetime.datetime(2024, 1, 2), "1", 3))
+        self.assertEqual(sql_connector.split_page("v_incident", page, 2), (page, None))
+
+    def test_sort(self):
+        rows = [{"urgency": "High", "incident_id": str(i)} for i in range(3)]
+        page, cursor = sql_connector.split_page("t_incident_dashboard", rows, 2, "urgency")
+        query, parameters = sql_connector.build_page_query(
+            "t_incident_dashboard", limit=2, after=cursor, order="desc", sort="urgency")
+        self.assertEqual(query, "SELECT * FROM t_incident_dashboard WHERE (urgency, incident_id) < (%s, %s) "
+                                "ORDER BY urgency DESC, incident_id DESC LIMIT %s")
+        self.assertEqual(parameters, ("High", "1", 3))
+        with self.assertRaises(ValueError):
+            sql_connector.build_page_query("t_incident_dashboard", sort="description")
+
+    def test_comment_keyset_is_unique(self):
+        created_at = datetime.datetime(2024, 1, 1)
+        rows = [{"created_at": created_at, "incident_id": "i1", "id": i} for i in (7, 8, 9)]
+        page, cursor = sql_connector.split_page("t_comment", rows, 2)
+        query, parameters = sql_connector.build_page_query("t_comment", limit=2, after=cursor)
+        self.assertIn("(created_at, id) > (%s, %s)", query)
+        self.assertEqual(parameters, (created_at, 8, 3))
+
+    def test_rejects_unknown_filter(self):
+        with self.assertRaises(ValueError):
+            sql_connector.build_page_query("t_user", {"password": ["x"]})
+        with self.assertRaises(ValueError):
+            sql_connector.build_page_query("t_user", after="not a cursor")
+
+
+class Test_UpsertUser(unittest.TestCase):
+    def test_build_upsert_user(self):
+        user = {"username": "jdoe", "first_name": "John", "last_name": None, "telegram_user_id": 42}
+        query, parameters = sql_connector.build_upsert_user(user)
+        self.assertEqual(query, "INSERT INTO t_user (username, first_name, last_name, telegram_user_id) "
+                                "VALUES (%s, %s, %s, %s) ON CONFLICT (telegram_user_id) "
+                                "DO UPDATE SET telegram_user_id = EXCLUDED.telegram_user_id "
+                                "RETURNING id, (xmax = 0) AS created")
+        self.assertEqual(parameters, ("jdoe", "John", None, 42))
+        self.assertIsNone(sql_connector.build_upsert_user({"telegram_user_id": 42}))
+
+
+class Test_Transaction(unittest.TestCase):
+    def test_shares_connection_and_rolls_back(self):
+        pool = sql_connector.ConnectionPool('dsn', minconn=0, maxconn=1)
+        with patch('psycopg2.connect', side_effect=lambda dsn: fake_connection()), \
+                patch.object(sql_connector, 'get_pool', return_value=pool):
+            with sql_connector.transaction() as tx:
+                tx.execute('SELECT 1')
+                tx.execute('SELECT 2')
+            connection = tx.connection
+            self.assertEqual(connection.cursor.call_count, 2)
+            connection.__exit__.assert_called_once_with(None, None, None)
+            with self.assertRaises(ValueError):
+                with sql_connector.transaction() as tx:
+                    raise ValueError()
+            self.assertIs(tx.connection, connection)
+            self.assertIs(connection.__exit__.call_args[0][0], ValueError)
+        self.assertEqual(pool.stats()["in_use"], 0)
+
+    def test_build_create_incident(self):
+        incident = {"reported_by": "u1", "description": "Down", "urgency": "High", "impact": "Low"}
+        query, parameters = sql_connector.build_create_incident(incident)
+        self.assertTrue(query.startswith("WITH incident AS (INSERT INTO t_incident "))
+        self.assertIn("INSERT INTO t_comment (created_by, incident_id, incident_status, comment) "
+                      "SELECT reported_by, id, %s, '' FROM incident", query)
+        self.assertEqual(parameters, ("u1", "Down", "High", "Low", "Open"))
+        self.assertIsNone(sql_connector.build_create_incident({"description": "Down"}))
+        _, parameters = sql_connector.build_create_incident(dict(incident, reported_at="2024-01-01T10:00:00+00:00"))
+        self.assertEqual(parameters[1], datetime.datetime(2024, 1, 1, 10, tzinfo=datetime.timezone.utc))
+        self.assertIsNone(sql_connector.build_create_incident(dict(incident, reported_at="yesterday")))
+
+
+class Test_Batch(unittest.TestCase):
+    def test_group_batch(self):
+        items = [
+            {"created_by": "u1", "incident_id": "i1", "incident_status": "Open", "comment": ""},
+            {"created_by": "u1", "incident_id": "i2"},
+            {"created_by": "u1", "incident_id": "i3", "incident_status": "Open", "comment": "", "password": ""},
+            {"created_by": "u1", "incident_id": "i4", "incident_status": "Open", "comment": "",
+             "created_at": "2024-01-01T00:00:00"},
+        ]
+        results, groups = sql_connector.group_batch(
+            items, sql_connector.COMMENT_REQUIRED_FIELDS, sql_connector.COMMENT_BATCH_FIELDS)
+        self.assertEqual([result and result["status"] for result in results], [None, 400, 400, None])
+        self.assertEqual(groups[("created_by", "incident_id", "incident_status", "comment")],
+                         [(0, ("u1", "i1", "Open", ""))])
+        self.assertEqual(groups[("created_by", "incident_id", "incident_status", "comment", "created_at")],
+                         [(3, ("u1", "i4", "Open", "", datetime.datetime(2024, 1, 1)))])
+        with self.assertRaises(ValueError):
+            sql_connector.group_batch({}, [], [])
+
+    def test_status_results(self):
+        first, second = "00000000-0000-0000-0000-000000000001", "00000000-0000-0000-0000-000000000002"
+        results, incident_ids = sql_connector.parse_incident_ids([first, "bad", second, first])
+        results = sql_connector.status_results(results, incident_ids, [{"incident_id": first}])
+        self.assertEqual([result["status"] for result in results], [201, 400, 404, 400])
+
+
+class Test_ViewDetail(unittest.TestCase):
+    def test_split_view_detail(self):
+        created_at = datetime.datetime(2024, 1, 1)
+        rows = [{"incident_id": "i1", "incident_status": "Closed", "comment_id": 7, "comment_created_by": "u1",
+                 "comment_created_at": created_at, "comment_incident_status": "Open", "comment_comment": ""}]
+        self.assertEqual(sql_connector.split_view_detail(rows), {
+            "incident": {"incident_id": "i1", "incident_status": "Closed"},
+            "comments": [{"id": 7, "created_by": "u1", "incident_id": "i1", "created_at": created_at,
+                          "incident_status": "Open", "comment": ""}],
+        })
+        rows = [dict(rows[0], comment_id=None, comment_created_by=None, comment_created_at=None,
+                     comment_incident_status=None, comment_comment=None)]
+        self.assertEqual(sql_connector.split_view_detail(rows)["comments"], [])
+        self.assertIsNone(sql_connector.split_view_detail([]))
+
+
+class Test_Statements(unittest.TestCase):
+    def test_prepares_once_per_connection(self):
+        pool = sql_connector.ConnectionPool('dsn', minconn=0, maxconn=1)
+        with patch('psycopg2.connect', side_effect=lambda dsn: fake_connection()), \
+                patch.object(sql_connector, 'get_pool', return_value=pool), \
+                patch.object(sql_connector, 'PREPARED_STATEMENTS', True):
+            sql_connector.execute_statement("get_single_view", ("i1",))
+            sql_connector.execute_statement("get_single_view", ("i2",))
+            connection = pool.getconn()
+            cursor = connection.cursor.return_value.__enter__.return_value
+            self.assertEqual([call.args for call in cursor.execute.call_args_list], [
+                ("PREPARE get_single_view AS SELECT * FROM t_incident_dashboard WHERE incident_id = $1",),
+                ("EXECUTE get_single_view (%s)", ("i1",)),
+                ("EXECUTE get_single_view (%s)", ("i2",)),
+            ])
+            pool.putconn(connection, discard=True)
+            sql_connector.execute_statement("get_single_view", ("i3",))
+        self.assertEqual(pool.stats()["prepares"], 2)
+
+    def test_writable_columns(self):
+        query, parameters = sql_connector.build_update(
+            "t_incident", "id", "i1", {"impact": "Low", "description": "Down"})
+        self.assertEqual(query, "UPDATE t_incident SET description = %s, impact = %s WHERE id = %s RETURNING *")
+        self.assertEqual(parameters, ("Down", "Low", "i1"))
+        with self.assertRaises(ValueError):
+            sql_connector.build_update("t_user", "id", "u1", {"id = id; DROP TABLE t_user; --": 1})
+        with self.assertRaises(ValueError):
+            sql_connector.build_update("t_user", "id", "u1", {})
+        comment = {"created_by": "u1", "incident_id": "i1", "incident_status": "Open", "comment": "", "id": "x"}
+        self.assertIsNone(sql_connector.build_insert("t_comment", comment, sql_connector.COMMENT_REQUIRED_FIELDS))
+
+
+class Test_Invalidation(unittest.TestCase):
+    def test_normalizes_incident_id(self):
+        cache = sql_connector.TTLCache()
+        incident_id = "0000000a-0000-0000-0000-00000000000b"
+        cache.set(("view", incident_id), [{"incident_id": incident_id}])
+        with patch.object(sql_connector, 'cache', cache):
+            sql_connector.invalidate_incident("{0000000A-0000-0000-0000-00000000000B}")
+            sql_connector.invalidate_incident("not an id")
+        self.assertEqual(cache.get(("view", incident_id)), (False, None))
+
+
+class Test_Notifications(unittest.TestCase):
+    def test_parse_claim(self):
+        self.assertEqual(sql_connector.parse_claim({"limit": 10 ** 6, "lease": "30"}),
+                         (sql_connector.NOTIFICATION_MAX_CLAIM, 30.0))
+        with self.assertRaises(ValueError):
+            sql_connector.parse_claim({"limit": 0})
+
+    def test_claim_without_database(self):
+        with patch.object(sql_connector, 'execute_query', return_value=None):
+            self.assertEqual(sql_connector.claim_notifications({}), [])
+
+    def test_build_ack_notifications(self):
+        statements = sql_connector.build_ack_notifications({
+            "sent": [1, "2"],
+            "retry": [{"id": 3, "delay": -5, "error": "Timed out"}],
+            "failed": [{"id": 4, "error": "Forbidden"}],
+        })
+        self.assertEqual([parameters for _, parameters in statements],
+                         [([1, 2],), ("Timed out", 0.0, 3), ("Forbidden", 4)])
+        self.assertEqual(sql_connector.build_ack_notifications({}), [])
+        with self.assertRaises(KeyError):
+            sql_connector.build_ack_notifications({"failed": [{"error": "no id"}]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,246 @@
 import requests
-from flask import Flask, render_template, abort, request
+import urllib3
+from flask import Flask, Response, render_template, abort, request, url_for
+from markupsafe import Markup
 import json
 import os
+import time
+import queue
+import threading
+from collections import OrderedDict, namedtuple
 
 BACKEND_URL = os.getenv('BACKEND_URL', "http://localhost:8090")
+PAGE_SIZE = int(os.getenv('PAGE_SIZE', 100))
+INDEX_FILTERS = ('status', 'urgency', 'impact', 'since', 'until', 'after')
+# Sortable index columns, the backend keeps a keyset index for each of them.
+INDEX_SORTS = ('reported_at', 'urgency', 'impact')
+INDEX_ORDERS = ('desc', 'asc')
+INDEX_CHOICES = {
+    'status': ('Open', 'In Progress', 'User Action', 'Closed'),
+    'urgency': ('High', 'Medium', 'Low'),
+    'impact': ('High', 'Medium', 'Low'),
+}
+
+# Every content coding urllib3 can decode here: gzip and deflate, br and zstd when their packages are installed.
+ACCEPT_ENCODING = urllib3.util.make_headers(accept_encoding=True)['accept-encoding']
+
+BACKEND_POOL_SIZE = int(os.getenv("BACKEND_POOL_SIZE", 10))
+# Charges all admin browsers to the internal rate limit budget of the admin instead of its one egress address.
+BACKEND_CLIENT_KEY = os.getenv("BACKEND_CLIENT_KEY")
+
+# Keep-alive connections to the backend shared by all request threads.
+session = requests.Session()
+session.verify = False
+session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+if BACKEND_CLIENT_KEY:
+    session.headers['X-Client-Key'] = BACKEND_CLIENT_KEY
+session.mount(BACKEND_URL, requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=BACKEND_POOL_SIZE))
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 128))
+response_cache = OrderedDict()
+response_cache_lock = threading.Lock()
+CachedResponse = namedtuple("CachedResponse", ["status_code", "text", "headers"])
+
+# Rendered index tables, reused for a few seconds and dropped as soon as the admin changes an incident.
+INDEX_CACHE_TTL = float(os.getenv("INDEX_CACHE_TTL", 5))
+INDEX_CACHE_SIZE = int(os.getenv("INDEX_CACHE_SIZE", 64))
+index_cache = OrderedDict()
+index_cache_lock = threading.Lock()
+
+
+def backend_get(path, params=None):
+    """
+    Sends a GET request to the backend, revalidating the cached copy of the resource with If-None-Match.
+
+    Args:
+    path (str): Path of the backend resource.
+    params (dict, optional): Query parameters.
+
+    Returns:
+    CachedResponse: Status code, body and headers of the current representation.
+    """
+    url = requests.Request('GET', BACKEND_URL + path, params=params).prepare().url
+    with response_cache_lock:
+        cached = response_cache.get(url)
+    headers = {'If-None-Match': cached.headers['ETag']} if cached is not None else {}
+    r = session.get(url, headers=headers)
+    if r.status_code == 304 and cached is not None:
+        return cached
+    response = CachedResponse(r.status_code, r.text, r.headers)
+    if r.status_code == 200 and 'ETag' in r.headers:
+        with response_cache_lock:
+            response_cache[url] = response
+            response_cache.move_to_end(url)
+            while len(response_cache) > RESPONSE_CACHE_SIZE:
+                response_cache.popitem(last=False)
+    return response
+
+
+EVENTS_HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", 15))
+EVENTS_RECONNECT_DELAY = 5
+# Events buffered per browser before it is disconnected, EventSource reconnects by itself.
+EVENTS_QUEUE_SIZE = 64
+
+
+class EventRelay:
+    """
+    One subscription to the backend change feed shared by every browser of this process.
+    Events also drop the cached index tables, they may show the changed incident.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queues = set()
+        self._thread = None
+        self._last_event_id = None
+
+    def subscribe(self):
+        """
+        Returns:
+        queue.Queue: Event frames for one browser, None when it has to reconnect.
+        """
+        subscriber = queue.Queue(EVENTS_QUEUE_SIZE)
+        with self._lock:
+            self._queues.add(subscriber)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="event-relay", daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._queues.discard(subscriber)
+
+    def publish(self, frame):
+        with self._lock:
+            for subscriber in list(self._queues):
+                try:
+                    subscriber.put_nowait(frame)
+                except queue.Full:
+                    self._queues.discard(subscriber)
+                    while not subscriber.empty():
+                        subscriber.get_nowait()
+                    subscriber.put_nowait(None)
+
+    def _run(self):
+        # A session of its own, the stream would hold a connection of the shared pool forever.
+        events_session = requests.Session()
+        events_session.verify = False
+        if BACKEND_CLIENT_KEY:
+            events_session.headers['X-Client-Key'] = BACKEND_CLIENT_KEY
+        while True:
+            headers = {'Accept': 'text/event-stream'}
+            if self._last_event_id is not None:
+                headers['Last-Event-ID'] = self._last_event_id
+            try:
+                with events_session.get(BACKEND_URL + '/events', headers=headers, stream=True,
+                                        timeout=(5, EVENTS_HEARTBEAT * 3)) as r:
+                    r.raise_for_status()
+                    lines = []
+                    for line in r.iter_lines(decode_unicode=True):
+                        if line:
+                            lines.append(line)
+                            continue
+                        self.dispatch(lines)
+                        lines = []
+            except Exception as e:
+                print('Error', e)
+            time.sleep(EVENTS_RECONNECT_DELAY)
+
+    def dispatch(self, lines):
+        """
+        Forwards one backend event to the browsers.
+
+        Args:
+        lines (list): Lines of the event frame.
+        """
+        fields = {}
+        for line in lines:
+            name, _, value = line.partition(':')
+            if name:
+                fields[name] = value[1:] if value.startswith(' ') else value
+        if 'event' not in fields:
+            return
+        if 'id' in fields:
+            self._last_event_id = fields['id']
+        index_cache_clear()
+        self.publish('\n'.join(lines) + '\n\n')
+
+
+relay = EventRelay()
+
+
+def index_cache_get(key):
+    """
+    Returns the rendered index table cached under key, or None if it is missing or expired.
+    """
+    with index_cache_lock:
+        cached = index_cache.get(key)
+        if cached is None:
+            return None
+        expires, fragment = cached
+        if expires < time.monotonic():
+            del index_cache[key]
+            return None
+        index_cache.move_to_end(key)
+        return fragment
+
+
+def index_cache_set(key, fragment):
+    with index_cache_lock:
+        index_cache[key] = (time.monotonic() + INDEX_CACHE_TTL, fragment)
+        index_cache.move_to_end(key)
+        while len(index_cache) > INDEX_CACHE_SIZE:
+            index_cache.popitem(last=False)
+
+
+def index_cache_clear():
+    with index_cache_lock:
+        index_cache.clear()
+
+
+def index_arguments(args):
+    """
+    Normalizes the query parameters of the index page.
+
+    Args:
+    args (MultiDict): The request arguments.
+
+    Returns:
+    dict: Backend /views parameters, sort and order always set and filter values sorted.
+    """
+    params = {key: sorted(args.getlist(key)) for key in INDEX_FILTERS if args.get(key)}
+    params['sort'] = args.get('sort') if args.get('sort') in INDEX_SORTS else INDEX_SORTS[0]
+    params['order'] = args.get('order') if args.get('order') in INDEX_ORDERS else INDEX_ORDERS[0]
+    return params
+
+
+def render_index_table(params):
+    """
+    Fetches one page of incidents from the backend and renders the index table.
+
+    Args:
+    params (dict): Parameters returned by index_arguments().
+
+    Returns:
+    tuple: (status code, rendered table or None).
+    """
+    r = backend_get('/views', params=dict(params, limit=PAGE_SIZE))
+    if r.status_code not in (200,):
+        return r.status_code, None
+
+    incidents = json.loads(r.text)
+    next_url = None
+    if 'X-Next-Cursor' in r.headers:
+        next_url = url_for('get_index', **dict(params, after=r.headers['X-Next-Cursor']))
+    sort_urls = {}
+    for column in INDEX_SORTS:
+        order = 'asc' if params['sort'] == column and params['order'] == 'desc' else 'desc'
+        sort_args = {key: value for key, value in params.items() if key != 'after'}
+        sort_urls[column] = url_for('get_index', **dict(sort_args, sort=column, order=order))
+    return 200, render_template('incident_table.html', incidents=incidents, next_url=next_url,
+                                sort_urls=sort_urls, sort=params['sort'], order=params['order'])
+
 
 app = Flask(__name__)
 
@@ -13,7 +250,8 @@ admin = '86224793-b505-4a3a-91e9-1dfbf08f51c0'
 @app.route('/')
 def get_index():
     """
-    Fetches incidents from the backend and renders the index template.
+    Renders the index page: one page of incidents, sorted and filtered by the query parameters.
+    The incident table is cached for INDEX_CACHE_TTL seconds per set of parameters.
 
     Returns:
     str: Rendered HTML template for the index page.
@@ -21,12 +259,80 @@ def get_index():
     Raises:
     HTTPError: If failed to fetch incidents from the backend.
     """
-    r = requests.get(BACKEND_URL + '/views', verify=False)
+    params = index_arguments(request.args)
+    cache_key = json.dumps(params, sort_keys=True)
+    table = index_cache_get(cache_key)
+    if table is None:
+        status_code, table = render_index_table(params)
+        if table is None:
+            return abort(status_code, description='Failed to fetch incidents')
+        index_cache_set(cache_key, table)
+    first_url = url_for('get_index', **{name: value for name, value in params.items() if name != 'after'})
+    # New incidents belong on top of the unfiltered first page, other pages only patch their rows.
+    live_insert = params == {'sort': INDEX_SORTS[0], 'order': INDEX_ORDERS[0]}
+    return render_template('index.html', table=Markup(table), params=params, choices=INDEX_CHOICES,
+                           sorts=INDEX_SORTS, orders=INDEX_ORDERS, first_url=first_url, live_insert=live_insert)
+
+
+@app.route('/events')
+def get_events():
+    """
+    Relays the backend change feed to the browser as server-sent events.
+
+    Returns:
+    Response: The text/event-stream response.
+    """
+    subscriber = relay.subscribe()
+
+    def stream():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    frame = subscriber.get(timeout=EVENTS_HEARTBEAT)
+                except queue.Empty:
+                    frame = ': keep-alive\n\n'
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            relay.unsubscribe(subscriber)
+
+    return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+
+@app.route('/incident/<incident_id>/row')
+def get_incident_row(incident_id):
+    """
+    Renders the index table row of one incident, the index page patches itself with it.
+
+    Args:
+    incident_id (str): The ID of the incident.
+
+    Returns:
+    str: Rendered table row.
+    """
+    r = backend_get(f'/views/{incident_id}')
     if r.status_code not in (200,):
-        return abort(r.status_code, description='Failed to fetch incidents')
+        return abort(r.status_code, description='Failed to fetch incident')
+    return render_template('incident_row.html', incident=json.loads(r.text))
 
-    incidents = json.loads(r.text)
-    return render_template('index.html', incidents=incidents)
+
+@app.route('/incident/<incident_id>/comments')
+def get_incident_comments(incident_id):
+    """
+    Renders the comment rows of one incident, the incident page patches itself with them.
+
+    Args:
+    incident_id (str): The ID of the incident.
+
+    Returns:
+    str: Rendered table rows.
+    """
+    r = backend_get(f'/views/{incident_id}/detail')
+    if r.status_code not in (200,):
+        return abort(r.status_code, description='Failed to fetch comments')
+    return render_template('comment_rows.html', comments=json.loads(r.text)['comments'])
 
 
 @app.route('/incident/<incident_id>', methods = ["GET", "POST"])
@@ -50,19 +356,13 @@ def get_incident(incident_id):
                     'incident_status': request.form.get('status')
         }
                 
-        req2 = requests.post(BACKEND_URL + '/comments',  data=json.dumps(comment), verify=False)
+        req2 = session.post(BACKEND_URL + '/comments',  data=json.dumps(comment))
         if req2.status_code not in (201,):
             return abort(req2.status_code, description='Failed to save comment')
+        index_cache_clear()
 
-    req0 = requests.get(BACKEND_URL + f'/views/{incident_id}', verify=False)
-    if req0.status_code not in (200,):
-        return abort(req0.status_code, description='Failed to fetch incident')
-
-    req1 = requests.get(BACKEND_URL + '/comments', params={'incident_id': incident_id}, verify=False)
-    if req1.status_code not in (200,):
-        return abort(req1.status_code, description='Failed to fetch comments')
-
-    incident = json.loads(req0.text)
-    comments = json.loads(req1.text)
-
-    return render_template('incident.html', incident=incident, comments=comments)
+    detail = backend_get(f'/views/{incident_id}/detail')
+    if detail.status_code not in (200,):
+        return abort(detail.status_code, description='Failed to fetch incident')
+    detail = json.loads(detail.text)
+    return render_template('incident.html', incident=detail['incident'], comments=detail['comments'])
@@ -0,0 +1,130 @@
+import json
+import random
+import asyncio
+from collections import OrderedDict
+
+import httpx
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+RETRY_STATUS_CODES = (502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "PUT", "DELETE")
+# Content codings httpx decodes, the backend compresses large responses with the first one it supports.
+ACCEPT_ENCODING = "br, gzip, deflate" if brotli is not None else "gzip, deflate"
+CLIENT_KEY_HEADER = "X-Client-Key"
+
+
+class BackendClient:
+    """
+    Async client of the backend REST API.
+
+    Requests share one keep-alive connection pool, have a per-call timeout and are retried
+    with exponential backoff. GET responses are cached and revalidated with If-None-Match.
+    """
+
+    def __init__(self, base_url, timeout=10.0, retries=3, backoff=0.25,
+                 max_connections=20, cache_size=128, transport=None, client_key=None):
+        self.retries = retries
+        self.backoff = backoff
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+            headers=self._headers(client_key),
+            transport=transport,
+            verify=False)
+
+    @staticmethod
+    def _headers(client_key):
+        headers = {"Accept-Encoding": ACCEPT_ENCODING}
+        if client_key:
+            # Charges the requests of all bot users to the internal rate limit budget of the bot.
+            headers[CLIENT_KEY_HEADER] = client_key
+        return headers
+
+    def _should_retry(self, method, attempt, response=None, error=None):
+        if attempt >= self.retries:
+            return False
+        if error is not None:
+            # A request that never reached the backend is safe to repeat.
+            return method in IDEMPOTENT_METHODS or isinstance(
+                error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+        # 503 and 429 are returned by load shedding and rate limiting before the request runs.
+        return response.status_code in (429, 503) or (
+            response.status_code in RETRY_STATUS_CODES and method in IDEMPOTENT_METHODS)
+
+    async def request(self, method, path, timeout=None, **kwargs):
+        """
+        Sends a request to the backend, retrying transient failures.
+
+        Args:
+        method (str): The HTTP method.
+        path (str): Path of the backend resource.
+        timeout (float, optional): Overrides the default timeout of this call.
+        **kwargs: Passed to httpx.AsyncClient.request.
+
+        Returns:
+        httpx.Response: The backend response.
+
+        Raises:
+        httpx.HTTPError: If the backend stayed unreachable after all retries.
+        """
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        attempt = 0
+        while True:
+            try:
+                response = await self._client.request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                if not self._should_retry(method, attempt, error=e):
+                    raise
+            else:
+                if not self._should_retry(method, attempt, response=response):
+                    return response
+                if response.status_code == 429 and response.headers.get("Retry-After", "").isdigit():
+                    await asyncio.sleep(int(response.headers["Retry-After"]))
+                    attempt += 1
+                    continue
+            delay = self.backoff * 2 ** attempt
+            await asyncio.sleep(delay + random.uniform(0, delay))
+            attempt += 1
+
+    async def get(self, path, params=None, timeout=None):
+        """
+        Sends a GET request, revalidating the cached copy of the resource with If-None-Match.
+
+        Returns:
+        httpx.Response: The current representation of the resource.
+        """
+        url = str(self._client.build_request("GET", path, params=params).url)
+        cached = self._cache.get(url)
+        headers = {"If-None-Match": cached.headers["ETag"]} if cached is not None else {}
+        response = await self.request("GET", url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cached is not None:
+            self._cache.move_to_end(url)
+            return cached
+        if response.status_code == 200 and "ETag" in response.headers:
+            self._cache[url] = response
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return response
+
+    async def post(self, path, data, timeout=None):
+        """
+        Sends a POST request with a JSON body.
+
+        Returns:
+        httpx.Response: The backend response.
+        """
+        return await self.request("POST", path, content=json.dumps(data), timeout=timeout)
+
+    async def aclose(self):
+        await self._client.aclose()
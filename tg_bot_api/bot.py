@@ -1,6 +1,10 @@
 import os
 import json
-import requests
+
+from backend_client import BackendClient
+from user_store import UserStore
+from update_processor import PerUserUpdateProcessor
+from notifier import NotificationWorker, RateLimiter
 
 from telegram import (
     Update,
@@ -21,6 +25,31 @@ from telegram.ext import (
 
 TOKEN = os.environ["TOKEN"]
 BACKEND_URL = os.environ["BACKEND_URL"]
+INCIDENTS_PAGE_SIZE = int(os.getenv("INCIDENTS_PAGE_SIZE", 50))
+
+BACKEND_TIMEOUT = float(os.getenv("BACKEND_TIMEOUT", 10))
+BACKEND_RETRIES = int(os.getenv("BACKEND_RETRIES", 3))
+BACKEND_MAX_CONNECTIONS = int(os.getenv("BACKEND_MAX_CONNECTIONS", 20))
+BACKEND_CLIENT_KEY = os.getenv("BACKEND_CLIENT_KEY")
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", 16))
+USER_STORE_PATH = os.getenv("USER_STORE_PATH", "users.sqlite3")
+USER_STORE_TTL = int(os.getenv("USER_STORE_TTL", 86400))
+
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+PORT = int(os.getenv("PORT", 8080))
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+
+NOTIFY_ENABLED = os.getenv("NOTIFY_ENABLED", "1") == "1"
+NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", 50))
+NOTIFY_POLL_INTERVAL = float(os.getenv("NOTIFY_POLL_INTERVAL", 5))
+NOTIFY_RATE = float(os.getenv("NOTIFY_RATE", 25))
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", 5))
+
+backend = BackendClient(BACKEND_URL, timeout=BACKEND_TIMEOUT, retries=BACKEND_RETRIES,
+                        max_connections=BACKEND_MAX_CONNECTIONS, client_key=BACKEND_CLIENT_KEY)
+users = UserStore(USER_STORE_PATH, ttl=USER_STORE_TTL)
 
 PROMPT_ACTION, \
 PROMPT_URGENCY, \
@@ -59,17 +88,18 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
             user_info["username"] = user_info["first_name"]
         return user_info
 
-    user_data = get_user_info(user)
-
-    r = requests.post(BACKEND_URL + '/users', data=json.dumps(user_data), verify=False)
+    user_id = users.get(user.id)
+    if user_id is None:
+        r = await backend.post('/users', get_user_info(user))
 
-    print(r.status_code, r.text)
-    if r.status_code not in (200, 201,):
-        await update.message.reply_text(f"Oops {user.first_name}, your status code is {r.status_code}")
-        return ConversationHandler.END
+        print(r.status_code, r.text)
+        if r.status_code not in (200, 201,):
+            await update.message.reply_text(f"Oops {user.first_name}, your status code is {r.status_code}")
+            return ConversationHandler.END
 
-    text = json.loads(r.text)
-    context.user_data["reported_by"] = text[0]["id"]
+        user_id = json.loads(r.text)[0]["id"]
+        users.set(user.id, user_id)
+    context.user_data["reported_by"] = user_id
 
     reply_keyboard = [
         [InlineKeyboardButton("Create Incident", callback_data="Crt_Inc_Bttn")],
@@ -117,7 +147,7 @@ async def view_incidents_callback(update: Update, context: ContextTypes.DEFAULT_
     Returns:
     int: The next conversation state.
     """
-    r = requests.get(BACKEND_URL + '/incidents', params={'reported_by': context.user_data["reported_by"]}, verify=False)
+    r = await backend.get('/incidents', params={'reported_by': context.user_data["reported_by"], 'limit': INCIDENTS_PAGE_SIZE, 'order': 'desc'})
     if r.status_code not in (200,):
         await update.callback_query.edit_message_text(f"Your status code is {r.status_code}")
 
@@ -194,7 +224,8 @@ async def set_urgency(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
     query = update.callback_query
 
     context.user_data["urgency"] = keys[update.callback_query.data]
-    r = requests.post(BACKEND_URL + '/incidents', data=json.dumps(context.user_data), verify=False)
+    incident = {key: context.user_data[key] for key in ("reported_by", "description", "impact", "urgency")}
+    r = await backend.post('/incidents', incident)
 
     if r.status_code != 201:
         await query.edit_message_text(f"Oops! Your status code is {r.status_code}")
@@ -223,7 +254,7 @@ async def view_incident(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
     """
     query = update.callback_query
     inc_id = query.data
-    r = requests.get(BACKEND_URL + f'/views/{inc_id}', verify=False)
+    r = await backend.get(f'/views/{inc_id}')
     if r.status_code not in (200,):
         await update.callback_query.edit_message_text(f"Your status code is {r.status_code}")
 
@@ -287,7 +318,7 @@ async def prompt_change_status(update: Update, context: ContextTypes.DEFAULT_TYP
     comment = {'incident_id': incident['incident_id'], 'comment': 'User changed status', 
                 'created_by': context.user_data['reported_by'],
                 'incident_status': update.callback_query.data}
-    r = requests.post(BACKEND_URL + '/comments', data=json.dumps(comment), verify=False)
+    r = await backend.post('/comments', comment)
     if r.status_code != 201:
         await update.callback_query.edit_message_text(f"Oops, status code {r.status_code}")
         return ConversationHandler.END
@@ -314,7 +345,7 @@ async def prompt_add_comment(update: Update, context: ContextTypes.DEFAULT_TYPE)
     comment = {'incident_id': incident['incident_id'], 'comment': message, 
                 'created_by': context.user_data['reported_by'],
                 'incident_status': 'In Progress'}
-    r = requests.post(BACKEND_URL + '/comments', data=json.dumps(comment), verify=False)
+    r = await backend.post('/comments', comment)
     if r.status_code != 201:
         await update.message.reply_text(f"Oops, status code {r.status_code}")
         return ConversationHandler.END
@@ -339,8 +370,44 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     return ConversationHandler.END
 
 
-def main():
-    app = ApplicationBuilder().token(TOKEN).build()
+async def start_notifier(app) -> None:
+    if not NOTIFY_ENABLED:
+        return
+    notifier = NotificationWorker(app.bot, backend, batch_size=NOTIFY_BATCH_SIZE,
+                                  poll_interval=NOTIFY_POLL_INTERVAL, max_attempts=NOTIFY_MAX_ATTEMPTS,
+                                  limiter=RateLimiter(NOTIFY_RATE))
+    notifier.start()
+    app.bot_data["notifier"] = notifier
+
+
+async def stop_notifier(app) -> None:
+    notifier = app.bot_data.pop("notifier", None)
+    if notifier is not None:
+        await notifier.stop()
+
+
+async def close_backend(app) -> None:
+    await backend.aclose()
+    users.close()
+
+
+def build_application(request=None, concurrent_updates=CONCURRENT_UPDATES):
+    """
+    Builds the bot application with its conversation handler.
+
+    Args:
+    request (BaseRequest, optional): Transport to the Telegram Bot API, replaced in load tests.
+    concurrent_updates (int): Updates processed at the same time; updates of one user are still processed in order.
+
+    Returns:
+    Application: The configured application.
+    """
+    builder = ApplicationBuilder().token(TOKEN).post_init(start_notifier).post_stop(stop_notifier) \
+        .post_shutdown(close_backend) \
+        .concurrent_updates(PerUserUpdateProcessor(concurrent_updates))
+    if request is not None:
+        builder = builder.request(request).get_updates_request(request)
+    app = builder.build()
     app.add_handler(ConversationHandler(
         entry_points=[CommandHandler("start", start)],
         states={
@@ -362,7 +429,22 @@ def main():
         },
         fallbacks=[CommandHandler("cancel", cancel)],
     ))
-    app.run_polling(allowed_updates=Update.ALL_TYPES)
+    return app
+
+
+def main():
+    app = build_application()
+    if BOT_MODE == "webhook":
+        app.run_webhook(
+            listen="0.0.0.0",
+            port=PORT,
+            url_path=WEBHOOK_PATH,
+            webhook_url=f"{WEBHOOK_URL}/{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET,
+            allowed_updates=Update.ALL_TYPES
+        )
+    else:
+        app.run_polling(allowed_updates=Update.ALL_TYPES)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,151 @@
+"""
+Replays synthetic Telegram updates through the bot without Telegram and measures throughput.
+
+Usage:
+python fake_updates.py [users] [concurrent_updates] [latency_ms]
+
+Each user sends /start and then presses "View Incidents". Telegram Bot API calls are answered
+in-process, backend calls go to BACKEND_URL when it is set, otherwise to an in-process fake
+that answers after latency_ms.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import itertools
+
+import httpx
+
+os.environ.setdefault("TOKEN", "123456:FAKE")
+os.environ.setdefault("BACKEND_URL", "")
+os.environ.setdefault("USER_STORE_PATH", ":memory:")
+
+import bot
+from backend_client import BackendClient
+
+from telegram import Update
+from telegram.request import BaseRequest
+
+BOT_USER = {"id": 123456, "is_bot": True, "first_name": "Incident Bot", "username": "incident_bot"}
+
+
+def fake_message(chat_id, text="", message_id=1):
+    return {
+        "message_id": message_id,
+        "date": int(time.time()),
+        "chat": {"id": chat_id, "type": "private"},
+        "from": BOT_USER,
+        "text": text,
+    }
+
+
+class FakeTelegramRequest(BaseRequest):
+    """
+    Answers Bot API calls in-process after a fixed delay instead of sending them to Telegram.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = itertools.count()
+
+    @property
+    def read_timeout(self):
+        return None
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_request(self, url, method, request_data=None, read_timeout=None,
+                         write_timeout=None, connect_timeout=None, pool_timeout=None):
+        next(self.calls)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        endpoint = url.rsplit("/", 1)[-1]
+        parameters = request_data.parameters if request_data else {}
+        if endpoint == "getMe":
+            result = BOT_USER
+        elif endpoint in ("sendMessage", "editMessageText"):
+            result = fake_message(parameters.get("chat_id", 0), parameters.get("text", ""))
+        else:
+            result = True
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+
+def fake_backend(latency):
+    """
+    Returns a transport answering the backend routes used by the bot after latency seconds.
+    """
+    async def handler(request):
+        await asyncio.sleep(latency)
+        if request.method == "POST" and request.url.path == "/users":
+            user = json.loads(request.content)
+            return httpx.Response(201, json=[{"id": f"user-{user['telegram_user_id']}"}])
+        if request.method == "GET" and request.url.path == "/incidents":
+            return httpx.Response(200, json=[{"id": "incident-1", "description": "Printer is on fire"}])
+        return httpx.Response(404, json={"error": "Not found"})
+    return httpx.MockTransport(handler)
+
+
+def fake_updates(app, users):
+    """
+    Builds a /start message and a "View Incidents" callback for every user.
+
+    Returns:
+    list: The updates, both updates of a user in the order they have to be processed.
+    """
+    update_id = itertools.count(1)
+    updates = []
+    for user_id in range(1, users + 1):
+        user = {"id": user_id, "is_bot": False, "first_name": f"User{user_id}"}
+        start = {
+            "update_id": next(update_id),
+            "message": {
+                **fake_message(user_id, "/start"),
+                "from": user,
+                "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+            },
+        }
+        view = {
+            "update_id": next(update_id),
+            "callback_query": {
+                "id": str(user_id),
+                "from": user,
+                "chat_instance": str(user_id),
+                "data": "Vw_Inc_Bttn",
+                "message": fake_message(user_id, "Choose your action:"),
+            },
+        }
+        updates.append(Update.de_json(start, app.bot))
+        updates.append(Update.de_json(view, app.bot))
+    return updates
+
+
+async def run(users=200, concurrent_updates=16, latency=0.02):
+    request = FakeTelegramRequest(latency)
+    if not os.environ["BACKEND_URL"]:
+        bot.backend = BackendClient("http://backend", transport=fake_backend(latency))
+    app = bot.build_application(request=request, concurrent_updates=concurrent_updates)
+    await app.initialize()
+    updates = fake_updates(app, users)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(app.update_processor.process_update(update, app.process_update(update))
+                           for update in updates))
+    elapsed = time.perf_counter() - started
+
+    await app.shutdown()
+    await bot.backend.aclose()
+    print(f"{len(updates)} updates, concurrent_updates={concurrent_updates}: "
+          f"{elapsed:.2f}s, {len(updates) / elapsed:.0f} updates/s")
+
+
+if __name__ == "__main__":
+    arguments = [float(argument) for argument in sys.argv[1:4]]
+    users = int(arguments[0]) if len(arguments) > 0 else 200
+    concurrent_updates = int(arguments[1]) if len(arguments) > 1 else 16
+    latency = arguments[2] / 1000 if len(arguments) > 2 else 20 / 1000
+    asyncio.run(run(users, concurrent_updates, latency))
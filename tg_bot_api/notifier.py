@@ -0,0 +1,135 @@
+import time
+import asyncio
+
+from telegram.error import BadRequest, Forbidden, RetryAfter, TelegramError
+
+
+class RateLimiter:
+    """
+    Spaces messages to stay within the Telegram limits: about 30 messages per second overall
+    and one message per second in the same chat.
+    """
+
+    def __init__(self, rate=25.0, chat_interval=1.0):
+        self.interval = 1.0 / rate
+        self.chat_interval = chat_interval
+        self._next = 0.0
+        self._chats = {}
+
+    async def acquire(self, chat_id):
+        """
+        Waits until a message may be sent to chat_id.
+        """
+        now = time.monotonic()
+        start = max(now, self._next, self._chats.get(chat_id, 0.0))
+        self._next = start + self.interval
+        self._chats[chat_id] = start + self.chat_interval
+        if len(self._chats) > 10000:
+            self._chats = {chat: until for chat, until in self._chats.items() if until > now}
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def pause(self, seconds):
+        """
+        Holds every message back after Telegram asked to retry later.
+        """
+        self._next = max(self._next, time.monotonic() + seconds)
+
+
+def format_notification(notification):
+    """
+    Returns:
+    str: The message telling the reporter about the new status of the incident.
+    """
+    text = f'Status of your incident {notification["incident_id"]} changed to {notification["incident_status"]}.'
+    if notification.get("comment"):
+        text += f'\nComment: {notification["comment"]}'
+    return text
+
+
+class NotificationWorker:
+    """
+    Drains the notification outbox of the backend: claims a batch, sends the messages within
+    the rate limits and acknowledges every outcome. Delivery is at least once, a batch that is
+    not acknowledged is claimed again when its lease ends.
+    """
+
+    def __init__(self, bot, backend, batch_size=50, lease=120.0, poll_interval=5.0,
+                 max_attempts=5, limiter=None):
+        self.bot = bot
+        self.backend = backend
+        self.batch_size = batch_size
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.limiter = limiter or RateLimiter()
+        self._stopping = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """
+        Stops after the batch in progress has been acknowledged.
+        """
+        self._stopping.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def run(self):
+        while not self._stopping.is_set():
+            try:
+                count = await self.drain_once()
+            except Exception as e:
+                print('Error', e)
+                count = 0
+            if count < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def drain_once(self):
+        """
+        Claims, sends and acknowledges one batch of notifications.
+
+        Returns:
+        int: The number of claimed notifications.
+        """
+        r = await self.backend.post('/notifications/claim', {'limit': self.batch_size, 'lease': self.lease})
+        if r.status_code not in (200,):
+            print(r.status_code, r.text)
+            return 0
+        notifications = r.json()
+        ack = {'sent': [], 'retry': [], 'failed': []}
+        for notification in notifications:
+            await self.deliver(notification, ack)
+        if notifications:
+            r = await self.backend.post('/notifications/ack', ack)
+            if r.status_code not in (200,):
+                print(r.status_code, r.text)
+        return len(notifications)
+
+    async def deliver(self, notification, ack):
+        """
+        Sends one notification and records its outcome in ack.
+        """
+        await self.limiter.acquire(notification['chat_id'])
+        try:
+            await self.bot.send_message(notification['chat_id'], format_notification(notification))
+        except RetryAfter as e:
+            self.limiter.pause(e.retry_after)
+            ack['retry'].append({'id': notification['id'], 'delay': e.retry_after, 'error': str(e)})
+        except (BadRequest, Forbidden) as e:
+            # Chat not found or the user blocked the bot, sending again would fail the same way.
+            ack['failed'].append({'id': notification['id'], 'error': str(e)})
+        except TelegramError as e:
+            if notification['attempts'] >= self.max_attempts:
+                ack['failed'].append({'id': notification['id'], 'error': str(e)})
+            else:
+                delay = min(2 ** notification['attempts'], 300)
+                ack['retry'].append({'id': notification['id'], 'delay': delay, 'error': str(e)})
+        else:
+            ack['sent'].append(notification['id'])
@@ -0,0 +1,57 @@
+from update_processor import PerUserUpdateProcessor
+import asyncio
+import datetime
+import unittest
+
+from telegram import Chat, Message, Update, User
+
+
+def user_update(update_id, user_id):
+    user = User(user_id, "user", False)
+    message = Message(update_id, datetime.datetime.now(), Chat(user_id, "private"), from_user=user)
+    return Update(update_id, message=message)
+
+
+class Test_PerUserUpdateProcessor(unittest.IsolatedAsyncioTestCase):
+    async def test_burst_of_one_user_does_not_starve_others(self):
+        processor = PerUserUpdateProcessor(2)
+        await processor.initialize()
+        release = asyncio.Event()
+        handled = []
+
+        async def handle(name, wait):
+            if wait:
+                await release.wait()
+            handled.append(name)
+
+        burst = [asyncio.create_task(processor.process_update(user_update(i, 1), handle(f"a{i}", True)))
+                 for i in range(5)]
+        other = asyncio.create_task(processor.process_update(user_update(10, 2), handle("b", False)))
+        await asyncio.wait_for(other, 1)
+        self.assertEqual(handled, ["b"])
+        release.set()
+        await asyncio.gather(*burst)
+        self.assertEqual(handled, ["b", "a0", "a1", "a2", "a3", "a4"])
+        self.assertEqual(processor._locks, {})
+
+    async def test_limits_concurrent_updates(self):
+        processor = PerUserUpdateProcessor(2)
+        await processor.initialize()
+        release = asyncio.Event()
+        running = []
+
+        async def handle(user_id):
+            running.append(user_id)
+            await release.wait()
+
+        tasks = [asyncio.create_task(processor.process_update(user_update(i, i), handle(i)))
+                 for i in range(1, 4)]
+        await asyncio.sleep(0.05)
+        self.assertEqual(running, [1, 2])
+        release.set()
+        await asyncio.gather(*tasks)
+        self.assertEqual(running, [1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
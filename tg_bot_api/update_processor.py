@@ -0,0 +1,67 @@
+import sys
+import asyncio
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Processes updates of different users concurrently while the updates of one user
+    are handled one after another, in the order they arrived, as ConversationHandler expects.
+    """
+
+    def __init__(self, max_concurrent_updates):
+        if max_concurrent_updates < 1:
+            raise ValueError("`max_concurrent_updates` must be a positive integer!")
+        # The base class takes its slot before do_process_update() runs, i.e. before the
+        # per-user lock: its bound is lifted and the slots are taken from _slots after the lock.
+        super().__init__(sys.maxsize)
+        self.concurrency = max_concurrent_updates
+        self._slots = None
+        self._locks = {}
+
+    @staticmethod
+    def update_key(update):
+        """
+        Returns the key updates are serialized by: the user, else the chat, else None.
+        """
+        if not isinstance(update, Update):
+            return None
+        if update.effective_user is not None:
+            return "user", update.effective_user.id
+        if update.effective_chat is not None:
+            return "chat", update.effective_chat.id
+        return None
+
+    async def do_process_update(self, update, coroutine):
+        """
+        Waits for the earlier updates of the same user before taking one of the slots, so that
+        a burst of one user does not hold every slot while its updates queue behind each other.
+        """
+        key = self.update_key(update)
+        if key is None:
+            async with self._slots:
+                await coroutine
+            return
+        lock, waiting = self._locks.get(key, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._locks[key] = (lock, waiting + 1)
+        try:
+            async with lock:
+                async with self._slots:
+                    await coroutine
+        finally:
+            lock, waiting = self._locks[key]
+            if waiting == 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, waiting - 1)
+
+    async def initialize(self):
+        # Created on the loop of the application.
+        self._slots = asyncio.Semaphore(self.concurrency)
+
+    async def shutdown(self):
+        self._locks.clear()
@@ -0,0 +1,44 @@
+import time
+import sqlite3
+
+
+class UserStore:
+    """
+    Persistent mapping of Telegram user ids to backend user ids, kept in a local SQLite file.
+
+    Entries older than ttl seconds are treated as missing, so the user is revalidated with the backend.
+    """
+
+    def __init__(self, path, ttl=86400):
+        self.ttl = ttl
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS user_ids ("
+            "telegram_user_id INTEGER PRIMARY KEY, user_id TEXT NOT NULL, stored_at REAL NOT NULL)")
+
+    def get(self, telegram_user_id):
+        """
+        Args:
+        telegram_user_id (int): The Telegram id of the user.
+
+        Returns:
+        str or None: The backend user id, or None if it is unknown or expired.
+        """
+        row = self.connection.execute(
+            "SELECT user_id, stored_at FROM user_ids WHERE telegram_user_id = ?", (telegram_user_id,)).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return row[0]
+
+    def set(self, telegram_user_id, user_id):
+        self.connection.execute(
+            "INSERT INTO user_ids (telegram_user_id, user_id, stored_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (telegram_user_id) DO UPDATE SET user_id = excluded.user_id, stored_at = excluded.stored_at",
+            (telegram_user_id, user_id, time.time()))
+
+    def delete(self, telegram_user_id):
+        self.connection.execute("DELETE FROM user_ids WHERE telegram_user_id = ?", (telegram_user_id,))
+
+    def close(self):
+        self.connection.close()